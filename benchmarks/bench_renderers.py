@@ -0,0 +1,143 @@
+# benchmarks/bench_renderers.py
+#
+# Compara las tarjetas hechas con widgets (VirtualCardList) con las dibujadas en el
+# canvas (CanvasCardRenderer) para 100, 1k y 10k items: carga inicial, recorrido
+# completo con scroll, cambio de tema, movimiento de la selección y memoria.
+# Necesita una pantalla para Tk:  python benchmarks/bench_renderers.py
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import tkinter as tk
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from canvas_card_renderer import CanvasCardRenderer
+from functions import Functions
+from history_archive import HistoryArchive
+from main_screen_navigation import MainScreenNavigation
+from preview_cache import PreviewCache
+from search_index import TrigramIndex
+from theme_manager import ThemeManager
+from utils import content_digest
+from virtual_list import VirtualCardList
+
+
+def make_manager(root, canvas, count):
+    manager = SimpleNamespace(
+        root=root,
+        canvas=canvas,
+        settings={'clipboard_backend': 'fake'},
+        is_dark_mode=True,
+        current_selection={'type': 'cards', 'index': 0},
+        preview_cache=PreviewCache(max(count, 1024)),
+        search_index=TrigramIndex(),
+        search_query='',
+        search_results=None,
+        archive_matches=None,
+        clipboard_items={},
+        history_archive=HistoryArchive(os.path.join(tempfile.mkdtemp(), 'archive')),
+    )
+    manager.theme_manager = ThemeManager(manager)
+    manager.functions = Functions(manager)
+    for i in range(count):
+        text = f"Elemento {i}\n" + "línea de ejemplo\n" * (i % 5)
+        item_id = f"item-{i}"
+        manager.clipboard_items[item_id] = {'text': text, 'formatted': None, 'pinned': i % 7 == 0}
+        manager.functions.index_item(item_id, content_digest(text))
+    return manager
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def build(kind, manager):
+    functions = manager.functions
+    if kind == 'canvas':
+        return CanvasCardRenderer(manager.canvas, functions.describe_card, functions.card_palette,
+                                  functions.card_height, signature=functions.card_signature)
+    return VirtualCardList(manager.canvas, functions.create_card, functions.bind_card,
+                           functions.card_height, signature=functions.card_signature,
+                           move_row=functions.move_card)
+
+
+def paint_selection(manager, index):
+    # El mismo camino que al navegar con las flechas, para los dos renderizadores
+    manager.current_selection = {'type': 'cards', 'index': index}
+    manager.navigation.update_highlights()
+
+
+def run(kind, count):
+    root = tk.Tk()
+    root.geometry('295x400')
+    canvas = tk.Canvas(root, highlightthickness=0)
+    canvas.pack(fill=tk.BOTH, expand=True)
+    root.update()
+
+    tracemalloc.start()
+    manager = make_manager(root, canvas, count)
+    manager.card_list = card_list = build(kind, manager)
+    # La navegación real: las tarjetas de widgets se pintan con paint_card al asociarse y al seleccionarse
+    manager.navigation = MainScreenNavigation(manager)
+    results = {}
+
+    start = time.perf_counter()
+    card_list.set_keys(manager.clipboard_items.keys())
+    root.update()
+    results['carga'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    steps = 50
+    for step in range(steps + 1):
+        canvas.yview_moveto(step / steps)
+        card_list.render()
+        root.update_idletasks()
+    results['scroll'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager.is_dark_mode = False
+    manager.theme_manager.styles.apply(manager.theme_manager.current_colors())
+    if kind == 'canvas':
+        card_list.apply_theme()
+    root.update_idletasks()
+    results['tema'] = time.perf_counter() - start
+
+    canvas.yview_moveto(0)
+    card_list.render()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # Sin contar los mensajes de la navegación
+        for index in range(min(count, 200)):
+            paint_selection(manager, index)
+            root.update_idletasks()
+    results['seleccion'] = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results['memoria_kb'] = peak / 1024
+    results['widgets'] = count_widgets(root)
+    results['items_canvas'] = len(canvas.find_all())
+
+    manager.functions.clipboard_backend.close()
+    root.destroy()
+    return results
+
+
+def main():
+    print(f"{'renderer':<10}{'items':>7}{'carga ms':>10}{'scroll ms':>11}{'tema ms':>9}"
+          f"{'selección ms':>14}{'mem KB':>9}{'widgets':>9}{'items canvas':>14}")
+    for count in (100, 1000, 10000):
+        for kind in ('widgets', 'canvas'):
+            r = run(kind, count)
+            print(f"{kind:<10}{count:>7}{r['carga'] * 1000:>10.1f}{r['scroll'] * 1000:>11.1f}"
+                  f"{r['tema'] * 1000:>9.1f}{r['seleccion'] * 1000:>14.1f}{r['memoria_kb']:>9.0f}"
+                  f"{r['widgets']:>9}{r['items_canvas']:>14}")
+
+
+if __name__ == '__main__':
+    main()
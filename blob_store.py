@@ -0,0 +1,96 @@
+# blob_store.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import Counter
+
+from utils import file_size
+
+
+class BlobStore:
+    """
+    Almacén direccionado por contenido para los contenidos con formato (RTF/HTML).
+    Cada contenido se guarda una sola vez como <sha256>.blob y el archivo de datos
+    solo guarda la referencia. Los conteos de referencias los mantiene DataManager.
+    """
+
+    def __init__(self, directory='clipboard_blobs', gc_grace_seconds=60):
+        self.directory = directory
+        self.gc_grace_seconds = gc_grace_seconds  # No se borran blobs escritos hace poco
+        self.refcounts = Counter()
+        self.recent_puts = {}
+        self.lock = threading.Lock()
+        # El directorio se crea con el primer blob: solo leer no deja rastro en disco
+        names = os.listdir(self.directory) if os.path.isdir(self.directory) else []
+        self.known = {name[:-5] for name in names if name.endswith('.blob')}
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, digest):
+        return os.path.join(self.directory, digest + '.blob')
+
+    def put(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        digest = self.digest(data)
+        with self.lock:
+            self.recent_puts[digest] = time.time()
+            if digest in self.known:
+                return digest
+        # Escritura atómica; contenidos idénticos se escriben una sola vez
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path_for(digest) + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path_for(digest))
+        with self.lock:
+            self.known.add(digest)
+        return digest
+
+    def get(self, digest):
+        try:
+            with open(self.path_for(digest), 'rb') as f:
+                return f.read()
+        except OSError as e:
+            print(f"Blob {digest} no encontrado: {e}")
+            return None
+
+    def disk_usage(self):
+        with self.lock:
+            digests = list(self.known)
+        return sum(file_size(self.path_for(digest)) for digest in digests)
+
+    def incref(self, digests):
+        with self.lock:
+            self.refcounts.update(digests)
+
+    def decref(self, digests):
+        with self.lock:
+            self.refcounts.subtract(digests)
+            for digest in digests:
+                if self.refcounts[digest] <= 0:
+                    self.refcounts.pop(digest, None)
+
+    def reset_refs(self, digests):
+        with self.lock:
+            self.refcounts = Counter(digests)
+
+    def collect_garbage(self):
+        # Elimina los blobs sin referencias que no se hayan escrito recientemente
+        now = time.time()
+        with self.lock:
+            self.recent_puts = {d: t for d, t in self.recent_puts.items() if now - t < self.gc_grace_seconds}
+            orphans = [d for d in self.known if self.refcounts[d] <= 0 and d not in self.recent_puts]
+            self.known.difference_update(orphans)
+        for digest in orphans:
+            try:
+                os.remove(self.path_for(digest))
+            except OSError:
+                pass
+        if orphans:
+            print(f"{len(orphans)} blobs sin referencias eliminados")
+        return len(orphans)
@@ -0,0 +1,179 @@
+# canvas_card_renderer.py
+
+from navigation_model import row_at
+from virtual_list import VirtualCardList
+
+
+class CanvasRow:
+    """Items del canvas de una tarjeta: fondo, texto y tres iconos con su fondo."""
+
+    def __init__(self, canvas, tag, icon_texts, font, icon_font):
+        self.tag = tag
+        self.key = None
+        self.row_index = None
+        self.row_y = None
+        self.row_height = None
+        self.row_width = None
+        self.painted_selection = None  # (seleccionada, icono) con que se pintó la fila
+        self.rect = canvas.create_rectangle(0, 0, 0, 0, width=0, tags=(tag, 'card_rect'))
+        self.text = canvas.create_text(0, 0, anchor='w', justify='left', font=font,
+                                       tags=(tag, 'card_text'))
+        self.icon_rects = []
+        self.icons = []
+        for icon_text in icon_texts:
+            self.icon_rects.append(canvas.create_rectangle(0, 0, 0, 0, width=0, tags=(tag, 'card_icon_bg')))
+            self.icons.append(canvas.create_text(0, 0, text=icon_text, font=icon_font,
+                                                 tags=(tag, 'card_icon')))
+
+
+class CanvasCardRenderer(VirtualCardList):
+    """
+    Alternativa a las tarjetas hechas con widgets: cada tarjeta son unos pocos items
+    (rectángulos y textos) dibujados en el mismo canvas. La selección y el tema se
+    cambian con itemconfigure sobre ese canvas y los clics se resuelven por posición.
+    Conserva la virtualización y la reconciliación por clave de VirtualCardList.
+    """
+
+    draws_cards = True
+    icon_texts = ("➡️", "📍", "✖️")
+
+    def __init__(self, canvas, describe, palette, row_height, signature=None,
+                 overscan=3, spacing=4, padx=2, icon_width=26,
+                 font=('Segoe UI', 9), icon_font=('Segoe UI', 10)):
+        self.describe = describe  # (key) -> (vista previa, fijado)
+        self.palette = palette    # () -> {'card_bg', 'fg', 'highlight', 'icon_highlight'}
+        self.icon_width = icon_width
+        self.font = font
+        self.icon_font = icon_font
+        self.row_count = 0
+        self.selected_index = None
+        self.selected_icon = None
+        super().__init__(canvas, self.new_canvas_row, self.draw_row, row_height,
+                         signature=signature, move_row=self.repaint_row,
+                         overscan=overscan, spacing=spacing, padx=padx)
+
+    # ------------------------------------------------------------------
+
+    def new_canvas_row(self):
+        self.row_count += 1
+        return CanvasRow(self.canvas, f'card_row{self.row_count}', self.icon_texts, self.font, self.icon_font)
+
+    def new_row(self):
+        row = self.create_row()
+        self.canvas.itemconfigure(row.tag, state='hidden')
+        return row
+
+    def show(self, key, index):
+        row = self.pool.pop() if self.pool else self.new_row()
+        self.place(row, key, index)
+        self.canvas.itemconfigure(row.tag, state='normal')
+        self.bind(row, key, index)
+        self.rows[key] = row
+
+    def place(self, row, key, index):
+        y = self.offsets[index]
+        height = self.height_at(index)
+        width = self.row_width()
+        if row.row_height == height and row.row_width == width and row.row_y is not None:
+            if row.row_y != y:
+                # Solo cambió la posición: un único move sobre la etiqueta de la fila
+                self.canvas.move(row.tag, 0, y - row.row_y)
+        else:
+            self.layout(row, y, height, width)
+        row.row_y = y
+        row.row_height = height
+        row.row_width = width
+        row.row_index = index
+
+    def layout(self, row, y, height, width):
+        x0 = self.padx
+        x1 = x0 + width
+        middle = y + height / 2
+        icons_left = x1 - len(row.icons) * self.icon_width
+        self.canvas.coords(row.rect, x0, y, x1, y + height)
+        self.canvas.coords(row.text, x0 + 10, middle)
+        self.canvas.itemconfigure(row.text, width=max(icons_left - x0 - 14, 1))
+        for position, (icon_rect, icon) in enumerate(zip(row.icon_rects, row.icons)):
+            left = icons_left + position * self.icon_width
+            self.canvas.coords(icon_rect, left, middle - 11, left + self.icon_width, middle + 11)
+            self.canvas.coords(icon, left + self.icon_width / 2, middle)
+
+    def release(self, key):
+        row = self.rows.pop(key)
+        self.signatures.pop(key, None)
+        self.canvas.itemconfigure(row.tag, state='hidden')
+        self.pool.append(row)
+
+    def on_resize(self, width):
+        total = self.offsets[-1]
+        self.canvas.configure(scrollregion=(0, 0, width, total))
+        for row in self.rows.values():
+            self.place(row, row.key, row.row_index)
+        self.render()
+
+    # ------------------------------------------------------------------
+
+    def draw_row(self, row, key, index):
+        preview, pinned = self.describe(key)
+        row.key = key
+        self.canvas.itemconfigure(row.text, text=preview)
+        self.canvas.itemconfigure(row.icons[1], text="📌" if pinned else "📍")
+        self.paint_row(row)
+
+    def repaint_row(self, row, key, index):
+        # La fila solo se movió: se repinta si entra o sale de la selección
+        row.key = key
+        if row.painted_selection != self.selection_for(row):
+            self.paint_row(row)
+
+    def selection_for(self, row):
+        selected = row.row_index is not None and row.row_index == self.selected_index
+        return selected, self.selected_icon if selected else None
+
+    def paint_row(self, row):
+        colors = self.palette()
+        selected, _ = row.painted_selection = self.selection_for(row)
+        background = colors['highlight'] if selected else colors['card_bg']
+        self.canvas.itemconfigure(row.rect, fill=background)
+        # El texto también: las filas creadas después del último cambio de tema no lo tienen
+        self.canvas.itemconfigure(row.text, fill=colors['fg'])
+        for position, (icon_rect, icon) in enumerate(zip(row.icon_rects, row.icons)):
+            icon_selected = selected and position == self.selected_icon
+            self.canvas.itemconfigure(icon_rect, fill=colors['icon_highlight'] if icon_selected else background)
+            self.canvas.itemconfigure(icon, fill=colors['fg'])
+
+    def set_selection(self, index, icon=None):
+        """Selecciona la fila index (y opcionalmente un icono); None quita la selección."""
+        previous = self.selected_index
+        self.selected_index = index
+        self.selected_icon = icon
+        for changed in {previous, index}:
+            row = self.widget_at(changed) if changed is not None else None
+            if row is not None:
+                self.paint_row(row)
+
+    def apply_theme(self):
+        # Todo el tema en unas pocas llamadas por etiqueta
+        colors = self.palette()
+        self.canvas.itemconfigure('card_rect', fill=colors['card_bg'])
+        self.canvas.itemconfigure('card_icon_bg', fill=colors['card_bg'])
+        self.canvas.itemconfigure('card_text', fill=colors['fg'])
+        self.canvas.itemconfigure('card_icon', fill=colors['fg'])
+        self.set_selection(self.selected_index, self.selected_icon)
+
+    # ------------------------------------------------------------------
+
+    def hit_test(self, x, y):
+        """(índice, icono o None) para un punto en coordenadas del canvas en pantalla."""
+        canvas_x = self.canvas.canvasx(x)
+        canvas_y = self.canvas.canvasy(y)
+        index = row_at(self.offsets, canvas_y)
+        if index is None:
+            return None, None
+        if canvas_y > self.offsets[index + 1] - self.spacing:
+            return None, None  # Clic en el espacio entre tarjetas
+        icons_left = self.padx + self.row_width() - len(self.icon_texts) * self.icon_width
+        if canvas_x >= icons_left:
+            icon = int((canvas_x - icons_left) // self.icon_width)
+            return index, min(icon, len(self.icon_texts) - 1)
+        return index, None
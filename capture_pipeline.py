@@ -0,0 +1,73 @@
+# capture_pipeline.py
+
+import queue
+import threading
+
+
+class CapturePipeline:
+    """
+    El hilo de captura produce items en una cola acotada y el hilo de Tk los
+    consume por lotes: una mutación, un refresco y un guardado por lote.
+    Si la cola se llena, el productor espera (contrapresión) en lugar de
+    seguir leyendo el portapapeles.
+    """
+
+    def __init__(self, capture, schedule, consume_batch, maxsize=64, batch_size=32):
+        self.capture = capture              # Devuelve un item capturado o None
+        self.schedule = schedule            # Programa una función en el hilo de Tk
+        self.consume_batch = consume_batch  # Recibe la lista de items del lote
+        self.queue = queue.Queue(maxsize)
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.drain_scheduled = False
+
+        # Métricas
+        self.captured = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.backpressure_waits = 0
+
+    def run(self):
+        while True:
+            try:
+                captured = self.capture()
+                if captured:
+                    self.offer(captured)
+            except Exception as e:
+                print(f"Error en la captura del portapapeles: {e}")
+
+    def offer(self, captured):
+        while True:
+            try:
+                self.queue.put(captured, timeout=0.5)
+                break
+            except queue.Full:
+                # Cola llena: la captura se detiene hasta que la interfaz consuma
+                self.backpressure_waits += 1
+                self.request_drain()
+        self.captured += 1
+        self.request_drain()
+
+    def request_drain(self):
+        # Una sola llamada pendiente en la cola de eventos de Tk, sin importar cuántos items lleguen
+        with self.lock:
+            if self.drain_scheduled:
+                return
+            self.drain_scheduled = True
+        self.schedule(self.drain)
+
+    def drain(self):
+        with self.lock:
+            self.drain_scheduled = False
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.consume_batch(batch)
+        if not self.queue.empty():
+            self.request_drain()
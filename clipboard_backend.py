@@ -0,0 +1,262 @@
+# clipboard_backend.py
+
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+from utils import content_digest
+
+
+WM_CLIPBOARDUPDATE = 0x031D
+
+
+class ClipboardBackend(ABC):
+    @abstractmethod
+    def read(self):
+        """Devuelve {'text': ..., 'formatted': ...} o None si no hay texto."""
+        pass
+
+    @abstractmethod
+    def wait_for_change(self, timeout=None):
+        """Bloquea hasta que el portapapeles cambie; True si cambió antes del timeout."""
+        pass
+
+    def get_change_token(self):
+        """Valor barato que cambia con cada modificación del portapapeles (None si no hay)."""
+        return None
+
+    def idle_wakeups_per_minute(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+def read_win32_clipboard():
+    import win32con  # type: ignore
+    import win32clipboard  # type: ignore
+
+    # Definir CF_HTML ya que no está en win32con
+    cf_html = win32clipboard.RegisterClipboardFormat("HTML Format")
+    try:
+        win32clipboard.OpenClipboard()
+        formats = []
+        format_id = win32clipboard.EnumClipboardFormats(0)
+        while format_id:
+            formats.append(format_id)
+            format_id = win32clipboard.EnumClipboardFormats(format_id)
+
+        text = None
+        formatted = None
+
+        if win32con.CF_UNICODETEXT in formats:
+            text = win32clipboard.GetClipboardData(win32con.CF_UNICODETEXT)
+
+        if win32con.CF_RTF in formats:
+            formatted = win32clipboard.GetClipboardData(win32con.CF_RTF)
+        elif cf_html in formats:
+            formatted = win32clipboard.GetClipboardData(cf_html)
+
+        win32clipboard.CloseClipboard()
+
+        if formatted:
+            if isinstance(formatted, bytes):
+                formatted = formatted.decode('utf-8', errors='ignore')
+
+        return {'text': text, 'formatted': formatted} if text else None
+    except Exception as e:
+        print(f"Error al obtener texto del portapapeles: {e}")
+        return None
+
+
+def win32_clipboard_sequence_number():
+    import win32clipboard  # type: ignore
+    # No abre el portapapeles ni lee su contenido
+    return win32clipboard.GetClipboardSequenceNumber()
+
+
+class PollingClipboardBackend(ClipboardBackend):
+    """
+    Alternativa de respaldo sin notificaciones. Cada consulta solo lee un token de
+    cambio barato; el contenido se lee cuando el token cambia. El intervalo es corto
+    justo después de un cambio y crece hasta max_interval mientras no pasa nada.
+    Sin token se lee el contenido y se compara su huella, con el mismo retroceso.
+    """
+
+    def __init__(self, min_interval=0.1, max_interval=2.0, backoff=1.5,
+                 token_source=win32_clipboard_sequence_number, reader=read_win32_clipboard):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.token_source = token_source
+        self.reader = reader
+        self.interval = min_interval
+        self.last_token = None
+        self.last_digest = None
+        self.prefetched = None  # Contenido ya leído al comparar huellas; read() lo entrega
+        self.idle_wakeups = deque()  # Momentos de las consultas sin cambios
+
+    def read(self):
+        if self.prefetched is not None:
+            content, self.prefetched = self.prefetched, None
+            return content
+        return self.reader()
+
+    def content_changed(self):
+        content = self.reader()
+        digest = content_digest(content) if content else None
+        if digest == self.last_digest:
+            return False
+        self.last_digest = digest
+        self.prefetched = content
+        return True
+
+    def get_change_token(self):
+        try:
+            return self.token_source()
+        except Exception as e:
+            print(f"Error al leer el token del portapapeles: {e}")
+            return None
+
+    def wait_for_change(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+                if delay <= 0:
+                    return False
+            time.sleep(delay)
+
+            token = self.get_change_token()
+            changed = self.content_changed() if token is None else token != self.last_token
+            if changed:
+                self.last_token = token
+                self.interval = self.min_interval
+                return True
+
+            now = time.monotonic()
+            self.idle_wakeups.append(now)
+            while self.idle_wakeups and now - self.idle_wakeups[0] > 60:
+                self.idle_wakeups.popleft()
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+    def idle_wakeups_per_minute(self):
+        now = time.monotonic()
+        while self.idle_wakeups and now - self.idle_wakeups[0] > 60:
+            self.idle_wakeups.popleft()
+        return len(self.idle_wakeups)
+
+
+class Win32ListenerBackend(ClipboardBackend):
+    """
+    Recibe WM_CLIPBOARDUPDATE en una ventana de solo mensajes registrada con
+    AddClipboardFormatListener, así el hilo de captura solo despierta con cambios reales.
+    """
+
+    def __init__(self):
+        self.changed = threading.Event()
+        self.changed.set()  # Leer el contenido que ya había al iniciar
+        self.ready = threading.Event()
+        self.error = None
+        self.hwnd = None
+        self.thread_id = None
+        self.thread = threading.Thread(target=self.run_message_loop, daemon=True)
+        self.thread.start()
+        self.ready.wait(5)
+        if self.error or not self.hwnd:
+            raise RuntimeError(f"No se pudo registrar el listener del portapapeles: {self.error}")
+
+    def run_message_loop(self):
+        try:
+            import ctypes
+            import win32api  # type: ignore
+            import win32con  # type: ignore
+            import win32gui  # type: ignore
+
+            self.thread_id = win32api.GetCurrentThreadId()
+            window_class = win32gui.WNDCLASS()
+            window_class.lpfnWndProc = self.window_procedure
+            window_class.lpszClassName = 'PortapapelesClipboardListener'
+            window_class.hInstance = win32api.GetModuleHandle(None)
+            class_atom = win32gui.RegisterClass(window_class)
+            self.hwnd = win32gui.CreateWindow(class_atom, 'PortapapelesClipboardListener', 0, 0, 0, 0, 0,
+                                              win32con.HWND_MESSAGE, 0, window_class.hInstance, None)
+            if not ctypes.windll.user32.AddClipboardFormatListener(self.hwnd):
+                raise ctypes.WinError()
+        except Exception as e:
+            self.error = e
+            self.hwnd = None
+            self.ready.set()
+            return
+        self.ready.set()
+        win32gui.PumpMessages()
+
+    def window_procedure(self, hwnd, message, wparam, lparam):
+        import win32gui  # type: ignore
+        if message == WM_CLIPBOARDUPDATE:
+            self.changed.set()
+            return 0
+        return win32gui.DefWindowProc(hwnd, message, wparam, lparam)
+
+    def read(self):
+        return read_win32_clipboard()
+
+    def wait_for_change(self, timeout=None):
+        if not self.changed.wait(timeout):
+            return False
+        self.changed.clear()
+        return True
+
+    def close(self):
+        import ctypes
+        import win32api  # type: ignore
+        import win32con  # type: ignore
+        if self.hwnd:
+            ctypes.windll.user32.RemoveClipboardFormatListener(self.hwnd)
+        if self.thread_id:
+            win32api.PostThreadMessage(self.thread_id, win32con.WM_QUIT, 0, 0)
+
+
+class FakeClipboardBackend(ClipboardBackend):
+    """Portapapeles en memoria para probar y medir la captura sin Windows."""
+
+    def __init__(self):
+        self.content = None
+        self.changed = threading.Event()
+        self.lock = threading.Lock()
+        self.reads = 0
+        self.sequence_number = 0
+
+    def set_content(self, text, formatted=None):
+        with self.lock:
+            self.content = {'text': text, 'formatted': formatted} if text else None
+            self.sequence_number += 1
+        self.changed.set()
+
+    def get_change_token(self):
+        return self.sequence_number
+
+    def read(self):
+        with self.lock:
+            self.reads += 1
+            return dict(self.content) if self.content else None
+
+    def wait_for_change(self, timeout=None):
+        if not self.changed.wait(timeout):
+            return False
+        self.changed.clear()
+        return True
+
+
+def create_clipboard_backend(kind='auto', min_interval=0.1, max_interval=2.0):
+    if kind == 'fake' or (kind == 'auto' and sys.platform != 'win32'):
+        return FakeClipboardBackend()
+    if kind in ('auto', 'listener'):
+        try:
+            return Win32ListenerBackend()
+        except Exception as e:
+            print(f"{e}; se usará la consulta periódica")
+    return PollingClipboardBackend(min_interval, max_interval)
@@ -3,66 +3,355 @@
 import json
 import os
 import base64
+import binascii
+import threading
+
+from blob_store import BlobStore
+from group_index import items_by_id
+from utils import file_size
+
+
+DEFAULT_SETTINGS = {
+    'height': 400,
+    'width': 295,
+    'hotkey': 'v'
+}
+
+# Secciones cuyos valores son items del historial: los anclados y los recientes sin anclar
+ITEM_SECTIONS = ('pinned_items', 'history')
 
 
 class DataManager:
-    def __init__(self, file_path='clipboard_data.json'):
+    """
+    Persistencia en dos partes: una instantánea completa (clipboard_data.json)
+    y un diario (journal) de solo-anexado con un registro JSON por línea.
+    Cada cambio se anexa al diario; una compactación en segundo plano pliega
+    el diario en una nueva instantánea.
+    """
+
+    def __init__(self, file_path='clipboard_data.json', compact_threshold=200):
         self.file_path = file_path
+        self.blob_store = BlobStore(os.path.join(os.path.dirname(os.path.abspath(file_path)), 'clipboard_blobs'))
+        self.journal_path = os.path.splitext(file_path)[0] + '.journal'
+        self.compacting_path = self.journal_path + '.compacting'
+        self.compact_threshold = compact_threshold  # Registros antes de compactar
+
+        self.journal_records = 0
+        self.persisted_keys = {'groups': set(), 'pinned_items': set(), 'history': set()}
+        self.record_refs = {}  # (sección, clave) -> blobs referenciados por ese registro
+        self.journal_lock = threading.Lock()   # Protege los anexos al diario
+        self.snapshot_lock = threading.Lock()  # Protege la escritura de la instantánea
+        self.compaction_thread = None
+        self.known_signature = None  # Estado en disco tras la última lectura o escritura propia
 
-    def save_data(self, groups, pinned_items, settings):
+    def save_data(self, groups, items, settings):
+        # Escritura completa: nueva instantánea y diario vacío
         data = {
-            'groups': groups,
-            'pinned_items': self.encode_pinned_items(pinned_items),
+            'groups': {k: self.encode_group(v) for k, v in groups.items()},
+            'pinned_items': {k: self.encode_item(v) for k, v in items.items() if v.get('pinned')},
+            'history': {k: self.encode_item(v) for k, v in items.items() if not v.get('pinned')},
             'settings': settings
         }
-        with open(self.file_path, 'w') as f:
-            json.dump(data, f, indent=4)
+        with self.snapshot_lock:
+            with self.journal_lock:
+                self.write_snapshot(data)
+                for path in (self.journal_path, self.compacting_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self.journal_records = 0
+                self.persisted_keys = {section: set(data[section]) for section in ('groups',) + ITEM_SECTIONS}
+                self.record_refs = {}
+                for section in self.persisted_keys:
+                    for key, value in data[section].items():
+                        self.record_refs[(section, key)] = self.value_refs(section, value)
+                self.blob_store.reset_refs(d for refs in self.record_refs.values() for d in refs)
+                self.known_signature = self.signature()
+            self.blob_store.collect_garbage()
         print(f"All data saved to {self.file_path}")
 
     def load_data(self):
+        data = self.read_snapshot()
+        for path in (self.compacting_path, self.journal_path):
+            self.replay_journal(data, path)
+        with self.journal_lock:
+            self.journal_records = self.count_records(self.journal_path)
+            self.known_signature = self.signature()
+
+        self.record_refs = {}
+        groups, items, settings = self.decode_data(data, self.record_refs)
+        self.blob_store.reset_refs(d for refs in self.record_refs.values() for d in refs)
+
+        self.persisted_keys = {section: set(data.get(section, {})) for section in ('groups',) + ITEM_SECTIONS}
+        if self.journal_records >= self.compact_threshold:
+            self.start_compaction()
+
+        return groups, items, settings
+
+    def read_data(self):
+        """Como load_data, pero sin compactar ni escribir nada: para migrar a otro backend."""
+        data = self.read_snapshot()
+        for path in (self.compacting_path, self.journal_path):
+            self.replay_journal(data, path)
+        return self.decode_data(data, {})
+
+    def decode_data(self, data, record_refs):
+        """(grupos, items del historial en memoria, configuración); los anclados van primero."""
+        # Un mismo contenido con formato se decodifica una vez y se comparte
+        blob_cache = {}
+        decoded = {'groups': {}, 'pinned_items': {}, 'history': {}}
+        for section in decoded:
+            for key, value in data.get(section, {}).items():
+                refs = []
+                decoded[section][key] = self.decode_value(section, value, refs, blob_cache)
+                record_refs[(section, key)] = refs
+        items = {**decoded['pinned_items'], **decoded['history']}
+        return decoded['groups'], items, data.get('settings', dict(DEFAULT_SETTINGS))
+
+    # ------------------------------------------------------------------
+    # Diario
+
+    def put(self, section, key, value):
+        """Anexa al diario el nuevo valor de groups[key], pinned_items[key], history[key] o settings."""
+        value = self.encode_value(section, value)
+        self.append_records([{'op': 'put', 'section': section, 'key': key, 'value': value}])
+
+    def delete(self, section, key):
+        """Anexa al diario el borrado de una clave; se omite si nunca fue guardada."""
+        if key not in self.persisted_keys.get(section, ()):
+            return
+        self.append_records([{'op': 'delete', 'section': section, 'key': key}])
+
+    def save_settings(self, settings):
+        self.put('settings', None, settings)
+
+    def apply_changes(self, changes):
+        """Anexa varios cambios (op, sección, clave, valor) en una sola escritura."""
+        records = []
+        for op, section, key, value in changes:
+            if op == 'put':
+                records.append({'op': 'put', 'section': section, 'key': key,
+                                'value': self.encode_value(section, value)})
+            elif key in self.persisted_keys.get(section, ()):
+                records.append({'op': 'delete', 'section': section, 'key': key})
+        self.append_records(records)
+
+    def append_records(self, records):
+        if not records:
+            return
+        lines = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+        with self.journal_lock:
+            with open(self.journal_path, 'a') as f:
+                f.write(lines)
+            self.journal_records += len(records)
+            self.known_signature = self.signature()
+            for record in records:
+                keys = self.persisted_keys.get(record['section'])
+                if keys is None:
+                    continue
+                ref_key = (record['section'], record['key'])
+                self.blob_store.decref(self.record_refs.pop(ref_key, []))
+                if record['op'] == 'put':
+                    keys.add(record['key'])
+                    refs = self.value_refs(record['section'], record['value'])
+                    self.record_refs[ref_key] = refs
+                    self.blob_store.incref(refs)
+                else:
+                    keys.discard(record['key'])
+            needs_compaction = self.journal_records >= self.compact_threshold
+        if needs_compaction:
+            self.start_compaction()
+
+    def replay_journal(self, data, path):
+        if not os.path.exists(path):
+            return
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Línea incompleta por un cierre inesperado: se ignora
+                    continue
+                self.apply_record(data, record)
+
+    def apply_record(self, data, record):
+        section = record['section']
+        if section == 'settings':
+            data['settings'] = record['value']
+        elif record['op'] == 'put':
+            values = data.setdefault(section, {})
+            if section == 'history':
+                # El historial sigue el orden de llegada: el último guardado de un item lo lleva al final
+                values.pop(record['key'], None)
+            values[record['key']] = record['value']
+        else:
+            data.setdefault(section, {}).pop(record['key'], None)
+
+    def signature(self):
+        # (mtime, tamaño) de la instantánea y de los diarios
+        signature = []
+        for path in (self.file_path, self.compacting_path, self.journal_path):
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def disk_usage(self):
+        return {
+            'snapshot': file_size(self.file_path),
+            'journal': file_size(self.journal_path) + file_size(self.compacting_path),
+            'blobs': self.blob_store.disk_usage(),
+        }
+
+    def changed_on_disk(self):
+        with self.journal_lock:
+            return self.signature() != self.known_signature
+
+    def value_refs(self, section, value):
+        items = items_by_id(value.get('items', [])).values() if section == 'groups' else [value]
+        return [item['text']['formatted_ref'] for item in items
+                if isinstance(item.get('text'), dict) and 'formatted_ref' in item['text']]
+
+    def count_records(self, path):
+        if not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as f:
+            return sum(1 for _ in f)
+
+    # ------------------------------------------------------------------
+    # Compactación
+
+    def start_compaction(self):
+        if self.compaction_thread and self.compaction_thread.is_alive():
+            return
+        self.compaction_thread = threading.Thread(target=self.compact, daemon=True)
+        self.compaction_thread.start()
+
+    def compact(self):
+        with self.snapshot_lock:
+            with self.journal_lock:
+                # Si una compactación anterior quedó a medias, su diario se pliega primero
+                if not os.path.exists(self.compacting_path):
+                    if not os.path.exists(self.journal_path):
+                        return
+                    os.replace(self.journal_path, self.compacting_path)
+                    self.journal_records = 0
+
+            # Los nuevos cambios siguen anexándose al diario mientras se pliega
+            data = self.read_snapshot()
+            self.replay_journal(data, self.compacting_path)
+            self.migrate_legacy_payloads(data)
+            self.write_snapshot(data)
+            with self.journal_lock:
+                os.remove(self.compacting_path)
+                self.known_signature = self.signature()
+            self.blob_store.collect_garbage()
+        print(f"Journal compacted into {self.file_path}")
+
+    def read_snapshot(self):
         if not os.path.exists(self.file_path):
-            return {}, {}, {
-                'height': 400,
-                'width': 295,
-                'hotkey': 'v'
-            }
-        
+            return {'groups': {}, 'pinned_items': {}, 'history': {}, 'settings': dict(DEFAULT_SETTINGS)}
         with open(self.file_path, 'r') as f:
-            data = json.load(f)
-        
-        groups = data.get('groups', {})
-        pinned_items = self.decode_pinned_items(data.get('pinned_items', {}))
-        settings = data.get('settings', {
-            'height': 400,
-            'width': 295,
-            'hotkey': 'v'
-        })
-        
-        return groups, pinned_items, settings
-
-    def encode_pinned_items(self, pinned_items):
-        encoded_items = {}
-        for item_id, item_data in pinned_items.items():
-            encoded_item = item_data.copy()
-            if isinstance(item_data['text'], dict) and 'formatted' in item_data['text']:
-                formatted_data = item_data['text']['formatted']
-                if isinstance(formatted_data, str):
-                    # Si ya es una cadena, la codificamos directamente
-                    encoded_item['text']['formatted'] = base64.b64encode(formatted_data.encode('utf-8')).decode('utf-8')
-                elif isinstance(formatted_data, bytes):
-                    # Si ya es bytes, la codificamos directamente
-                    encoded_item['text']['formatted'] = base64.b64encode(formatted_data).decode('utf-8')
-                else:
-                    # Si no es ni str ni bytes, convertimos a str y luego codificamos
-                    encoded_item['text']['formatted'] = base64.b64encode(str(formatted_data).encode('utf-8')).decode('utf-8')
-            encoded_items[item_id] = encoded_item
-        return encoded_items
-
-    def decode_pinned_items(self, encoded_items):
-        decoded_items = {}
-        for item_id, item_data in encoded_items.items():
-            decoded_item = item_data.copy()
-            if isinstance(item_data['text'], dict) and 'formatted' in item_data['text']:
-                decoded_item['text']['formatted'] = base64.b64decode(item_data['text']['formatted'].encode('utf-8'))
-            decoded_items[item_id] = decoded_item
-        return decoded_items
\ No newline at end of file
+            return json.load(f)
+
+    def write_snapshot(self, data):
+        # Escritura atómica: archivo temporal + renombrado
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, self.file_path)
+
+    # ------------------------------------------------------------------
+    # Contenidos con formato: se guardan en el BlobStore y aquí solo queda la referencia
+
+    def encode_value(self, section, value):
+        if section in ITEM_SECTIONS:
+            return self.encode_item(value)
+        if section == 'groups':
+            return self.encode_group(value)
+        return value
+
+    def encode_group(self, group):
+        encoded_group = dict(group)
+        # En disco los items del grupo siguen siendo una lista ordenada
+        encoded_group['items'] = [self.encode_item(item) for item in items_by_id(group.get('items', [])).values()]
+        return encoded_group
+
+    def encode_item(self, item_data):
+        # Copia sin modificar el diccionario compartido con el historial
+        encoded_item = dict(item_data)
+        text = item_data.get('text')
+        if isinstance(text, dict) and text.get('formatted') is not None:
+            encoded_text = dict(text)
+            formatted_data = encoded_text.pop('formatted')
+            if not isinstance(formatted_data, (str, bytes)):
+                formatted_data = str(formatted_data)
+            encoded_text['formatted_ref'] = self.blob_store.put(formatted_data)
+            encoded_item['text'] = encoded_text
+        return encoded_item
+
+    def decode_value(self, section, value, refs, blob_cache):
+        if section in ITEM_SECTIONS:
+            return self.decode_item(value, refs, blob_cache)
+        if section == 'groups':
+            decoded_group = dict(value)
+            decoded_group['items'] = {item_id: self.decode_item(item, refs, blob_cache)
+                                      for item_id, item in items_by_id(value.get('items', [])).items()}
+            return decoded_group
+        return value
+
+    def decode_item(self, item_data, refs, blob_cache):
+        text = item_data.get('text')
+        if not isinstance(text, dict):
+            return item_data
+        decoded_text = dict(text)
+        if 'formatted_ref' in decoded_text:
+            digest = decoded_text.pop('formatted_ref')
+            if digest not in blob_cache:
+                payload = self.blob_store.get(digest)
+                blob_cache[digest] = payload.decode('utf-8', errors='ignore') if payload is not None else None
+            decoded_text['formatted'] = blob_cache[digest]
+            refs.append(digest)
+        elif isinstance(decoded_text.get('formatted'), str):
+            # Formato antiguo: contenido en línea, codificado en base64 una o varias veces
+            payload = self.unwrap_legacy_payload(decoded_text['formatted'])
+            decoded_text['formatted'] = payload.decode('utf-8', errors='ignore')
+            refs.append(self.blob_store.digest(payload))
+        decoded_item = dict(item_data)
+        decoded_item['text'] = decoded_text
+        return decoded_item
+
+    def migrate_legacy_payloads(self, data):
+        # Mueve al BlobStore los contenidos en línea que aún queden en la instantánea
+        for section in ('groups',) + ITEM_SECTIONS:
+            for key, value in data.get(section, {}).items():
+                items = items_by_id(value.get('items', [])).values() if section == 'groups' else [value]
+                for item in items:
+                    text = item.get('text')
+                    if isinstance(text, dict) and isinstance(text.get('formatted'), str):
+                        payload = self.unwrap_legacy_payload(text.pop('formatted'))
+                        text['formatted_ref'] = self.blob_store.put(payload)
+
+    @staticmethod
+    def unwrap_legacy_payload(value):
+        # El guardado antiguo siempre agregaba una capa de base64 y, como modificaba el item en
+        # memoria, cada guardado posterior de la misma sesión agregaba otra. El contenido original
+        # es texto RTF o HTML: solo se quita otra capa si lo que queda es base64 de un texto legible
+        data = value.encode('utf-8') if isinstance(value, str) else value
+        try:
+            data = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError):
+            return data
+        while data:
+            try:
+                inner = base64.b64decode(data, validate=True)
+                text = inner.decode('utf-8')
+            except (binascii.Error, ValueError):
+                break
+            # CF_HTML termina en NUL: no cuenta como ilegible
+            visible = text.rstrip('\x00').replace('\r', '').replace('\n', '').replace('\t', '')
+            if not visible or not visible.isprintable():
+                break
+            data = inner
+        return data
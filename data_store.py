@@ -0,0 +1,35 @@
+# data_store.py
+
+
+class DataStore:
+    """
+    Copia única en memoria de grupos, items del historial y configuración.
+    Todos los managers reciben los mismos objetos; el archivo solo se vuelve
+    a leer si cambió en disco por algo ajeno a esta instancia.
+    """
+
+    def __init__(self, data_manager):
+        self.data_manager = data_manager
+        self.groups = None
+        self.items = None
+        self.settings = None
+        self.load_count = 0
+
+    def load(self):
+        if self.groups is not None and not self.data_manager.changed_on_disk():
+            return self.groups, self.items, self.settings
+
+        groups, items, settings = self.data_manager.load_data()
+        self.load_count += 1
+        print(f"Datos cargados desde disco ({self.load_count} lecturas)")
+
+        if self.groups is None:
+            self.groups, self.items, self.settings = groups, items, settings
+        else:
+            # Se actualizan en su lugar para que los managers conserven sus referencias
+            self.groups.clear()
+            self.groups.update(groups)
+            self.items.clear()
+            self.items.update(items)
+            self.settings.update(settings)
+        return self.groups, self.items, self.settings
@@ -0,0 +1,182 @@
+# eviction.py
+
+import sys
+import time
+
+from indexed_heap import IndexedHeap
+
+
+def item_bytes(item):
+    """Memoria aproximada del contenido de un item (texto y formato)."""
+    text = item.get('text')
+    size = 0
+    if isinstance(text, dict):
+        size += sys.getsizeof(text.get('text') or '')
+        if text.get('formatted') is not None:
+            size += sys.getsizeof(text['formatted'])
+    elif text is not None:
+        size += sys.getsizeof(text)
+    if item.get('formatted') is not None:
+        size += sys.getsizeof(item['formatted'])
+    return size
+
+
+def item_time(item, field):
+    usage = item.get('usage') or {}
+    return usage.get(field) or item.get('created_at') or 0.0
+
+
+class MaxItems:
+    """No más de limit items en el historial (contando los anclados)."""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def next_victim(self, engine, now):
+        return engine.victim() if engine.count > self.limit else None
+
+
+class MaxTotalBytes:
+    """El contenido de todo el historial no supera limit bytes."""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def next_victim(self, engine, now):
+        return engine.victim() if engine.total_bytes > self.limit else None
+
+
+class MaxItemBytes:
+    """Ningún item no anclado ocupa más de limit bytes; se descartan del más grande al más chico."""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def next_victim(self, engine, now):
+        top = engine.largest.peek()
+        return top[0] if top and -top[1] > self.limit else None
+
+
+class MaxAge:
+    """Los items sin usar durante max_age segundos caducan."""
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+
+    def next_victim(self, engine, now):
+        top = engine.orders['lru'].peek()
+        return top[0] if top and top[1] < now - self.max_age else None
+
+
+class EvictionEngine:
+    """
+    Descarte del historial con políticas intercambiables. Los items no anclados
+    están en heaps indexados por orden de llegada, por último uso y por tamaño
+    (la frecencia la lleva su propio tracker), así cada alta, uso o descarte
+    cuesta O(log n). Cada política solo pregunta si se excede su límite y cuál
+    es la siguiente víctima.
+    """
+
+    def __init__(self, policies, order='oldest', frecency=None):
+        self.policies = policies
+        self.order = order        # 'oldest', 'lru' o 'frecency': qué item se descarta primero
+        self.frecency = frecency
+        self.orders = {'oldest': IndexedHeap(), 'lru': IndexedHeap()}
+        self.largest = IndexedHeap()  # -bytes: el más grande arriba
+        self.sizes = {}      # id del item -> bytes
+        self.pinned = set()
+        self.total_bytes = 0
+        self.sequence = 0    # Orden de llegada
+        self.evicted = 0
+
+    @property
+    def count(self):
+        return len(self.sizes)
+
+    def track(self, item_id, item, now=None):
+        """Alta o actualización de un item (contenido, anclaje o uso)."""
+        now = time.time() if now is None else now
+        item.setdefault('created_at', now)
+        size = item_bytes(item)
+        self.total_bytes += size - self.sizes.get(item_id, 0)
+        self.sizes[item_id] = size
+        if item.get('pinned'):
+            self.pinned.add(item_id)
+            self.remove_from_orders(item_id)
+            return
+        self.pinned.discard(item_id)
+        if item_id not in self.orders['oldest']:
+            self.sequence += 1
+            self.orders['oldest'].push(item_id, self.sequence)
+        self.orders['lru'].push(item_id, item_time(item, 'last_used'))
+        self.largest.push(item_id, -size)
+
+    def touch(self, item_id, item, moved=False):
+        """Un uso del item; moved indica que pasó a la posición más reciente del historial."""
+        if item_id in self.orders['lru']:
+            self.orders['lru'].push(item_id, item_time(item, 'last_used'))
+            if moved:
+                # 'oldest' sigue el orden del historial: al copiarlo de nuevo es el último en llegar
+                self.sequence += 1
+                self.orders['oldest'].push(item_id, self.sequence)
+
+    def forget(self, item_id):
+        self.total_bytes -= self.sizes.pop(item_id, 0)
+        self.pinned.discard(item_id)
+        self.remove_from_orders(item_id)
+
+    def remove_from_orders(self, item_id):
+        for heap in self.orders.values():
+            heap.remove(item_id)
+        self.largest.remove(item_id)
+
+    def clear(self):
+        for heap in self.orders.values():
+            heap.clear()
+        self.largest.clear()
+        self.sizes = {}
+        self.pinned = set()
+        self.total_bytes = 0
+
+    def victim(self):
+        if self.order == 'frecency' and self.frecency is not None:
+            return self.frecency.least_useful()
+        top = self.orders.get(self.order, self.orders['oldest']).peek()
+        return top[0] if top else None
+
+    def enforce(self, now=None):
+        """Ids a descartar para cumplir todas las políticas; ya salen del motor."""
+        now = time.time() if now is None else now
+        evicted = []
+        for policy in self.policies:
+            while True:
+                victim = policy.next_victim(self, now)
+                if victim is None:
+                    break
+                self.forget(victim)
+                if self.frecency is not None:
+                    self.frecency.forget(victim)
+                evicted.append(victim)
+        self.evicted += len(evicted)
+        return evicted
+
+    def stats(self):
+        pinned_bytes = sum(self.sizes[item_id] for item_id in self.pinned)
+        return {
+            'items': self.count,
+            'pinned_items': len(self.pinned),
+            'history_bytes': self.total_bytes - pinned_bytes,
+            'pinned_bytes': pinned_bytes,
+            'evicted': self.evicted,
+        }
+
+
+def create_eviction_engine(settings, frecency=None):
+    policies = [MaxItems(settings.get('max_items', 20))]
+    if settings.get('max_item_bytes'):
+        policies.insert(0, MaxItemBytes(settings['max_item_bytes']))
+    if settings.get('max_age_days'):
+        policies.append(MaxAge(settings['max_age_days'] * 86400))
+    if settings.get('max_total_bytes'):
+        policies.append(MaxTotalBytes(settings['max_total_bytes']))
+    return EvictionEngine(policies, settings.get('eviction_policy', 'oldest'), frecency)
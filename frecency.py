@@ -0,0 +1,113 @@
+# frecency.py
+
+import bisect
+import heapq
+import math
+import time
+from operator import itemgetter
+
+from indexed_heap import IndexedHeap
+
+USE_WEIGHTS = {'copy': 1.0, 'paste': 2.0}  # Pegar un item pesa más que copiarlo otra vez
+
+
+class FrecencyTracker:
+    """
+    Frecuencia y recencia de uso en un solo número. Cada uso suma w·e^(λ·t); en
+    lugar del puntaje, que decae con el tiempo, se guarda su logaritmo dividido
+    por λ (un "instante equivalente"). Así el orden entre items no cambia con el
+    paso del tiempo y cada uso solo actualiza su propia entrada del heap y de la
+    lista ordenada que se muestra.
+    """
+
+    def __init__(self, half_life_hours=72):
+        self.rate = math.log(2) / (half_life_hours * 3600)
+        self.heap = IndexedHeap()  # items no anclados, el menos útil arriba
+        self.order = []     # [(valor, secuencia, clave)] de todos los items, del menos al más útil
+        self.entries = {}   # clave -> su entrada en order
+        self.sequence = 0   # A igual valor, el último actualizado se muestra primero
+        self.ranked_keys = None
+
+    def usage(self, item):
+        return item.setdefault('usage', {'copies': 0, 'pastes': 0, 'last_used': None, 'frecency': 0.0})
+
+    def value(self, item):
+        usage = item.get('usage')
+        return usage['frecency'] if usage else 0.0
+
+    def add_use(self, value, now, weight):
+        # log-suma-exp en unidades de tiempo: estable aunque los instantes sean grandes
+        new = now + math.log(weight) / self.rate
+        if not value:
+            return new
+        high, low = max(value, new), min(value, new)
+        return high + math.log1p(math.exp((low - high) * self.rate)) / self.rate
+
+    def score(self, item, now=None):
+        """Puntaje actual: suma de los pesos de cada uso, con vida media half_life_hours."""
+        value = self.value(item)
+        if not value:
+            return 0.0
+        now = time.time() if now is None else now
+        return math.exp((value - now) * self.rate)
+
+    def record(self, item_id, item, kind, now=None):
+        now = time.time() if now is None else now
+        usage = self.usage(item)
+        usage['copies' if kind == 'copy' else 'pastes'] += 1
+        usage['last_used'] = now
+        usage['frecency'] = self.add_use(usage['frecency'], now, USE_WEIGHTS[kind])
+        self.track(item_id, item)
+
+    def track(self, item_id, item):
+        # Solo los items no anclados pueden descartarse; el orden mostrado incluye a todos
+        value = self.value(item)
+        if item.get('pinned'):
+            self.heap.remove(item_id)
+        else:
+            self.heap.push(item_id, value)
+        entry = self.entries.get(item_id)
+        if entry is not None and entry[0] == value:
+            return
+        self.remove_entry(item_id)
+        self.sequence += 1
+        entry = self.entries[item_id] = (value, self.sequence, item_id)
+        bisect.insort(self.order, entry)
+        self.ranked_keys = None
+
+    def forget(self, item_id):
+        self.heap.remove(item_id)
+        self.remove_entry(item_id)
+
+    def remove_entry(self, item_id):
+        entry = self.entries.pop(item_id, None)
+        if entry is not None:
+            del self.order[bisect.bisect_left(self.order, entry)]
+            self.ranked_keys = None
+
+    def rebuild(self, items):
+        self.heap.clear()
+        self.order = []
+        self.entries = {}
+        self.ranked_keys = None
+        for item_id, item in items.items():
+            self.track(item_id, item)
+
+    def least_useful(self):
+        top = self.heap.peek()
+        return top[0] if top else None
+
+    def ranked(self):
+        """Claves de la más útil a la menos útil; la lista se reutiliza hasta el próximo cambio."""
+        if self.ranked_keys is None:
+            self.ranked_keys = [key for _, _, key in reversed(self.order)]
+        return self.ranked_keys
+
+    def ranked_with(self, others):
+        """
+        Como ranked, intercalando others: [(valor, clave)] de menos a más útil. Las dos
+        listas ya están ordenadas, así que se mezclan en un solo recorrido.
+        """
+        own = ((value, key) for value, _, key in reversed(self.order))
+        merged = heapq.merge(own, reversed(others), key=itemgetter(0), reverse=True)
+        return [key for _, key in merged]
@@ -1,17 +1,22 @@
 # functions.py
 
-import base64
 import tkinter as tk
 import uuid
-import win32con # type: ignore
-import win32clipboard # type: ignore
-import win32gui # type: ignore
-import time
 import sys
-from utils import measure_time, process_text
-
-# Definir CF_HTML ya que no está en win32con
-CF_HTML = win32clipboard.RegisterClipboardFormat("HTML Format")
+from capture_pipeline import CapturePipeline
+from eviction import create_eviction_engine, item_bytes
+from frecency import FrecencyTracker
+from fuzzy_search import ChainedCandidates, exact_score
+from history_archive import ArchiveCandidates, INDEX_RECORD, query_signature
+from clipboard_backend import create_clipboard_backend
+from utils import measure_time, content_digest, format_size
+
+FOOTPRINT_LABELS = {
+    'history': 'Historial', 'pinned': 'Anclados', 'groups': 'Grupos', 'previews': 'Vistas previas',
+    'search_index': 'Índice de búsqueda', 'archive_index': 'Índice del archivo',
+    'snapshot': 'Instantánea', 'journal': 'Diario', 'blobs': 'Contenidos con formato',
+    'database': 'Base de datos', 'wal': 'Registro WAL', 'archive': 'Archivo del historial',
+}
 
 class Functions:
     def __init__(self, manager):
@@ -19,224 +24,498 @@ class Functions:
         self.min_card_height = 40  # Altura mínima en píxeles (2 líneas + 2*2 padding)
         self.max_card_height = 76  # Altura máxima en píxeles (4 líneas + 2*2 padding)
         self.line_height = 18  # Altura estimada de una línea de texto
-
-
-    @measure_time
-    def create_card(self, item_id, item_data, index):
-        card_width = self.manager.window_width - 4  # Ajuste para el padding
-        card_height = max(self.min_card_height, self.calculate_card_height(item_data['text']))
-        
-        # Procesamos el texto para mostrarlo de forma limpia
-        if isinstance(item_data['text'], dict):
-            processed_text = process_text(item_data['text'].get('text', ''), 3)
-        else:
-            processed_text = process_text(str(item_data['text']), 3)
-        
-        # Obtén el color de fondo actual
-        current_theme = 'dark' if self.manager.is_dark_mode else 'light'
-        bg_color = self.manager.theme_manager.colors[current_theme]['card_bg']
-
-        card_container = tk.Frame(self.manager.cards_frame, width=card_width, height=card_height, bg=bg_color)
-        card_container.pack(fill=tk.BOTH, padx=2, pady=2)
+        self.content_index = {}  # Huella del texto -> id del item
+        self.item_digests = {}   # id del item -> huella del texto
+        self.candidates = []     # (clave, texto) que recibe la búsqueda difusa
+        self.candidates_version = None
+        self.ranking = None      # (ranking en memoria, versión del archivo, ranking con el archivo)
+        self.usage_unsaved = False  # Usos del historial sin anclar que aún no están en el diario
+        self.frecency = FrecencyTracker(self.manager.settings.get('frecency_half_life_hours', 72))
+        # Capacidad del historial: cantidad, bytes, tamaño por item y antigüedad
+        self.eviction = create_eviction_engine(self.manager.settings, self.frecency)
+        settings = self.manager.settings
+        self.clipboard_backend = create_clipboard_backend(settings.get('clipboard_backend', 'auto'),
+                                                          settings.get('poll_min_interval_ms', 100) / 1000,
+                                                          settings.get('poll_max_interval_ms', 2000) / 1000)
+        self.capture_pipeline = CapturePipeline(self.capture_once,
+                                                lambda callback: self.manager.root.after(0, callback),
+                                                self.add_clipboard_items,
+                                                settings.get('capture_queue_size', 64),
+                                                settings.get('capture_batch_size', 32))
+
+
+    def create_card(self):
+        # Tarjeta vacía; bind_card la asocia a un item y se reutiliza al desplazarse
+        styles = self.manager.theme_manager
+
+        card_container = tk.Frame(self.manager.canvas)
+        styles.style(card_container, 'card')
         card_container.pack_propagate(False)  # Evita que el contenido afecte el tamaño del contenedor
+        card_container.item_id = None
+        card_container.index = None
 
-        text_frame = tk.Frame(card_container, bg=bg_color)
+        text_frame = tk.Frame(card_container)
+        styles.style(text_frame, 'card')
         text_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
-        # Procesamos el texto para mostrarlo de forma limpia
-        processed_text = process_text(item_data['text'], 3)
-
-        text_label = tk.Label(text_frame, text=processed_text,
+        text_label = tk.Label(text_frame,
                             justify=tk.LEFT, anchor='w', padx=10, pady=5,
-                            bg=card_container['bg'],
-                            fg=self.manager.theme_manager.colors['dark' if self.manager.is_dark_mode else 'light']['fg'], width=int(24))
+                            width=int(24))
+        styles.style(text_label, 'card_text')
         text_label.pack(fill=tk.X, expand=True, side=tk.LEFT)
 
-        icons_frame = tk.Frame(card_container, bg=card_container['bg'])
+        icons_frame = tk.Frame(card_container)
+        styles.style(icons_frame, 'card')
         icons_frame.pack(side=tk.RIGHT, padx=3)
 
         arrow_button = tk.Button(icons_frame, text="➡️",
-                                command=lambda: self.on_arrow_click(item_id),
+                                command=lambda: self.on_arrow_click(card_container.item_id),
                                 font=('Segoe UI', 10), bd=0,
-                                padx=2,
-                                bg=card_container['bg'],
-                                fg=self.manager.theme_manager.colors['dark' if self.manager.is_dark_mode else 'light']['fg'])
+                                padx=2)
+        styles.style(arrow_button, 'card_button')
         arrow_button.pack(side=tk.LEFT)
         
-        pin_text = "📌" if item_data['pinned'] else "📍"
-        pin_button = tk.Button(icons_frame, text=pin_text,
-                            command=lambda: self.toggle_pin(item_id),
+        pin_button = tk.Button(icons_frame,
+                            command=lambda: self.toggle_pin(card_container.item_id),
                             font=('Segoe UI', 10), bd=0,
-                            padx=2,
-                            bg=card_container['bg'],
-                            fg=self.manager.theme_manager.colors['dark' if self.manager.is_dark_mode else 'light']['fg'])
+                            padx=2)
+        styles.style(pin_button, 'card_button')
         pin_button.pack(side=tk.LEFT)
 
         delete_button = tk.Button(icons_frame, text="✖️",
-                                command=lambda: self.delete_item(item_id),
+                                command=lambda: self.delete_item(card_container.item_id),
                                 font=('Segoe UI', 10), bd=0,
-                                padx=2,
-                                bg=card_container['bg'],
-                                fg=self.manager.theme_manager.colors['dark' if self.manager.is_dark_mode else 'light']['fg'])
+                                padx=2)
+        styles.style(delete_button, 'card_button')
         delete_button.pack(side=tk.LEFT)
-        
+
+        card_container.text_label = text_label
+        card_container.pin_button = pin_button
+        card_container.icons = [arrow_button, pin_button, delete_button]
         return card_container
+
+    def item_data(self, item_id):
+        # El historial reciente está en memoria; el antiguo se lee del archivo al mostrarlo
+        item_data = self.manager.clipboard_items.get(item_id)
+        if item_data is None and item_id in self.manager.history_archive:
+            item_data = self.manager.history_archive.get(item_id)
+        return item_data
+
+    def bind_card(self, card, item_id, index):
+        card.item_id = item_id
+        card.index = index
+        self.update_card(card, self.item_data(item_id))
+        # Una tarjeta reciclada puede traer el resaltado de otro item
+        if hasattr(self.manager, 'navigation'):
+            self.manager.navigation.paint_card(card, index)
+
+    def move_card(self, card, item_id, index):
+        # La tarjeta solo cambió de posición: se repinta si entra o sale de la selección
+        was_selected = self.is_card_selected(card.index)
+        card.index = index
+        if hasattr(self.manager, 'navigation') and was_selected != self.is_card_selected(index):
+            self.manager.navigation.paint_card(card, index)
+
+    def is_card_selected(self, index):
+        selection = self.manager.current_selection
+        if index is None:
+            return False
+        if selection['type'] == 'cards':
+            return selection['index'] == index
+        if selection['type'] == 'icons':
+            return selection['index'] // 3 == index
+        return False
+
+    def card_signature(self, item_id):
+        # Si cambia el texto o el pin hay que volver a dibujar la tarjeta; el tema lo aplica el registro de estilos
+        if item_id in self.manager.history_archive:
+            return (self.manager.history_archive.digest(item_id), False)
+        item_data = self.manager.clipboard_items[item_id]
+        return (self.item_digests.get(item_id), item_data['pinned'])
+
+    def describe_card(self, item_id):
+        # Datos que necesita el renderizador sobre canvas para dibujar una tarjeta
+        return self.preview_for(item_id)[0], self.item_data(item_id)['pinned']
+
+    def card_palette(self):
+        theme = self.manager.theme_manager.current_colors()
+        return {
+            'card_bg': theme['card_bg'],
+            'fg': theme['fg'],
+            'highlight': '#444444' if self.manager.is_dark_mode else '#cccccc',
+            'icon_highlight': '#666666' if self.manager.is_dark_mode else '#aaaaaa',
+        }
+
+    def on_card_icon(self, item_id, icon):
+        actions = (self.on_arrow_click, self.toggle_pin, self.delete_item)
+        actions[icon](item_id)
+
+    def card_height(self, item_id):
+        archive = self.manager.history_archive
+        if item_id in archive:
+            # El índice del archivo guarda las líneas: la altura no obliga a leer el item
+            return self.height_for_lines(archive.lines(item_id))
+        return self.preview_for(item_id)[2]
+
+    def preview_for(self, item_id):
+        # (vista previa, líneas del texto, altura) desde la caché compartida
+        text_data = self.item_data(item_id)['text']
+        digest = self.item_digests.get(item_id) or self.archived_digest(item_id) or content_digest(text_data)
+        return self.manager.preview_cache.get(digest, text_data, 3, self.height_for_lines)
     
-    def calculate_card_height(self, text_data):
-        if isinstance(text_data, dict):
-            text = text_data.get('text', '')
-        else:
-            text = str(text_data)
-        lines = len(text.split('\n'))
+    def archived_digest(self, item_id):
+        archive = self.manager.history_archive
+        return archive.digest(item_id) if item_id in archive else None
+
+    def height_for_lines(self, lines):
         content_height = min(lines * self.line_height, 4 * self.line_height)  # Máximo 4 líneas
         return min(max(content_height + 4, self.min_card_height), self.max_card_height)
     
     @measure_time
     def refresh_cards(self):
-        if not hasattr(self.manager, 'cards_frame') or not self.manager.cards_frame.winfo_exists():
-            print("cards_frame no existe o ha sido destruido")
+        if not hasattr(self.manager, 'card_list') or not self.manager.canvas.winfo_exists():
+            print("La lista de tarjetas no existe o ha sido destruida")
             return
-        # Eliminar tarjetas obsoletas
-        existing_cards = {child.item_id: child for child in self.manager.cards_frame.winfo_children() if hasattr(child, 'item_id')}
-        
-        for item_id in list(existing_cards.keys()):
-            if item_id not in self.manager.clipboard_items:
-                existing_cards[item_id].destroy()
-                del existing_cards[item_id]
-
-        # Actualizar o crear nuevas tarjetas
-        for index, (item_id, item_data) in enumerate(self.manager.clipboard_items.items()):
-            if item_id in existing_cards:
-                card = existing_cards[item_id]
-                self.update_card(card, item_data)
+        # Reconciliación por id: solo se tocan las tarjetas visibles que cambiaron
+        card_list = self.manager.card_list
+        archive = self.manager.history_archive
+        keys = self.manager.clipboard_items.keys()
+        prefix = ()
+        if self.manager.search_query:
+            results = self.manager.search_results
+            if results is not None:
+                # Resultados difusos: en el orden del ranking, incluidos los del archivo
+                items = self.manager.clipboard_items
+                keys = [item_id for item_id in results if item_id in items or item_id in archive]
             else:
-                card = self.create_card(item_id, item_data, index)
-                card.item_id = item_id
-
-            card.pack(fill=tk.X, padx=2, pady=2)
-
-        # Actualizar la región de desplazamiento
-        self.manager.canvas.update_idletasks()
-        self.manager.canvas.configure(scrollregion=self.manager.canvas.bbox("all"))
-        self.recalculate_card_heights()
-        # Asegurarse de que el scroll esté en la parte superior después de actualizar
-        self.manager.canvas.yview_moveto(0)
-        
+                # Filtro exacto: el índice de trigramas da las coincidencias sin recorrer los textos
+                matches = self.manager.search_index.search(self.manager.search_query)
+                keys = [item_id for item_id in keys if item_id in matches]
+                # Las del archivo las busca el hilo de búsqueda y se agregan arriba al llegar
+                archived = [item_id for item_id in reversed(self.manager.archive_matches or ()) if item_id in archive]
+                keys = archived + keys
+        elif self.manager.settings.get('history_order', 'recent') == 'frecency':
+            # Los más útiles primero; los archivados, según la frecencia que tenían al archivarse
+            keys = self.history_ranking()
+        else:
+            # Todo en orden de llegada: arriba el archivo y debajo el historial en memoria.
+            # Solo se leen del disco las filas visibles; los offsets del archivo se reutilizan
+            prefix = archive.ids()
+        card_list.set_keys(keys, prefix)
+        self.manager.navigation_model.set_rows(card_list.offsets, self.history_start())
+        cache = self.manager.preview_cache
+        print(f"Tarjetas reasociadas: {card_list.last_binds}, movidas: {card_list.last_moves}; "
+              f"vistas previas: {cache.hits} aciertos, {cache.misses} fallos")
+
+    def history_ranking(self):
+        # Se rehace solo si cambió el ranking en memoria o el archivo
+        archive = self.manager.history_archive
+        ranked = self.frecency.ranked()
+        if self.ranking is None or self.ranking[0] is not ranked or self.ranking[1] != archive.version:
+            self.ranking = (ranked, archive.version, self.frecency.ranked_with(archive.by_frecency))
+        return self.ranking[2]
+
+    def history_start(self):
+        """Fila donde empieza el historial en memoria: en orden de llegada el archivo queda arriba."""
+        if self.manager.search_query or self.manager.settings.get('history_order', 'recent') == 'frecency':
+            return 0
+        return len(self.manager.history_archive)
+
+    def scroll_to_start(self):
+        offsets = self.manager.card_list.offsets
+        start = min(self.history_start(), len(offsets) - 1)
+        self.manager.canvas.yview_moveto(offsets[start] / max(offsets[-1], 1))
 
     def update_card(self, card, item_data):
-        processed_text = process_text(item_data['text'], 3)
-        text_label = card.winfo_children()[0].winfo_children()[0]
-        text_label.config(text=processed_text)
-
-        new_height = self.calculate_card_height(processed_text)
-        card.config(height=new_height)
+        processed_text = self.preview_for(card.item_id)[0]
+        card.text_label.config(text=processed_text)
 
         # Actualizar el estado del botón de pin
-        pin_button = card.winfo_children()[1].winfo_children()[1]
         pin_text = "📌" if item_data['pinned'] else "📍"
-        pin_button.config(text=pin_text)
-        
-    def apply_theme_to_card(self, card, theme):
-        card.configure(bg=theme['card_bg'])
+        card.pin_button.config(text=pin_text)
         
-        for child in card.winfo_children():
-            if isinstance(child, tk.Frame):
-                child.configure(bg=theme['card_bg'])
-                for subchild in child.winfo_children():
-                    if isinstance(subchild, (tk.Label, tk.Button)):
-                        subchild.configure(bg=theme['card_bg'], fg=theme['fg'])
-            elif isinstance(child, (tk.Label, tk.Button)):
-                child.configure(bg=theme['card_bg'], fg=theme['fg'])
-
     def toggle_pin(self, item_id):
+        self.restore_from_archive(item_id)
         if item_id in self.manager.clipboard_items:
             self.manager.clipboard_items[item_id]['pinned'] = not self.manager.clipboard_items[item_id]['pinned']
+            self.frecency.track(item_id, self.manager.clipboard_items[item_id])
+            self.eviction.track(item_id, self.manager.clipboard_items[item_id])
+            self.enforce_capacity()
             self.refresh_cards()
-            self.manager.group_manager.save_groups()  # Guardar después de cambiar el estado de anclaje
+            self.manager.group_manager.persist_item(item_id)  # Guardar después de cambiar el estado de anclaje
 
     def delete_item(self, item_id):
-        if item_id in self.manager.clipboard_items and not self.manager.clipboard_items[item_id]['pinned']:
+        if item_id in self.manager.history_archive:
+            self.manager.history_archive.remove(item_id)
+            self.refresh_cards()
+        elif item_id in self.manager.clipboard_items and not self.manager.clipboard_items[item_id]['pinned']:
             del self.manager.clipboard_items[item_id]
+            self.unindex_item(item_id)
             self.refresh_cards()
-            self.manager.group_manager.save_groups()  # Guardar después de eliminar un item
+            self.manager.group_manager.persist_item(item_id)  # Guardar después de eliminar un item
 
     
     def clear_history(self):
+        removed_ids = [k for k, v in self.manager.clipboard_items.items() if not v['pinned']]
         self.manager.clipboard_items = {k: v for k, v in self.manager.clipboard_items.items() if v['pinned']}
+        for item_id in removed_ids:
+            self.unindex_item(item_id)
+        self.manager.history_archive.clear()
         self.refresh_cards()
-        self.manager.group_manager.save_groups()  # Guardar después de limpiar el historial
+        for item_id in removed_ids:
+            self.manager.group_manager.persist_item(item_id)  # Guardar después de limpiar el historial
         if self.manager.current_selection['type'] == 'card':
             self.manager.current_selection = {'type': 'button', 'index': 0}
         self.manager.navigation.update_highlights()
 
+    def on_search(self, query):
+        # Cada tecla filtra el historial y las ventanas de grupos con la misma consulta
+        self.manager.search_query = query.strip()
+        self.manager.search_results = None
+        self.manager.archive_matches = None
+        searcher = self.manager.fuzzy_searcher
+        if not self.manager.search_query:
+            searcher.cancel()
+        elif self.manager.settings.get('search_mode', 'fuzzy') == 'fuzzy':
+            # Mientras el hilo puntúa se muestran las coincidencias exactas; el ranking llega por partes
+            searcher.submit(self.manager.search_query, self.search_candidates(), self.on_fuzzy_results)
+        else:
+            # El historial en memoria se filtra al instante; el archivo se recorre en el hilo, nunca aquí.
+            # Se conservan todas las coincidencias, como en el historial en memoria
+            query = self.manager.search_query
+            searcher.submit(query, ArchiveCandidates(self.manager.history_archive, query_signature(query)),
+                            self.on_archive_matches, exact_score, limit=max(len(self.manager.history_archive), 1))
+        self.apply_search()
+
+    def on_fuzzy_results(self, query, ranked, done):
+        # clave -> puntaje, de mejor a peor
+        self.manager.search_results = dict(ranked)
+        self.apply_search()
+        if done:
+            print(f"Búsqueda '{query}': {len(ranked)} resultados")
+
+    def on_archive_matches(self, query, ranked, done):
+        # Todas puntúan igual: llegan de la más reciente a la más antigua
+        self.manager.archive_matches = [item_id for item_id, _ in ranked]
+        self.refresh_cards()
+        if done:
+            print(f"Búsqueda exacta en el archivo '{query}': {len(ranked)} resultados")
+
+    def search_candidates(self):
+        # (clave, texto) para el hilo de búsqueda; lo que está en memoria se rehace solo si cambió algún índice
+        history = self.manager.search_index
+        groups = self.manager.group_manager.search_index
+        versions = (history.version, groups.version)
+        if self.candidates_version != versions:
+            self.candidates = list(history.texts.items()) + list(groups.texts.items())
+            self.candidates_version = versions
+        # Los textos del archivo no se copian: el hilo lee del disco solo los que tienen todas las letras
+        required = query_signature(self.manager.search_query, substring=False)
+        return ChainedCandidates(ArchiveCandidates(self.manager.history_archive, required), self.candidates)
+
+    def apply_search(self):
+        self.refresh_cards()
+        self.scroll_to_start()
+        group_manager = self.manager.group_manager
+        group_manager.refresh_groups()
+        group_content_manager = group_manager.group_content_manager
+        group_content_manager.refresh_if_showing(group_content_manager.current_group_id)
+
     def on_canvas_configure(self, event):
-        self.manager.canvas.configure(scrollregion=self.manager.canvas.bbox("all"))
+        self.manager.card_list.on_resize(event.width)
 
     def on_mousewheel(self, event):
         self.manager.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
-    @measure_time
     def monitor_clipboard(self):
-        while True:
-            try:
-                clipboard_content = self.get_clipboard_text()
-                if clipboard_content and clipboard_content != self.manager.current_clipboard:
-                    self.manager.current_clipboard = clipboard_content
-                    if clipboard_content['text'] not in [item['text'].get('text', '') if isinstance(item['text'], dict) else item['text'] for item in self.manager.clipboard_items.values()]:
-                        new_id = str(uuid.uuid4())
-                        new_item = {
-                            'text': clipboard_content,
-                            'pinned': False,
-                            'with_format': self.manager.paste_with_format
-                        }
-                        # Usar after para actualizar la GUI en el hilo principal
-                        self.manager.root.after(0, self.add_clipboard_item, new_id, new_item)
-            except Exception as e:
-                print(f"Error en monitor_clipboard: {e}")
-            time.sleep(0.5)
+        # Hilo de captura: produce items que la interfaz consume por lotes
+        self.capture_pipeline.run()
+
+    def capture_metrics(self):
+        pipeline = self.capture_pipeline
+        return {
+            'idle_wakeups_per_minute': self.clipboard_backend.idle_wakeups_per_minute(),
+            'captured': pipeline.captured,
+            'batches': pipeline.batches,
+            'largest_batch': pipeline.largest_batch,
+            'backpressure_waits': pipeline.backpressure_waits
+        }
+
+    def capture_once(self, timeout=None):
+        """
+        Espera un cambio del backend y devuelve (id, item, huella) si hay contenido nuevo
+        """
+        if not self.clipboard_backend.wait_for_change(timeout):
+            return None
+        clipboard_content = self.clipboard_backend.read()
+        if not clipboard_content or clipboard_content == self.manager.current_clipboard:
+            return None
+        self.manager.current_clipboard = clipboard_content
+        new_id = str(uuid.uuid4())
+        new_item = {
+            'text': clipboard_content,
+            'pinned': False,
+            'with_format': self.manager.paste_with_format
+        }
+        # La huella se calcula aquí, fuera del hilo de la interfaz
+        return new_id, new_item, content_digest(clipboard_content)
             
-    def add_clipboard_item(self, new_id, new_item):
-        self.manager.clipboard_items[new_id] = new_item
-        if len(self.manager.clipboard_items) > 20:
-            unpinned_items = [k for k, v in self.manager.clipboard_items.items() if not v['pinned']]
-            if unpinned_items:
-                del self.manager.clipboard_items[unpinned_items[-1]]
-        self.refresh_cards()
-        self.manager.group_manager.save_groups()
+    def add_clipboard_item(self, new_id, new_item, digest=None):
+        self.add_clipboard_items([(new_id, new_item, digest)])
+
+    def add_clipboard_items(self, batch):
+        # Un lote de capturas: una mutación, un refresco y un guardado
+        items = self.manager.clipboard_items
+        changed = False
+        for new_id, new_item, digest in batch:
+            if digest is None:
+                digest = content_digest(new_item['text'])
+            existing_id = self.content_index.get(digest)
+            if existing_id is None and digest in self.manager.history_archive.by_digest:
+                # Copiar algo archivado lo devuelve a memoria con su id y estadísticas
+                existing_id = self.restore_from_archive(self.manager.history_archive.by_digest[digest])
+                changed = True
+            if existing_id is not None:
+                # Copiar de nuevo un item existente lo mueve a la posición más reciente
+                if next(reversed(items)) != existing_id:
+                    items[existing_id] = items.pop(existing_id)
+                    changed = True
+                self.frecency.record(existing_id, items[existing_id], 'copy')
+                self.eviction.touch(existing_id, items[existing_id], moved=True)
+                self.manager.group_manager.persist_item(existing_id)
+                changed = changed or self.manager.settings.get('history_order', 'recent') == 'frecency'
+                continue
+            items[new_id] = new_item
+            self.index_item(new_id, digest)
+            self.frecency.record(new_id, new_item, 'copy')
+            self.eviction.touch(new_id, new_item)
+            self.manager.group_manager.persist_item(new_id)
+            changed = True
+
+        if self.enforce_capacity():
+            changed = True
+        if changed:
+            self.refresh_cards()
+
+    def enforce_capacity(self):
+        # Las políticas de capacidad eligen qué sacar de memoria, O(log n) por item
+        items = self.manager.clipboard_items
+        archive = self.manager.history_archive if self.manager.settings.get('archive_history', True) else None
+        removed_ids = self.eviction.enforce()
+        for removed_id in removed_ids:
+            item_data = items.pop(removed_id)
+            if archive is not None:
+                archive.append(removed_id, item_data, self.item_digests[removed_id], self.frecency.value(item_data))
+            self.unindex_item(removed_id)
+        if removed_ids:
+            stats = self.eviction.stats()
+            print(f"{'Archivados' if archive is not None else 'Descartados'} {len(removed_ids)} items; "
+                  f"historial: {stats['items']} items, {stats['history_bytes'] // 1024} KB sin anclar, "
+                  f"{stats['pinned_bytes'] // 1024} KB anclados")
+        # Lo que sale de memoria deja de guardarse en el diario: ya quedó en el archivo
+        for removed_id in removed_ids:
+            self.manager.group_manager.persist_item(removed_id)
+        return removed_ids
+
+    def restore_from_archive(self, item_id):
+        """Devuelve un item archivado al historial en memoria, como el más reciente."""
+        archive = self.manager.history_archive
+        if item_id not in archive:
+            return None
+        self.manager.clipboard_items[item_id] = archive.get(item_id)
+        self.index_item(item_id)
+        # Primero queda guardado en el diario y después se borra del archivo: un cierre en medio no lo pierde
+        self.manager.group_manager.persist_item(item_id)
+        self.manager.persistence_writer.flush()
+        archive.remove(item_id)
+        return item_id
+
+    def record_use(self, item_id, kind):
+        restored = self.restore_from_archive(item_id) is not None
+        item_data = self.manager.clipboard_items.get(item_id)
+        if item_data is None:
+            return
+        self.frecency.record(item_id, item_data, kind)
+        self.eviction.touch(item_id, item_data)
+        if item_data['pinned'] or restored:
+            self.manager.group_manager.persist_item(item_id)  # Las estadísticas se guardan con el item
+        else:
+            # Guardarlo ahora lo llevaría al final del historial en disco: se guarda al salir
+            self.usage_unsaved = True
+        if restored:
+            self.enforce_capacity()
+        if restored or self.manager.settings.get('history_order', 'recent') == 'frecency':
+            self.refresh_cards()
+
+    def index_item(self, item_id, digest=None):
+        if digest is None:
+            digest = content_digest(self.manager.clipboard_items[item_id]['text'])
+        self.content_index[digest] = item_id
+        self.item_digests[item_id] = digest
+        self.manager.search_index.add(item_id, self.manager.clipboard_items[item_id]['text'])
+        self.frecency.track(item_id, self.manager.clipboard_items[item_id])
+        self.eviction.track(item_id, self.manager.clipboard_items[item_id])
+
+    def unindex_item(self, item_id):
+        self.manager.search_index.remove(item_id)
+        self.frecency.forget(item_id)
+        self.eviction.forget(item_id)
+        digest = self.item_digests.pop(item_id, None)
+        if digest is not None and self.content_index.get(digest) == item_id:
+            del self.content_index[digest]
+
+    def rebuild_content_index(self):
+        self.content_index = {}
+        self.item_digests = {}
+        self.manager.search_index.clear()
+        self.frecency.rebuild({})
+        self.eviction.clear()
+        for item_id in self.manager.clipboard_items:
+            self.index_item(item_id)
+
+    def footprint(self):
+        """Memoria aproximada y espacio en disco por categoría, en bytes."""
+        group_manager = self.manager.group_manager
+        history = self.eviction.stats()
+        memory = {
+            'history': history['history_bytes'],
+            'pinned': history['pinned_bytes'],
+            'groups': sum(item_bytes(item) for group in group_manager.groups.values()
+                          for item in group['items'].values()),
+            'previews': self.manager.preview_cache.memory_bytes(),
+            'search_index': self.manager.search_index.memory_bytes() + group_manager.search_index.memory_bytes(),
+        }
+        archive = self.manager.history_archive
+        memory['archive_index'] = len(archive) * INDEX_RECORD.size  # Aproximado: una entrada por item archivado
+        disk = {**self.manager.data_manager.disk_usage(), **archive.disk_usage()}
+        return {'memory': memory, 'disk': disk}
+
+    def metrics_report(self):
+        """Líneas para la ventana de configuración: memoria y disco por categoría y la captura."""
+        footprint = self.footprint()
+        capture = self.capture_metrics()
+        lines = []
+        for title, sizes in (('Memoria', footprint['memory']), ('Disco', footprint['disk'])):
+            lines.append(f"{title}: {format_size(sum(sizes.values()))}")
+            lines += [f"  {FOOTPRINT_LABELS.get(name, name)}: {format_size(size)}" for name, size in sizes.items()]
+        lines.append(f"Despertares sin cambios: {capture['idle_wakeups_per_minute']} por minuto")
+        lines.append(f"Capturas: {capture['captured']} en {capture['batches']} lotes "
+                     f"(mayor: {capture['largest_batch']}, esperas por cola llena: {capture['backpressure_waits']})")
+        return lines
 
     # @measure_time
     def get_clipboard_text(self):
-        try:
-            win32clipboard.OpenClipboard()
-            formats = []
-            format_id = win32clipboard.EnumClipboardFormats(0)
-            while format_id:
-                formats.append(format_id)
-                format_id = win32clipboard.EnumClipboardFormats(format_id)
-            
-            text = None
-            formatted = None
-            
-            if win32con.CF_UNICODETEXT in formats:
-                text = win32clipboard.GetClipboardData(win32con.CF_UNICODETEXT)
-            
-            if win32con.CF_RTF in formats:
-                formatted = win32clipboard.GetClipboardData(win32con.CF_RTF)
-            elif CF_HTML in formats:
-                formatted = win32clipboard.GetClipboardData(CF_HTML)
-            
-            win32clipboard.CloseClipboard()
-            
-            if formatted:
-                if isinstance(formatted, bytes):
-                    formatted = formatted.decode('utf-8', errors='ignore')
-            
-            return {'text': text, 'formatted': formatted} if text else None
-        except Exception as e:
-            print(f"Error al obtener texto del portapapeles: {e}")
-            return None
+        return self.clipboard_backend.read()
         
     def exit_app(self):
+        if self.usage_unsaved:
+            # Se vuelve a guardar todo el historial en memoria, en su orden, con sus estadísticas
+            for item_id in self.manager.clipboard_items:
+                self.manager.group_manager.persist_item(item_id)
+        self.manager.persistence_writer.stop()  # Escribe lo pendiente y espera al hilo de guardado
+        self.manager.fuzzy_searcher.close()
+        self.manager.history_archive.close()
+        self.clipboard_backend.close()
         self.manager.root.quit()
         sys.exit()
     
@@ -247,65 +526,56 @@ class Functions:
         self.manager.button2.config(text=new_text)
         self.manager.navigation.update_highlights()
         
-    @measure_time
-    def recalculate_card_heights(self):
-        for card in self.manager.cards_frame.winfo_children():
-            if hasattr(card, 'item_id'):
-                item_data = self.manager.clipboard_items[card.item_id]
-                new_height = self.calculate_card_height(item_data['text'])
-                card.config(height=new_height)
-        
-        self.manager.canvas.update_idletasks()
-        self.manager.canvas.configure(scrollregion=self.manager.canvas.bbox("all"))
-        
     def on_arrow_click(self, item_id):
         if not self.manager.group_manager.groups:
             tk.messagebox.showinfo("Sin Grupos", "No hay grupos disponibles. Cree un grupo primero.")
             return
 
-        dialog = tk.Toplevel(self.manager.root)
-        dialog.title("Seleccionar Grupo")
-        
+        self.picker_item_id = item_id
         window_width = self.manager.settings['width']
         window_height = self.manager.settings['height']
         
         x = self.manager.window_x + 20
         y = self.manager.window_y + 20
         
-        dialog.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        # El selector se crea una vez; al reabrirlo solo se sincronizan los botones de grupo
+        self.manager.window_cache.show('group_picker', self.build_group_picker,
+                                       self.sync_group_picker,
+                                       f"{window_width}x{window_height}+{x}+{y}")
+
+    def build_group_picker(self):
+        dialog = tk.Toplevel(self.manager.root)
+        dialog.title("Seleccionar Grupo")
                 
         # dialog.geometry("295x400")
-        dialog.configure(bg=self.manager.theme_manager.colors['dark']['bg'])
+        self.manager.theme_manager.style(dialog, 'window')
         dialog.overrideredirect(True)
         dialog.attributes('-topmost', True)
 
         # Barra de título personalizada
-        title_frame = tk.Frame(dialog, bg=dialog.cget('bg'))
+        title_frame = tk.Frame(dialog)
+        self.manager.theme_manager.style(title_frame, 'window')
         title_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
 
-        title_label = tk.Label(title_frame, text="Seleccionar Grupo", font=('Segoe UI', 10, 'bold'),
-                            bg=dialog.cget('bg'), fg=self.manager.theme_manager.colors['dark']['fg'])
+        title_label = tk.Label(title_frame, text="Seleccionar Grupo", font=('Segoe UI', 10, 'bold'))
+        self.manager.theme_manager.style(title_label, 'title')
         title_label.pack(side=tk.LEFT, padx=5)
 
-        close_button = tk.Button(title_frame, text="❌", command=dialog.destroy,
-                                font=('Segoe UI', 10, 'bold'), bd=0, padx=10,
-                                bg=self.manager.theme_manager.colors['dark']['button_bg'],
-                                fg=self.manager.theme_manager.colors['dark']['button_fg'])
+        close_button = tk.Button(title_frame, text="❌", command=self.hide_group_picker,
+                                font=('Segoe UI', 10, 'bold'), bd=0, padx=10)
+        self.manager.theme_manager.style(close_button, 'button')
         close_button.pack(side=tk.RIGHT)
 
+        # Grupos que ya contienen el item
+        self.picker_status = tk.Label(dialog, font=('Segoe UI', 9), anchor='w', justify=tk.LEFT)
+        self.manager.theme_manager.style(self.picker_status, 'title')
+
         # Contenido
-        content_frame = tk.Frame(dialog, bg=dialog.cget('bg'))
-        content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-
-        for group_id, group_info in self.manager.group_manager.groups.items():
-            group_button = tk.Button(content_frame, text=group_info['name'],
-                                    command=lambda gid=group_id: self.add_to_group(item_id, gid, dialog),
-                                    bg=self.manager.theme_manager.colors['dark']['button_bg'],
-                                    fg=self.manager.theme_manager.colors['dark']['button_fg'],
-                                    activebackground=self.manager.theme_manager.colors['dark']['active_bg'],
-                                    activeforeground=self.manager.theme_manager.colors['dark']['active_fg'],
-                                    bd=0, padx=10, pady=5, width=30, anchor='w')
-            group_button.pack(fill=tk.X, pady=2)
+        self.picker_frame = tk.Frame(dialog)
+        self.manager.theme_manager.style(self.picker_frame, 'window')
+        self.picker_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.picker_buttons = {}  # id del grupo -> botón
+        self.sync_group_picker(dialog)
 
         # Hacer la ventana arrastrable
         def start_move(event):
@@ -321,8 +591,41 @@ class Functions:
 
         title_frame.bind('<Button-1>', start_move)
         title_frame.bind('<B1-Motion>', on_move)
+        return dialog
+
+    def sync_group_picker(self, dialog):
+        # Reconciliación por id de grupo: solo se tocan los botones que cambiaron
+        group_manager = self.manager.group_manager
+        groups = group_manager.groups
+        containing = group_manager.group_index.groups_for(self.picker_item_id,
+                                                          self.item_digests.get(self.picker_item_id)
+                                                          or self.archived_digest(self.picker_item_id))
+        if containing:
+            names = ", ".join(groups[gid]['name'] for gid in groups if gid in containing)
+            self.picker_status.configure(text=f"Ya está en: {names}")
+            self.picker_status.pack(fill=tk.X, padx=10, pady=(5, 0), before=self.picker_frame)
+        else:
+            self.picker_status.pack_forget()
+
+        for group_id in [gid for gid in self.picker_buttons if gid not in groups]:
+            self.picker_buttons.pop(group_id).destroy()
+        for group_id, group_info in groups.items():
+            text = f"{group_info['name']}  ✓" if group_id in containing else group_info['name']
+            button = self.picker_buttons.get(group_id)
+            if button is None:
+                button = tk.Button(self.picker_frame, text=text,
+                                   command=lambda gid=group_id: self.add_to_group(self.picker_item_id, gid, dialog),
+                                   bd=0, padx=10, pady=5, width=30, anchor='w')
+                self.manager.theme_manager.style(button, 'dialog_button')
+                button.pack(fill=tk.X, pady=2)
+                self.picker_buttons[group_id] = button
+            elif button.cget('text') != text:
+                button.configure(text=text)
+
+    def hide_group_picker(self):
+        self.manager.window_cache.hide('group_picker')
 
     def add_to_group(self, item_id, group_id, dialog):
         self.manager.group_manager.add_item_to_group(item_id, group_id)
-        dialog.destroy()
+        self.hide_group_picker()
         # tk.messagebox.showinfo("Éxito", "Item agregado al grupo exitosamente.")
\ No newline at end of file
@@ -0,0 +1,163 @@
+# fuzzy_search.py
+
+import bisect
+import heapq
+import threading
+
+SCORE_MATCH = 16
+BONUS_BOUNDARY = 8      # La letra empieza una palabra
+BONUS_CONSECUTIVE = 6   # La letra sigue a la anterior coincidencia
+BONUS_FIRST_CHAR = 2    # Multiplica el bonus de la primera letra de la consulta
+PENALTY_GAP_START = 3
+PENALTY_GAP_EXTENSION = 1
+
+
+def is_boundary(text, position):
+    return position == 0 or not text[position - 1].isalnum()
+
+
+def fuzzy_score(query, text):
+    """
+    Puntaje al estilo fzf de la consulta como subsecuencia del texto (ambos en
+    minúsculas), o None si no aparece. Primero se busca hacia adelante el final
+    de la coincidencia y luego hacia atrás el comienzo más cercano, para puntuar
+    la ventana más corta.
+    """
+    end = -1
+    for char in query:
+        end = text.find(char, end + 1)
+        if end < 0:
+            return None
+    start = end
+    for char in reversed(query[:-1]):
+        start = text.rfind(char, 0, start)
+
+    score = 0
+    previous = start - 1
+    for index, char in enumerate(query):
+        position = text.find(char, previous + 1)
+        score += SCORE_MATCH
+        bonus = BONUS_BOUNDARY if is_boundary(text, position) else 0
+        if index == 0:
+            bonus *= BONUS_FIRST_CHAR
+        elif position == previous + 1:
+            bonus = max(bonus, BONUS_CONSECUTIVE)
+        else:
+            gap = position - previous - 1
+            score -= PENALTY_GAP_START + (gap - 1) * PENALTY_GAP_EXTENSION
+        score += bonus
+        previous = position
+    return score
+
+
+def exact_score(query, text):
+    """Coincidencia exacta de la consulta dentro del texto: todas puntúan igual."""
+    return 0 if query in text else None
+
+
+class ChainedCandidates:
+    """Varias secuencias de candidatos vistas como una sola, sin copiarlas."""
+
+    def __init__(self, *parts):
+        self.parts = parts
+        self.starts = []
+        total = 0
+        for part in parts:
+            self.starts.append(total)
+            total += len(part)
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, position):
+        part = bisect.bisect_right(self.starts, position) - 1
+        return self.parts[part][position - self.starts[part]]
+
+
+class FuzzySearcher:
+    """
+    Búsqueda difusa en un hilo propio. Cada consulta nueva deja obsoleta a la
+    anterior, que se abandona en el siguiente bloque de candidatos. Los mejores
+    resultados se mantienen en un heap de tamaño fijo y se envían al hilo de la
+    interfaz a medida que mejoran.
+    """
+
+    def __init__(self, deliver, limit=200, chunk_size=2000):
+        self.deliver = deliver  # (callback) -> ejecuta callback en el hilo de la interfaz
+        self.limit = limit
+        self.chunk_size = chunk_size
+        self.condition = threading.Condition()
+        self.pending = None
+        self.generation = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, query, candidates, on_results, score=fuzzy_score, limit=None):
+        """
+        candidates: secuencia de (clave, texto en minúsculas); on_results(consulta,
+        [(clave, puntaje)] de mejor a peor, terminado) se llama en el hilo de la interfaz.
+        score(consulta, texto) devuelve el puntaje o None si el texto no coincide.
+        limit: cuántos resultados conservar; por omisión, el del buscador.
+        """
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, query.lower(), candidates, on_results, score, limit or self.limit)
+            self.condition.notify()
+
+    def cancel(self):
+        with self.condition:
+            self.generation += 1
+            self.pending = None
+
+    def close(self):
+        with self.condition:
+            self.running = False
+            self.generation += 1
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and self.running:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                job, self.pending = self.pending, None
+            self.search(*job)
+
+    def search(self, generation, query, candidates, on_results, score_text, limit):
+        heap = []  # (puntaje, posición, clave); la posición desempata a favor de los más recientes
+        changed = False  # Si el heap cambió desde la última publicación
+        for start in range(0, len(candidates), self.chunk_size):
+            if generation != self.generation:
+                return  # Llegó otra consulta
+            for position in range(start, min(start + self.chunk_size, len(candidates))):
+                key, text = candidates[position]
+                score = score_text(query, text)
+                if score is None:
+                    continue
+                entry = (score, position, key)
+                if len(heap) < limit:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+                else:
+                    continue  # No entra entre los mejores: no hay nada nuevo que mostrar
+                changed = True
+            if changed and start + self.chunk_size < len(candidates):
+                self.publish(generation, query, heap, on_results, False)
+                changed = False
+        if generation == self.generation:
+            self.publish(generation, query, heap, on_results, True)
+
+    def publish(self, generation, query, heap, on_results, done):
+        # Solo se ordenan los K del heap, nunca todos los candidatos
+        ranked = [(key, score) for score, _, key in sorted(heap, reverse=True)]
+
+        def deliver():
+            if generation == self.generation:
+                on_results(query, ranked, done)
+
+        self.deliver(deliver)
@@ -3,7 +3,8 @@
 import tkinter as tk
 from tkinter import ttk
 
-from utils import process_text
+from utils import content_digest
+from virtual_list import VirtualCardList
 
 class GroupContentManager:
     def __init__(self, master, clipboard_manager, theme_manager, settings_manager):
@@ -15,9 +16,11 @@ class GroupContentManager:
         self.min_card_height = 50  # Altura mínima en píxeles (2 líneas + 2*2 padding)
         self.max_card_height = 120  # Altura máxima en píxeles (4 líneas + 2*2 padding)
         self.line_height = 10      # Altura estimada de una línea de texto
+        self.group_window = None
+        self.current_group_id = None
+        self.group_items = {}    # id del item -> item del grupo mostrado
 
-    def calculate_card_height(self, text):
-        lines = len(text.split('\n'))
+    def height_for_lines(self, lines):
         if lines > 2:
             content_height = min(lines * (self.line_height*2), 7 * self.line_height)  # Máximo 4 líneas
         else:
@@ -25,65 +28,60 @@ class GroupContentManager:
         return min(max(content_height + 5, self.min_card_height), self.max_card_height)
 
     def show_group_content(self, group_id):
-        group_window = tk.Toplevel(self.master)
-        group_window.title(f"Contenido del Grupo: {self.clipboard_manager.group_manager.groups[group_id]['name']}")
-        
+        self.current_group_id = group_id
         window_width = self.settings_manager.settings['width']
         window_height = self.settings_manager.settings['height']
         
         x = self.clipboard_manager.window_x + 20
         y = self.clipboard_manager.window_y + 20
         
-        group_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        # Una sola ventana para todos los grupos: al reabrirla solo cambia su contenido
+        self.group_window = self.clipboard_manager.window_cache.show(
+            'group_content', self.build_group_window, self.update_group_window,
+            f"{window_width}x{window_height}+{x}+{y}", wheel=self.on_mousewheel)
+
+    def build_group_window(self):
+        group_window = tk.Toplevel(self.master)
                 
         group_window.overrideredirect(True)
-        group_window.configure(bg=self.theme_manager.colors['dark']['bg'])
+        self.theme_manager.style(group_window, 'window')
         group_window.attributes('-topmost', True)
 
         # Barra de título personalizada
-        title_frame = tk.Frame(group_window, bg=self.theme_manager.colors['dark']['bg'])
+        title_frame = tk.Frame(group_window)
+        self.theme_manager.style(title_frame, 'window')
         title_frame.pack(fill=tk.X, padx=6, pady=(0,0))
 
-        title_label = tk.Label(title_frame, text=f"Grupo: {self.clipboard_manager.group_manager.groups[group_id]['name']}", 
-                            font=('Segoe UI', 10, 'bold'),
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
-        title_label.pack(side=tk.LEFT, padx=5, pady=5)
+        self.title_label = tk.Label(title_frame, font=('Segoe UI', 10, 'bold'))
+        self.theme_manager.style(self.title_label, 'title')
+        self.title_label.pack(side=tk.LEFT, padx=5, pady=5)
 
-        close_button = tk.Button(title_frame, text="❌", command=group_window.destroy,
-                                font=('Segoe UI', 10, 'bold'),bd=0, padx=10, width=5, height=2,
-                                bg=self.theme_manager.colors['dark']['button_bg'],
-                                fg=self.theme_manager.colors['dark']['button_fg'])
+        close_button = tk.Button(title_frame, text="❌", command=self.hide_group_content,
+                                font=('Segoe UI', 10, 'bold'),bd=0, padx=10, width=5, height=2)
+        self.theme_manager.style(close_button, 'button')
         close_button.pack(side=tk.RIGHT)
 
         # Canvas y scroll para los items
-        self.canvas = tk.Canvas(group_window, bg=self.theme_manager.colors['dark']['bg'], highlightthickness=0)
+        self.canvas = tk.Canvas(group_window, highlightthickness=0)
+        self.theme_manager.style(self.canvas, 'window')
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
 
         scrollbar = ttk.Scrollbar(group_window, orient="vertical", command=self.canvas.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        self.canvas.configure(yscrollcommand=scrollbar.set)
+        # Lista virtual: solo las tarjetas visibles tienen widgets
+        self.item_list = VirtualCardList(self.canvas, self.create_item_card, self.bind_item_card,
+                                         self.item_card_height, signature=self.item_signature,
+                                         padx=6)
+        self.item_list.scrollbar = scrollbar
 
-        self.items_frame = tk.Frame(self.canvas, bg=self.theme_manager.colors['dark']['bg'])
-        self.canvas.create_window((0, 0), window=self.items_frame, anchor='nw', width=window_width)
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.items_frame, anchor='nw', width=window_width)
-        # Configurar el desplazamiento con la rueda del ratón
-        def _on_mousewheel(event):
-            self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-
-        self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
-
-        # Asegurar que el ancho del frame interior se ajuste al canvas
+        # Asegurar que el ancho de las tarjetas se ajuste al canvas
         def _configure_inner_frame(event):
             if self.canvas.winfo_exists():
-                self.canvas.itemconfig(self.canvas_window, width=event.width)
+                self.item_list.on_resize(event.width)
         
         self.canvas.bind('<Configure>', _configure_inner_frame)
 
-        # Mostrar items del grupo
-        self.refresh_group_content(group_id)
-
         # Hacer la ventana arrastrable
         def start_move(event):
             group_window.x = event.x
@@ -99,91 +97,123 @@ class GroupContentManager:
         title_frame.bind('<Button-1>', start_move)
         title_frame.bind('<B1-Motion>', on_move)
 
+        # Título e items del grupo
+        self.update_group_window(group_window)
+        return group_window
+
+    def update_group_window(self, group_window):
+        name = self.clipboard_manager.group_manager.groups[self.current_group_id]['name']
+        group_window.title(f"Contenido del Grupo: {name}")
+        self.title_label.configure(text=f"Grupo: {name}")
+        self.refresh_group_content(self.current_group_id)
+        self.canvas.yview_moveto(0)
+
+    def on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+
+    def hide_group_content(self):
+        self.clipboard_manager.window_cache.hide('group_content')
+
     def refresh_group_content(self, group_id):
-        # Limpiar el frame de items existente
-        for widget in self.items_frame.winfo_children():
-            widget.destroy()
+        # Reconciliación por id: solo se crean, mueven o redibujan las tarjetas que cambiaron
+        group_manager = self.clipboard_manager.group_manager
+        self.group_items = group_manager.groups[group_id]['items']
+        # Con una búsqueda activa solo se muestran los items que coinciden
+        self.item_list.set_keys(group_manager.search_matches(group_id))
+
+    def refresh_if_showing(self, group_id):
+        if group_id == self.current_group_id and self.clipboard_manager.window_cache.is_visible('group_content'):
+            self.refresh_group_content(group_id)
+
+    def item_digest(self, item):
+        # La huella ya está en el índice de pertenencia, que se actualiza al editar
+        digest = self.clipboard_manager.group_manager.group_index.digests.get((self.current_group_id, item['id']))
+        return digest if digest is not None else content_digest(item['text'])
+
+    def item_preview(self, item):
+        # Vista previa y altura desde la caché compartida con la ventana principal
+        return self.clipboard_manager.preview_cache.get(
+            self.item_digest(item), item['text'], 2, self.height_for_lines)
+
+    def item_signature(self, item_id):
+        item = self.group_items[item_id]
+        return self.item_digest(item), item.get('name', '')
+
+    def item_card_height(self, item_id):
+        _, _, card_height = self.item_preview(self.group_items[item_id])
+        return max(self.min_card_height, card_height)
+
+    def create_item_card(self):
+        card_container = tk.Frame(self.canvas)
+        self.theme_manager.style(card_container, 'card')
+        card_container.pack_propagate(False)  # Evita que el contenido afecte el tamaño del contenedor
+        card_container.item_id = None
+
+        text_frame = tk.Frame(card_container, pady=0)
+        self.theme_manager.style(text_frame, 'card')
+        text_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        # Etiqueta para item_name en negrita y tamaño de fuente mayor; solo se muestra si hay nombre
+        card_container.name_label = tk.Label(
+            text_frame,
+            font=("Segoe UI", 10, "bold"),
+            justify=tk.LEFT,
+            anchor='w',
+            width=int(24)
+        )
+        self.theme_manager.style(card_container.name_label, 'card_text')
+
+        # Etiqueta para processed_text con fuente regular
+        card_container.text_label = tk.Label(
+            text_frame,
+            font=("Segoe UI", 10),
+            justify=tk.LEFT,
+            anchor='w',
+            width=int(24)
+        )
+        self.theme_manager.style(card_container.text_label, 'card_text')
+        card_container.text_label.pack(padx=6, pady=(0,4), fill=tk.X, expand=True, side=tk.TOP)
         
-        window_width = self.settings_manager.settings['width']
-        window_height = self.settings_manager.settings['height'] - 40  # Ajuste para la barra de título
-
-        current_theme = 'dark'  # Puedes cambiar esto si soportas modo claro/oscuro
-        theme = self.theme_manager.colors[current_theme]
-
-        for item in self.clipboard_manager.group_manager.groups[group_id]['items']:
-            card_width = window_width - 4  # Ajuste mínimo para el padding
-            card_height = max(self.min_card_height, self.calculate_card_height(item['text']))
-    
-            bg_color = theme['card_bg']
-    
-            card_container = tk.Frame(self.items_frame, width=card_width, height=card_height, bg=bg_color)
-            card_container.pack(fill=tk.X, padx=6, pady=(4,0))
-            card_container.pack_propagate(False)  # Evita que el contenido afecte el tamaño del contenedor
-
-            text_frame = tk.Frame(card_container, bg=bg_color, pady=0)
-            text_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-            # Procesamos el texto para mostrarlo de forma limpia
-            processed_text = process_text(item['text'], 2)
-            item_name = item.get('name', '')
-
-            # Etiqueta para item_name en negrita y tamaño de fuente mayor
-            if item_name:
-                item_name_label = tk.Label(
-                    text_frame,
-                    text=f"{item_name}:",
-                    font=("Segoe UI", 10, "bold"),
-                    bg=bg_color,
-                    fg=theme['fg'],
-                    justify=tk.LEFT,
-                    anchor='w',
-                    width=int(24)
-                )
-                item_name_label.pack(padx=2, pady=0, fill=tk.X, side=tk.TOP, anchor='w')
-
-            # Etiqueta para processed_text con fuente regular
-            text_label = tk.Label(
-                text_frame,
-                text=processed_text,
-                font=("Segoe UI", 10),
-                justify=tk.LEFT,
-                anchor='w',
-                bg=bg_color,
-                fg=theme['fg'],
-                width=int(24)
-            )
-            text_label.pack(padx=6, pady=(0,4), fill=tk.X, expand=True, side=tk.TOP)
-            
-            icons_frame = tk.Frame(card_container, bg=bg_color)
-            icons_frame.pack(side=tk.RIGHT, padx=3)
-
-            edit_button = tk.Button(icons_frame, text="✏️", 
-                                    command=lambda i=item['id']: self.edit_group_item(group_id, i),
-                                    font=('Segoe UI', 10), bd=0,
-                                    padx=2,
-                                    bg=bg_color,
-                                    fg=theme['fg'])
-            edit_button.pack(side=tk.LEFT)
-
-            delete_button = tk.Button(icons_frame, text="🗑️", 
-                                    command=lambda i=item['id']: self.remove_item_from_group(group_id, i, self.items_frame),
-                                    font=('Segoe UI', 10), bd=0,
-                                    padx=2,
-                                    bg=bg_color,
-                                    fg=theme['fg'])
-            delete_button.pack(side=tk.LEFT)
-
-        # Actualizar el scrollregion después de añadir todos los widgets
-        self.items_frame.update_idletasks()
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
+        icons_frame = tk.Frame(card_container)
+        self.theme_manager.style(icons_frame, 'card')
+        icons_frame.pack(side=tk.RIGHT, padx=3)
+
+        edit_button = tk.Button(icons_frame, text="✏️",
+                                command=lambda: self.edit_group_item(self.current_group_id, card_container.item_id),
+                                font=('Segoe UI', 10), bd=0,
+                                padx=2)
+        self.theme_manager.style(edit_button, 'card_text')
+        edit_button.pack(side=tk.LEFT)
+
+        delete_button = tk.Button(icons_frame, text="🗑️",
+                                command=lambda: self.remove_item_from_group(self.current_group_id, card_container.item_id),
+                                font=('Segoe UI', 10), bd=0,
+                                padx=2)
+        self.theme_manager.style(delete_button, 'card_text')
+        delete_button.pack(side=tk.LEFT)
+        return card_container
+
+    def bind_item_card(self, card, item_id, index):
+        item = self.group_items[item_id]
+        card.item_id = item_id
+        processed_text, _, _ = self.item_preview(item)
+        card.text_label.configure(text=processed_text)
+
+        item_name = item.get('name', '')
+        if item_name:
+            card.name_label.configure(text=f"{item_name}:")
+            card.name_label.pack(padx=2, pady=0, fill=tk.X, side=tk.TOP, anchor='w', before=card.text_label)
+        else:
+            card.name_label.pack_forget()
         
-    def remove_item_from_group(self, group_id, item_id, items_frame):
-        self.clipboard_manager.group_manager.groups[group_id]['items'] = [item for item in self.clipboard_manager.group_manager.groups[group_id]['items'] if item['id'] != item_id]
-        self.clipboard_manager.group_manager.save_groups()
+    def remove_item_from_group(self, group_id, item_id):
+        group_manager = self.clipboard_manager.group_manager
+        group_manager.remove_item_from_group(group_id, item_id)
         self.refresh_group_content(group_id)
+        group_manager.refresh_groups()
 
     def edit_group_item(self, group_id, item_id):
-        item = next((item for item in self.clipboard_manager.group_manager.groups[group_id]['items'] if item['id'] == item_id), None)
+        item = self.clipboard_manager.group_manager.groups[group_id]['items'].get(item_id)
         if not item:
             return
 
@@ -200,50 +230,46 @@ class GroupContentManager:
         
         dialog.geometry(f"300x{initial_height}+{x}+{y}")
         
-        dialog.configure(bg=self.theme_manager.colors['dark']['bg'])
+        self.theme_manager.style(dialog, 'window')
         dialog.overrideredirect(True)
         dialog.attributes('-topmost', True)
 
         # Barra de título personalizada
-        title_frame = tk.Frame(dialog, bg=self.theme_manager.colors['dark']['bg'])
+        title_frame = tk.Frame(dialog)
+        self.theme_manager.style(title_frame, 'window')
         title_frame.pack(fill=tk.X, padx=4, pady=(4, 0))
 
-        title_label = tk.Label(title_frame, text="Editar Item", font=('Segoe UI', 10, 'bold'),
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
+        title_label = tk.Label(title_frame, text="Editar Item", font=('Segoe UI', 10, 'bold'))
+        self.theme_manager.style(title_label, 'title')
         title_label.pack(side=tk.LEFT, padx=0)
 
         close_button = tk.Button(title_frame, text="❌", command=dialog.destroy,
-                                font=('Segoe UI', 10, 'bold'), bd=0, padx=0,
-                                bg=self.theme_manager.colors['dark']['button_bg'],
-                                fg=self.theme_manager.colors['dark']['button_fg'])
+                                font=('Segoe UI', 10, 'bold'), bd=0, padx=0)
+        self.theme_manager.style(close_button, 'button')
         close_button.pack(side=tk.RIGHT)
         
         # Contenido
-        content_frame = tk.Frame(dialog, bg=self.theme_manager.colors['dark']['bg'])
+        content_frame = tk.Frame(dialog)
+        self.theme_manager.style(content_frame, 'window')
         content_frame.pack(fill=tk.BOTH, expand=True, padx=4, pady=0)
 
-        name_label = tk.Label(content_frame, text="Nombre del item:",
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
+        name_label = tk.Label(content_frame, text="Nombre del item:")
+        self.theme_manager.style(name_label, 'title')
         name_label.pack(anchor='w', pady=(0, 5))
 
-        name_entry = tk.Entry(content_frame, bg=self.theme_manager.colors['dark']['button_bg'],
-                            fg=self.theme_manager.colors['dark']['fg'],
-                            insertbackground=self.theme_manager.colors['dark']['fg'],
+        name_entry = tk.Entry(content_frame,
                             font=('Segoe UI', 10))
+        self.theme_manager.style(name_entry, 'entry')
         name_entry.insert(0, item.get('name', ''))
         name_entry.pack(fill=tk.X, pady=(0, 5))
 
-        text_label = tk.Label(content_frame, text="Texto del item:",
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
+        text_label = tk.Label(content_frame, text="Texto del item:")
+        self.theme_manager.style(text_label, 'title')
         text_label.pack(anchor='w', pady=(0, 5))
 
-        text_entry = tk.Text(content_frame, height=3, bg=self.theme_manager.colors['dark']['button_bg'],
-                            fg=self.theme_manager.colors['dark']['fg'],
-                            insertbackground=self.theme_manager.colors['dark']['fg'],
+        text_entry = tk.Text(content_frame, height=3,
                             font=('Segoe UI', 10))
+        self.theme_manager.style(text_entry, 'entry')
         text_entry.insert(tk.END, item['text'])
         text_entry.pack(fill=tk.BOTH, expand=True, pady=(0, 5))
 
@@ -253,13 +279,13 @@ class GroupContentManager:
             if new_text:
                 item['name'] = new_name
                 item['text'] = new_text
-                self.clipboard_manager.group_manager.save_groups()
+                self.clipboard_manager.group_manager.reindex_group_item(group_id, item)
+                self.clipboard_manager.group_manager.persist_group(group_id)
                 dialog.destroy()
                 self.refresh_group_content(group_id)
 
-        save_button = tk.Button(content_frame, text="Guardar", command=save_item,
-                                bg=self.theme_manager.colors['dark']['button_bg'],
-                                fg=self.theme_manager.colors['dark']['button_fg'])
+        save_button = tk.Button(content_frame, text="Guardar", command=save_item)
+        self.theme_manager.style(save_button, 'button')
         save_button.pack(fill=tk.X, pady=(0, 5))
 
         # Hacer la ventana arrastrable
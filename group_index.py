@@ -0,0 +1,59 @@
+# group_index.py
+
+from utils import content_digest
+
+
+def items_by_id(items):
+    """Items de un grupo como diccionario id -> item; acepta la lista del formato guardado."""
+    if isinstance(items, dict):
+        return items
+    return {item['id']: item for item in items}
+
+
+class GroupIndex:
+    """
+    Índice inverso de pertenencia: id del item o huella de su texto -> grupos que
+    lo contienen. Se mantiene al agregar, quitar o editar items de un grupo.
+    """
+
+    def __init__(self):
+        self.by_item = {}    # id del item -> {id del grupo}
+        self.by_digest = {}  # huella del texto -> {id del grupo: items con esa huella}
+        self.digests = {}    # (id del grupo, id del item) -> huella indexada
+
+    def rebuild(self, groups):
+        self.by_item = {}
+        self.by_digest = {}
+        self.digests = {}
+        for group_id, group in groups.items():
+            for item in group['items'].values():
+                self.add(group_id, item)
+
+    def add(self, group_id, item):
+        digest = content_digest(item['text'])
+        self.digests[(group_id, item['id'])] = digest
+        self.by_item.setdefault(item['id'], set()).add(group_id)
+        counts = self.by_digest.setdefault(digest, {})
+        counts[group_id] = counts.get(group_id, 0) + 1
+
+    def remove(self, group_id, item_id):
+        digest = self.digests.pop((group_id, item_id), None)
+        group_ids = self.by_item.get(item_id)
+        if group_ids is not None:
+            group_ids.discard(group_id)
+            if not group_ids:
+                del self.by_item[item_id]
+        counts = self.by_digest.get(digest)
+        if counts is not None:
+            # Otro item del mismo grupo puede tener el mismo texto
+            counts[group_id] -= 1
+            if not counts[group_id]:
+                del counts[group_id]
+            if not counts:
+                del self.by_digest[digest]
+
+    def groups_for(self, item_id=None, digest=None):
+        found = set(self.by_item.get(item_id, ()))
+        if digest is not None:
+            found.update(self.by_digest.get(digest, ()))
+        return found
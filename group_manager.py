@@ -5,6 +5,8 @@ from tkinter import ttk, simpledialog, messagebox
 import uuid
 from settings_manager import SettingsManager
 from group_content_manager import GroupContentManager
+from group_index import GroupIndex
+from search_index import TrigramIndex
 
 
 class GroupManager:
@@ -15,110 +17,115 @@ class GroupManager:
         self.theme_manager = clipboard_manager.theme_manager
         self.settings = clipboard_manager.settings
         self.settings_manager = clipboard_manager.settings_manager
-        self.groups, _, _ = self.data_manager.load_data()
+        self.groups = clipboard_manager.data_store.groups
         self.groups_window = None
         self.groups_frame = None
+        self.groups_dirty = False
+        self.group_cards = {}  # id del grupo -> tarjeta mostrada en la ventana de grupos
+        self.shown_groups = []  # ids de los grupos empaquetados, en orden
+        # Pertenencia inversa: item o huella -> grupos que lo contienen
+        self.group_index = GroupIndex()
+        # Búsqueda por texto sobre los items de todos los grupos; clave (id del grupo, id del item)
+        self.search_index = TrigramIndex()  # Ambos índices se construyen en load_saved_data
         self.group_content_manager = GroupContentManager(master, clipboard_manager, clipboard_manager.theme_manager, clipboard_manager.settings_manager)
 
     def show_group_content(self, group_id):
         self.group_content_manager.show_group_content(group_id)
 
     def show_groups_window(self):
-        if self.groups_window is None or not self.groups_window.winfo_exists():
-            self.groups_window = tk.Toplevel(self.master)
-            self.groups_window.title("Grupos")
-            
-            window_width = self.settings['width']
-            window_height = self.settings['height']
-            # self.groups_window.geometry(f"{window_width}x{window_height}+0+0")
-            
-             # Calcula la posición relativa a la ventana principal
-            x = self.clipboard_manager.window_x + 10
-            y = self.clipboard_manager.window_y + 10
-            
-            self.groups_window.geometry(f"{window_width}x{window_height}+{x}+{y}")
-            
-            self.groups_window.overrideredirect(True) # Oculta la barra de título
-            
-            self.groups_window.configure(bg=self.theme_manager.colors['dark']['bg'])
-            self.groups_window.attributes('-topmost', True) # Hacer que la ventana esté siempre en primer plano
-            self.master.bind("<Destroy>", self.on_main_window_close) # Vincular el cierre de la ventana principal al cierre de la ventana de grupos
-
-            # Barra de título personalizada
-            title_frame = tk.Frame(self.groups_window, bg=self.theme_manager.colors['dark']['bg'])
-            title_frame.pack(fill=tk.X, padx=2, pady=(0, 0))
-
-            title_label = tk.Label(title_frame, text="Grupos", font=('Segoe UI', 10, 'bold'), 
-                                   bg=self.theme_manager.colors['dark']['bg'], 
-                                   fg=self.theme_manager.colors['dark']['fg'])
-            title_label.pack(side=tk.LEFT, padx=5)
-
-            # Botones en la barra de título
-            buttons_frame = tk.Frame(title_frame, bg=self.theme_manager.colors['dark']['bg'])
-            buttons_frame.pack(side=tk.RIGHT, padx=4)
-
-            add_button = tk.Button(buttons_frame, text="➕", command=self.add_group, 
-                                   font=('Segoe UI', 10), bd=0, padx=10, width=5, height=2,
-                                   bg=self.theme_manager.colors['dark']['button_bg'],
-                                   fg=self.theme_manager.colors['dark']['button_fg'])
-            add_button.pack(side=tk.LEFT)
-
-            close_button = tk.Button(buttons_frame, text="❌", command=self.groups_window.destroy, 
-                                     font=('Segoe UI', 10, 'bold'), bd=0, padx=10, width=5, height=2,
-                                     bg=self.theme_manager.colors['dark']['button_bg'],
-                                     fg=self.theme_manager.colors['dark']['button_fg'])
-            close_button.pack(side=tk.LEFT)
-
-            # # Marco para la lista de grupos
-            # self.groups_frame = tk.Frame(self.groups_window, bg=self.theme_manager.colors['dark']['bg'])
-            # self.groups_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
-
-            # # Hacer la ventana arrastrable
-            # title_label.bind('<Button-1>', self.start_move)
-            # title_label.bind('<B1-Motion>', self.on_move)
-            
-            # Canvas para scroll y contenedor de grupos
-            canvas = tk.Canvas(self.groups_window, bg=self.theme_manager.colors['dark']['bg'], bd=0, highlightthickness=0)
-            canvas.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+        window_width = self.settings['width']
+        window_height = self.settings['height']
+        
+         # Calcula la posición relativa a la ventana principal
+        x = self.clipboard_manager.window_x + 10
+        y = self.clipboard_manager.window_y + 10
+        
+        # La ventana se crea la primera vez; después solo se vuelve a mostrar
+        self.groups_window = self.clipboard_manager.window_cache.show(
+            'groups', self.build_groups_window, self.refresh_groups_if_dirty,
+            f"{window_width}x{window_height}+{x}+{y}", wheel=self.on_mousewheel)
+
+    def build_groups_window(self):
+        self.groups_window = tk.Toplevel(self.master)
+        self.groups_window.title("Grupos")
+        
+        self.groups_window.overrideredirect(True) # Oculta la barra de título
+        
+        self.theme_manager.style(self.groups_window, 'window')
+        self.groups_window.attributes('-topmost', True) # Hacer que la ventana esté siempre en primer plano
+        self.master.bind("<Destroy>", self.on_main_window_close) # Vincular el cierre de la ventana principal al cierre de la ventana de grupos
 
-            # Scrollbar oculto
-            scrollbar = ttk.Scrollbar(self.groups_window, orient=tk.VERTICAL, command=canvas.yview)
-            canvas.configure(yscrollcommand=scrollbar.set)
+        # Barra de título personalizada
+        title_frame = tk.Frame(self.groups_window)
+        self.theme_manager.style(title_frame, 'window')
+        title_frame.pack(fill=tk.X, padx=2, pady=(0, 0))
+
+        title_label = tk.Label(title_frame, text="Grupos", font=('Segoe UI', 10, 'bold'))
+        self.theme_manager.style(title_label, 'title')
+        title_label.pack(side=tk.LEFT, padx=5)
+
+        # Botones en la barra de título
+        buttons_frame = tk.Frame(title_frame)
+        self.theme_manager.style(buttons_frame, 'window')
+        buttons_frame.pack(side=tk.RIGHT, padx=4)
+
+        add_button = tk.Button(buttons_frame, text="➕", command=self.add_group,
+                               font=('Segoe UI', 10), bd=0, padx=10, width=5, height=2)
+        self.theme_manager.style(add_button, 'button')
+        add_button.pack(side=tk.LEFT)
+
+        close_button = tk.Button(buttons_frame, text="❌", command=self.hide_groups_window,
+                                 font=('Segoe UI', 10, 'bold'), bd=0, padx=10, width=5, height=2)
+        self.theme_manager.style(close_button, 'button')
+        close_button.pack(side=tk.LEFT)
+
+        # # Marco para la lista de grupos
+        # self.groups_frame = tk.Frame(self.groups_window, bg=self.theme_manager.colors['dark']['bg'])
+        # self.groups_frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
+
+        # # Hacer la ventana arrastrable
+        # title_label.bind('<Button-1>', self.start_move)
+        # title_label.bind('<B1-Motion>', self.on_move)
+        
+        # Canvas para scroll y contenedor de grupos
+        canvas = self.groups_canvas = tk.Canvas(self.groups_window, bd=0, highlightthickness=0)
+        self.theme_manager.style(canvas, 'window')
+        canvas.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
 
-            # Frame contenedor dentro del canvas para el scroll
-            self.groups_frame = tk.Frame(canvas, bg=self.theme_manager.colors['dark']['bg'])
-            canvas_window = canvas.create_window((0, 0), window=self.groups_frame, anchor='nw', width=295)
+        # Scrollbar oculto
+        scrollbar = ttk.Scrollbar(self.groups_window, orient=tk.VERTICAL, command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
 
-            # Ajustar el ancho del frame contenedor al canvas
-            def on_canvas_resize(event):
-                canvas.itemconfig(canvas_window, width=event.width)
+        # Frame contenedor dentro del canvas para el scroll
+        self.groups_frame = tk.Frame(canvas)
+        self.theme_manager.style(self.groups_frame, 'window')
+        canvas_window = canvas.create_window((0, 0), window=self.groups_frame, anchor='nw', width=295)
 
-            canvas.bind("<Configure>", on_canvas_resize)
+        # Ajustar el ancho del frame contenedor al canvas
+        def on_canvas_resize(event):
+            canvas.itemconfig(canvas_window, width=event.width)
 
-            # Configuración de scroll
-            def on_frame_configure(event):
-                canvas.configure(scrollregion=canvas.bbox("all"))
+        canvas.bind("<Configure>", on_canvas_resize)
 
-            self.groups_frame.bind("<Configure>", on_frame_configure)
+        # Configuración de scroll
+        def on_frame_configure(event):
+            canvas.configure(scrollregion=canvas.bbox("all"))
 
-            # Función para desplazamiento con la rueda del mouse
-            def _on_mousewheel(event):
-                canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        self.groups_frame.bind("<Configure>", on_frame_configure)
 
-            canvas.bind_all("<MouseWheel>", _on_mousewheel)
+        # Hacer la ventana arrastrable
+        title_label.bind('<Button-1>', self.start_move)
+        title_label.bind('<B1-Motion>', self.on_move)
 
-            # Hacer la ventana arrastrable
-            title_label.bind('<Button-1>', self.start_move)
-            title_label.bind('<B1-Motion>', self.on_move)
+        self.refresh_groups(force=True)
+        return self.groups_window
 
-            self.refresh_groups()
+    def on_mousewheel(self, event):
+        self.groups_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+
+    def hide_groups_window(self):
+        self.clipboard_manager.window_cache.hide('groups')
 
-        # Si la ventana de grupos ya estaba abierta, llevarla al frente
-        else:
-            self.groups_window.lift()
-            self.groups_window.attributes('-topmost', True)
-            self.groups_window.after_idle(self.groups_window.attributes, '-topmost', False)
-        
     def start_move(self, event):
         self.x = event.x
         self.y = event.y
@@ -130,66 +137,175 @@ class GroupManager:
         y = self.groups_window.winfo_y() + deltay
         self.groups_window.geometry(f"+{x}+{y}")
 
-    def refresh_groups(self):
+    def refresh_groups_if_dirty(self, window=None):
+        if self.groups_dirty:
+            self.refresh_groups(force=True)
+
+    def refresh_groups(self, force=False):
         if self.groups_frame is None or not self.groups_frame.winfo_exists():
             return
+        if not force and not self.groups_window.winfo_viewable():
+            # Ventana oculta: se actualiza al volver a mostrarse
+            self.groups_dirty = True
+            return
+        self.groups_dirty = False
 
-        for widget in self.groups_frame.winfo_children():
-            widget.destroy()
+        # Reconciliación por id de grupo: las tarjetas existentes solo actualizan sus textos
+        for group_id in [gid for gid in self.group_cards if gid not in self.groups]:
+            self.group_cards.pop(group_id).destroy()
 
+        query = self.clipboard_manager.search_query
+        shown = []
         for group_id, group_info in self.groups.items():
-            group_card = tk.Frame(self.groups_frame, bg=self.theme_manager.colors['dark']['card_bg'], cursor="hand2")
-            group_card.pack(fill=tk.X, padx=4, pady=2)
-            
-            group_card.bind("<Button-1>", lambda e, gid=group_id: self.show_group_content(gid))
-
-            name_label = tk.Label(group_card, text=group_info['name'], font=("Segoe UI", 10, "bold"),
-                                bg=self.theme_manager.colors['dark']['card_bg'],
-                                fg=self.theme_manager.colors['dark']['fg'])
-            name_label.pack(side=tk.LEFT, padx=5, pady=5)
-
-            count_label = tk.Label(group_card, text=f"Items: {len(group_info['items'])}",
-                                bg=self.theme_manager.colors['dark']['card_bg'],
-                                fg=self.theme_manager.colors['dark']['fg'])
-            count_label.pack(side=tk.LEFT, padx=5, pady=5)
-            
-            delete_button = tk.Button(group_card, text="    🗑️", command=lambda gid=group_id: self.delete_group(gid),
-                                    font=('Segoe UI', 10), bd=0, bg=self.theme_manager.colors['dark']['button_bg'],
-                                    fg=self.theme_manager.colors['dark']['button_fg'])
-            delete_button.pack(side=tk.RIGHT, padx=2, pady=5)
+            group_card = self.group_cards.get(group_id)
+            if group_card is None:
+                group_card = self.group_cards[group_id] = self.create_group_card(group_id)
+            name = group_info['name']
+            count = f"Items: {len(group_info['items'])}"
+            if query:
+                # Con una búsqueda activa solo quedan los grupos con coincidencias
+                matches = len(self.search_matches(group_id))
+                if not matches:
+                    continue
+                count = f"Items: {matches}/{len(group_info['items'])}"
+            shown.append(group_id)
+            if group_card.name_label.cget('text') != name:
+                group_card.name_label.configure(text=name)
+            if group_card.count_label.cget('text') != count:
+                group_card.count_label.configure(text=count)
+
+        if shown != self.shown_groups:
+            # Solo se empaquetan o quitan las tarjetas que entran o salen; el orden de los grupos no cambia
+            previous = set(self.shown_groups)
+            for group_id in previous.difference(shown):
+                if group_id in self.group_cards:  # Las de grupos borrados ya se destruyeron
+                    self.group_cards[group_id].pack_forget()
+            following = None
+            for group_id in reversed(shown):
+                group_card = self.group_cards[group_id]
+                if group_id not in previous:
+                    if following is None:
+                        group_card.pack(fill=tk.X, padx=4, pady=2)
+                    else:
+                        group_card.pack(fill=tk.X, padx=4, pady=2, before=following)
+                following = group_card
+            self.shown_groups = shown
+
+    def create_group_card(self, group_id):
+        group_card = tk.Frame(self.groups_frame, cursor="hand2")
+        self.theme_manager.style(group_card, 'card')
+        
+        group_card.bind("<Button-1>", lambda e, gid=group_id: self.show_group_content(gid))
 
-            edit_button = tk.Button(group_card, text="✏️", command=lambda gid=group_id: self.edit_group(gid),
-                                    font=('Segoe UI', 10), bd=0, bg=self.theme_manager.colors['dark']['button_bg'],
-                                    fg=self.theme_manager.colors['dark']['button_fg'])
-            edit_button.pack(side=tk.RIGHT, padx=2, pady=5)
+        group_card.name_label = tk.Label(group_card, font=("Segoe UI", 10, "bold"))
+        self.theme_manager.style(group_card.name_label, 'card_text')
+        group_card.name_label.pack(side=tk.LEFT, padx=5, pady=5)
 
+        group_card.count_label = tk.Label(group_card)
+        self.theme_manager.style(group_card.count_label, 'card_text')
+        group_card.count_label.pack(side=tk.LEFT, padx=5, pady=5)
+        
+        delete_button = tk.Button(group_card, text="    🗑️", command=lambda gid=group_id: self.delete_group(gid),
+                                font=('Segoe UI', 10), bd=0)
+        self.theme_manager.style(delete_button, 'button')
+        delete_button.pack(side=tk.RIGHT, padx=2, pady=5)
+
+        edit_button = tk.Button(group_card, text="✏️", command=lambda gid=group_id: self.edit_group(gid),
+                                font=('Segoe UI', 10), bd=0)
+        self.theme_manager.style(edit_button, 'button')
+        edit_button.pack(side=tk.RIGHT, padx=2, pady=5)
+        return group_card
             
-            
-    def save_groups(self):
-        pinned_items = {k: v for k, v in self.clipboard_manager.clipboard_items.items() if v['pinned']}
-        self.data_manager.save_data(self.groups, pinned_items, self.clipboard_manager.settings)
-        print("Groups and pinned items saved")
+    def persist_group(self, group_id):
+        # Notifica solo el grupo modificado; el hilo de guardado agrupa las escrituras
+        writer = self.clipboard_manager.persistence_writer
+        if group_id in self.groups:
+            group = self.groups[group_id]
+            writer.mark_dirty('groups', group_id,
+                              {**group, 'items': {item_id: dict(item) for item_id, item in group['items'].items()}})
+        else:
+            writer.mark_deleted('groups', group_id)
+
+    def persist_item(self, item_id):
+        # Los anclados se guardan en 'pinned_items' y el resto del historial en memoria en 'history';
+        # al borrarlo, archivarlo o pasarlo a la otra sección se anexa su eliminación
+        writer = self.clipboard_manager.persistence_writer
+        item_data = self.clipboard_manager.clipboard_items.get(item_id)
+        section = None
+        if item_data and item_data['pinned']:
+            section = 'pinned_items'
+        elif item_data and self.clipboard_manager.settings.get('archive_history', True):
+            section = 'history'
+        for other in ('pinned_items', 'history'):
+            if other != section:
+                writer.mark_deleted(other, item_id)
+        if section:
+            writer.mark_dirty(section, item_id, dict(item_data))
         
     def edit_group(self, group_id):
         self.show_edit_group_dialog(group_id)
 
+    def remove_item_from_group(self, group_id, item_id):
+        item = self.groups[group_id]['items'].pop(item_id, None)
+        if item is not None:
+            self.unindex_group_item(group_id, item_id)
+            self.persist_group(group_id)
+        return item
+
+    def rebuild_index(self):
+        self.group_index.rebuild(self.groups)
+        self.search_index.clear()
+        for group_id, group in self.groups.items():
+            for item_id, item in group['items'].items():
+                self.search_index.add((group_id, item_id), item['text'])
+
+    def index_group_item(self, group_id, item):
+        self.group_index.add(group_id, item)
+        self.search_index.add((group_id, item['id']), item['text'])
+
+    def unindex_group_item(self, group_id, item_id):
+        self.group_index.remove(group_id, item_id)
+        self.search_index.remove((group_id, item_id))
+
+    def reindex_group_item(self, group_id, item):
+        # El texto del item se editó
+        self.unindex_group_item(group_id, item['id'])
+        self.index_group_item(group_id, item)
+
+    def search_matches(self, group_id):
+        """Ids de los items del grupo que coinciden con la búsqueda actual, en su orden."""
+        items = self.groups[group_id]['items']
+        query = self.clipboard_manager.search_query
+        if not query:
+            return list(items)
+        # Resultados difusos si ya llegaron; si no, coincidencias exactas
+        matches = self.clipboard_manager.search_results
+        if matches is None:
+            matches = self.search_index.search(query)
+        return [item_id for item_id in items if (group_id, item_id) in matches]
+
     def delete_group(self, group_id):
         # if tk.messagebox.askyesno("Eliminar Grupo", "¿Está seguro de que desea eliminar este grupo?"):
-        del self.groups[group_id]
+        for item_id in self.groups.pop(group_id)['items']:
+            self.unindex_group_item(group_id, item_id)
+        if self.group_content_manager.current_group_id == group_id:
+            self.group_content_manager.hide_group_content()
         self.refresh_groups()
-        self.save_groups()
+        self.persist_group(group_id)
 
     def add_item_to_group(self, item_id, group_id):
         if group_id in self.groups:
-            item_data = self.clipboard_manager.clipboard_items.get(item_id)
-            if item_data and item_id not in [item['id'] for item in self.groups[group_id]['items']]:
-                self.groups[group_id]['items'].append({
+            item_data = self.clipboard_manager.functions.item_data(item_id)
+            if item_data and item_id not in self.groups[group_id]['items']:
+                item = self.groups[group_id]['items'][item_id] = {
                     'id': item_id,
                     'text': item_data['text']
-                })
-                self.save_groups()
+                }
+                self.index_group_item(group_id, item)
+                self.persist_group(group_id)
                 if self.groups_window and self.groups_window.winfo_exists():
                     self.refresh_groups()
+                self.group_content_manager.refresh_if_showing(group_id)
                 print(f"Item {item_id} added to group {group_id}")
                 
                 # Actualizar la vista principal si es necesario
@@ -219,61 +335,56 @@ class GroupManager:
         
         dialog.geometry(f"+{x}+{y}")
         
-        dialog.configure(bg=self.theme_manager.colors['dark']['bg'])
+        self.theme_manager.style(dialog, 'window')
         dialog.overrideredirect(True)
         dialog.attributes('-topmost', True)
 
         # Barra de título personalizada
-        title_frame = tk.Frame(dialog, bg=self.theme_manager.colors['dark']['bg'])
+        title_frame = tk.Frame(dialog)
+        self.theme_manager.style(title_frame, 'window')
         title_frame.pack(fill=tk.X, padx=4, pady=(4, 0))
 
-        title_label = tk.Label(title_frame, text="Nuevo Grupo", font=('Segoe UI', 10, 'bold'),
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
+        title_label = tk.Label(title_frame, text="Nuevo Grupo", font=('Segoe UI', 10, 'bold'))
+        self.theme_manager.style(title_label, 'title')
         title_label.pack(side=tk.LEFT, padx=0)
 
         close_button = tk.Button(title_frame, text="❌", command=dialog.destroy,
-                                font=('Segoe UI', 10, 'bold'), bd=0, padx=0,
-                                bg=self.theme_manager.colors['dark']['button_bg'],
-                                fg=self.theme_manager.colors['dark']['button_fg'])
+                                font=('Segoe UI', 10, 'bold'), bd=0, padx=0)
+        self.theme_manager.style(close_button, 'button')
         close_button.pack(side=tk.RIGHT)
 
         # Contenido
-        content_frame = tk.Frame(dialog, bg=self.theme_manager.colors['dark']['bg'])
+        content_frame = tk.Frame(dialog)
+        self.theme_manager.style(content_frame, 'window')
         content_frame.pack(fill=tk.BOTH, expand=True, padx=4, pady=0)
 
-        name_label = tk.Label(content_frame, text="Nombre del grupo:",
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
+        name_label = tk.Label(content_frame, text="Nombre del grupo:")
+        self.theme_manager.style(name_label, 'title')
         name_label.pack(anchor='w', pady=(0, 5))
 
-        name_entry = tk.Entry(content_frame, bg=self.theme_manager.colors['dark']['button_bg'],
-                            fg=self.theme_manager.colors['dark']['fg'],
-                            insertbackground=self.theme_manager.colors['dark']['fg'],
+        name_entry = tk.Entry(content_frame,
                             relief=tk.FLAT,  # Quita el efecto 3D
                             bd=0,  # Quita el borde
                             highlightthickness=1,  # Añade un borde fino
-                            highlightcolor=self.theme_manager.colors['dark'].get('highlight', '#555555'),  # Color del borde cuando tiene foco
-                            highlightbackground=self.theme_manager.colors['dark'].get('border', '#333333'))  # Color del borde cuando no tiene foco
+                            highlightcolor='#555555',  # Color del borde cuando tiene foco
+                            highlightbackground='#333333')  # Color del borde cuando no tiene foco
+        self.theme_manager.style(name_entry, 'entry')
         name_entry.pack(fill=tk.X, pady=(0, 0))
 
         def save_group():
             name = name_entry.get().strip()
             if name:
                 group_id = str(uuid.uuid4())
-                self.groups[group_id] = {'name': name, 'items': []}
+                self.groups[group_id] = {'name': name, 'items': {}}
                 self.refresh_groups()
-                self.save_groups()
+                self.persist_group(group_id)
                 dialog.destroy()
 
         save_button = tk.Button(content_frame, text="Guardar", command=save_group,
-                                bg=self.theme_manager.colors['dark']['button_bg'],
-                                fg=self.theme_manager.colors['dark']['button_fg'],
-                                activebackground=self.theme_manager.colors['dark'].get('active_bg', '#4E4E4E'),
-                                activeforeground=self.theme_manager.colors['dark'].get('active_fg', '#FFFFFF'),
                                 relief=tk.FLAT,  # Elimina el estilo 3D
                                 bd=0,  # Elimina el borde
                                 padx=4, pady=5)
+        self.theme_manager.style(save_button, 'dialog_button')
         save_button.pack(fill=tk.X, expand=True, pady=(0, 0))
 
         # Hacer la ventana arrastrable
@@ -315,42 +426,40 @@ class GroupManager:
         
         dialog.geometry(f"200x115+{x}+{y}")
         
-        dialog.configure(bg=self.theme_manager.colors['dark']['bg'])
+        self.theme_manager.style(dialog, 'window')
         dialog.overrideredirect(True)
         dialog.attributes('-topmost', True)
 
         # Barra de título personalizada
-        title_frame = tk.Frame(dialog, bg=self.theme_manager.colors['dark']['bg'])
+        title_frame = tk.Frame(dialog)
+        self.theme_manager.style(title_frame, 'window')
         title_frame.pack(fill=tk.X, padx=4, pady=(4, 0))
 
-        title_label = tk.Label(title_frame, text="Editar Grupo", font=('Segoe UI', 10, 'bold'),
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
+        title_label = tk.Label(title_frame, text="Editar Grupo", font=('Segoe UI', 10, 'bold'))
+        self.theme_manager.style(title_label, 'title')
         title_label.pack(side=tk.LEFT, padx=0)
 
         close_button = tk.Button(title_frame, text="❌", command=dialog.destroy,
-                                font=('Segoe UI', 10, 'bold'), bd=0, padx=0,
-                                bg=self.theme_manager.colors['dark']['button_bg'],
-                                fg=self.theme_manager.colors['dark']['button_fg'])
+                                font=('Segoe UI', 10, 'bold'), bd=0, padx=0)
+        self.theme_manager.style(close_button, 'button')
         close_button.pack(side=tk.RIGHT)
 
         # Contenido
-        content_frame = tk.Frame(dialog, bg=self.theme_manager.colors['dark']['bg'])
+        content_frame = tk.Frame(dialog)
+        self.theme_manager.style(content_frame, 'window')
         content_frame.pack(fill=tk.BOTH, expand=True, padx=4, pady=0)
 
-        name_label = tk.Label(content_frame, text="Nuevo nombre del grupo:",
-                            bg=self.theme_manager.colors['dark']['bg'],
-                            fg=self.theme_manager.colors['dark']['fg'])
+        name_label = tk.Label(content_frame, text="Nuevo nombre del grupo:")
+        self.theme_manager.style(name_label, 'title')
         name_label.pack(anchor='w', pady=(0, 5))
 
-        name_entry = tk.Entry(content_frame, bg=self.theme_manager.colors['dark']['button_bg'],
-                            fg=self.theme_manager.colors['dark']['fg'],
-                            insertbackground=self.theme_manager.colors['dark']['fg'],
+        name_entry = tk.Entry(content_frame,
                             relief=tk.FLAT,  # Quita el efecto 3D
                             bd=0,  # Quita el borde
                             highlightthickness=1,  # Añade un borde fino
-                            highlightcolor=self.theme_manager.colors['dark'].get('highlight', '#555555'),  # Color del borde cuando tiene foco
-                            highlightbackground=self.theme_manager.colors['dark'].get('border', '#333333'))  # Color del borde cuando no tiene foco
+                            highlightcolor='#555555',  # Color del borde cuando tiene foco
+                            highlightbackground='#333333')  # Color del borde cuando no tiene foco
+        self.theme_manager.style(name_entry, 'entry')
         name_entry.insert(0, self.groups[group_id]['name'])
         name_entry.pack(fill=tk.X, pady=(0, 0))
 
@@ -359,17 +468,14 @@ class GroupManager:
             if new_name:
                 self.groups[group_id]['name'] = new_name
                 self.refresh_groups()
-                self.save_groups()
+                self.persist_group(group_id)
                 dialog.destroy()
 
         save_button = tk.Button(content_frame, text="Guardar", command=save_group,
-                                bg=self.theme_manager.colors['dark']['button_bg'],
-                                fg=self.theme_manager.colors['dark']['button_fg'],
-                                activebackground=self.theme_manager.colors['dark'].get('active_bg', '#4E4E4E'),
-                                activeforeground=self.theme_manager.colors['dark'].get('active_fg', '#FFFFFF'),
                                 relief=tk.FLAT,  # Elimina el estilo 3D
                                 bd=0,  # Elimina el borde
                                 padx=4, pady=5)
+        self.theme_manager.style(save_button, 'dialog_button')
         save_button.pack(fill=tk.X, expand=True, pady=(0, 0))  # Hace que el botón ocupe todo el ancho disponible
 
         # Hacer la ventana arrastrable
@@ -0,0 +1,369 @@
+# history_archive.py
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from search_index import text_of, trigrams
+from utils import file_size
+
+# Registro del índice: posición, largo, líneas, instante de archivo, frecencia, huella (16 bytes),
+# largo del texto de búsqueda, firma del texto (32 bytes), id (36 bytes)
+INDEX_RECORD = struct.Struct('<QIIdd16sI32s36s')
+TOMBSTONE = (0, 0, 0, 0.0, 0.0, '00' * 16, 0, 0)
+
+SIGNATURE_BITS = 256
+SIGNATURE_CHARS = 4096  # Un texto más largo tendría casi todos los bits puestos: se le ponen todos
+FULL_SIGNATURE = (1 << SIGNATURE_BITS) - 1
+
+
+def signature(parts):
+    bits = 0
+    for part in parts:
+        bits |= 1 << (zlib.crc32(part.encode('utf-8', 'surrogatepass')) % SIGNATURE_BITS)
+    return bits
+
+
+def text_signature(text):
+    """Bits de las letras y trigramas del texto: si contiene una consulta, tiene todos los bits de la consulta."""
+    if len(text) > SIGNATURE_CHARS:
+        return FULL_SIGNATURE
+    return signature(set(text) | trigrams(text))
+
+
+def query_signature(query, substring=True):
+    # En la búsqueda difusa la consulta puede aparecer salteada: solo cuentan sus letras
+    query = query.lower()
+    return signature(set(query) | trigrams(query)) if substring else signature(set(query))
+
+
+def pack_record(item_id, entry):
+    offset, length, lines, archived_at, frecency, digest, text_length, bits = entry
+    return INDEX_RECORD.pack(offset, length, lines, archived_at, frecency, bytes.fromhex(digest), text_length,
+                             bits.to_bytes(SIGNATURE_BITS // 8, 'little'), item_id.encode('ascii'))
+
+
+class HistoryArchive:
+    """
+    Historial antiguo en disco. Los items se anexan como JSON a un archivo de
+    datos que se lee con mmap, seguidos de su texto de búsqueda en minúsculas.
+    Al lado hay un índice de registros de tamaño fijo, que es lo único que se
+    carga al iniciar; cada registro lleva una firma del texto que permite
+    descartar sin leerlo los items que no pueden coincidir con una consulta. Los borrados anexan una
+    lápida (largo 0) al índice y, cuando lo borrado supera a lo vivo, ambos
+    archivos se reescriben en segundo plano sin bloquear las lecturas. Los items leídos quedan en una
+    caché LRU pequeña.
+    """
+
+    def __init__(self, base_path='clipboard_archive', cache_size=256, min_garbage=1 << 20, min_tombstones=4096,
+                 search_chars=100_000):
+        self.data_path = base_path + '.dat'
+        self.index_path = base_path + '.idx'
+        self.cache_size = cache_size
+        self.search_chars = search_chars  # Como en TrigramIndex, solo se busca en el comienzo de los textos enormes
+        self.min_garbage = min_garbage        # Bytes sin uso en el archivo de datos antes de compactar
+        self.min_tombstones = min_tombstones  # Registros sin uso en el índice antes de compactar
+        self.cache = OrderedDict()  # id -> item leído del disco
+        # id -> (posición, largo, líneas, instante, frecencia, huella, largo del texto, firma), del más viejo al más nuevo
+        self.entries = OrderedDict()
+        self.by_digest = {}  # huella -> id
+        self.by_frecency = []  # [(frecencia, id)] del menos al más útil
+        self.lock = threading.Lock()  # El hilo de búsqueda también lee el archivo
+        self.map = None
+        self.version = 0
+        self.oldest_first = None
+        self.live_bytes = 0     # Bytes de los items vivos
+        self.data_size = 0      # Tamaño del archivo de datos
+        self.index_records = 0  # Registros del índice, incluidas las lápidas y los reemplazados
+        self.compaction_thread = None
+        self.compaction_changes = None  # Ids anexados o borrados mientras se compacta en segundo plano
+        self.generation = 0  # Cambia al vaciar los archivos
+        self.closed = False
+        self.load_index()
+        if self.needs_compaction() and os.path.exists(self.data_path):
+            self.compact()
+        self.open_files()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, item_id):
+        return item_id in self.entries
+
+    def load_index(self):
+        self.data_size = file_size(self.data_path)
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as f:
+            data = f.read()
+        usable = len(data) - len(data) % INDEX_RECORD.size  # Un registro a medias se ignora
+        for record in INDEX_RECORD.iter_unpack(data[:usable]):
+            offset, length, lines, archived_at, frecency, digest, text_length, bits, raw_id = record
+            item_id = raw_id.rstrip(b'\0').decode('ascii')
+            self.entries.pop(item_id, None)
+            if length:
+                self.entries[item_id] = (offset, length, lines, archived_at, frecency, digest.hex(),
+                                         text_length, int.from_bytes(bits, 'little'))
+        self.by_digest = {entry[5]: item_id for item_id, entry in self.entries.items()}
+        self.by_frecency = sorted((entry[4], item_id) for item_id, entry in self.entries.items())
+        self.live_bytes = sum(entry[1] for entry in self.entries.values())
+        self.index_records = usable // INDEX_RECORD.size
+        print(f"Archivo del historial: {len(self.entries)} items indexados")
+
+    def needs_compaction(self):
+        # Los items devueltos a memoria o borrados dejan su registro en el archivo de datos y su lápida en el índice
+        garbage = self.data_size - self.live_bytes
+        tombstones = self.index_records - len(self.entries)
+        return (garbage > max(self.live_bytes, self.min_garbage)
+                or tombstones > max(len(self.entries), self.min_tombstones))
+
+    def compact_if_needed(self):
+        # Como la compactación del diario, la reescritura va en un hilo aparte
+        if not self.needs_compaction() or (self.compaction_thread and self.compaction_thread.is_alive()):
+            return
+        self.compaction_thread = threading.Thread(target=self.compact_in_place, daemon=True)
+        self.compaction_thread.start()
+
+    def compact_in_place(self):
+        # Los items vivos se copian sin el candado: mientras tanto se puede anexar, leer y borrar.
+        # El candado se toma al final, para copiar lo que cambió en el medio y reemplazar los archivos
+        with self.lock:
+            if self.closed:
+                return
+            snapshot = list(self.entries.items())
+            copied_size = self.data_size
+            generation = self.generation
+            self.compaction_changes = []
+        try:
+            entries = self.copy_entries(snapshot)
+            with self.lock:
+                if self.closed or self.generation != generation:
+                    return  # Se vació o se cerró mientras se copiaba: la copia ya no sirve
+                self.copy_changes(entries, copied_size)
+                self.close_files()
+                try:
+                    self.replace_files(entries)
+                finally:
+                    self.open_files()
+        except OSError as e:
+            print(f"Error al compactar el archivo del historial: {e}")
+        finally:
+            self.compaction_changes = None
+
+    def compact(self):
+        """Reescribe los archivos solo con los items vivos; deben estar cerrados."""
+        self.replace_files(self.copy_entries(self.entries.items()))
+
+    def copy_entries(self, entries):
+        # Copia los registros a los archivos temporales; devuelve las entradas con sus nuevas posiciones
+        copied = OrderedDict()
+        with open(self.data_path, 'rb') as source, \
+                open(self.data_path + '.tmp', 'wb') as data, open(self.index_path + '.tmp', 'wb') as index:
+            for item_id, entry in entries:
+                copied[item_id] = self.copy_entry(source, data, index, item_id, entry)
+        return copied
+
+    def copy_changes(self, entries, copied_size):
+        """Lleva a la copia lo anexado o borrado mientras se hacía; se llama con el candado."""
+        changed = set(self.compaction_changes)
+        tail = []
+        with open(self.data_path, 'rb') as source, \
+                open(self.data_path + '.tmp', 'ab') as data, open(self.index_path + '.tmp', 'ab') as index:
+            for item_id in changed:
+                entries.pop(item_id, None)
+                entry = self.entries.get(item_id)
+                if entry is None:
+                    index.write(pack_record(item_id, TOMBSTONE))
+                elif entry[0] >= copied_size:
+                    tail.append((entry[0], item_id))
+            # Lo anexado va al final, en el mismo orden que en el archivo
+            for _, item_id in sorted(tail):
+                entries[item_id] = self.copy_entry(source, data, index, item_id, self.entries[item_id])
+
+    def copy_entry(self, source, data, index, item_id, entry):
+        source.seek(entry[0])
+        copied = (data.tell(),) + entry[1:]
+        data.write(source.read(entry[1]))
+        index.write(pack_record(item_id, copied))
+        return copied
+
+    def replace_files(self, entries):
+        os.replace(self.data_path + '.tmp', self.data_path)
+        os.replace(self.index_path + '.tmp', self.index_path)
+        self.entries = entries
+        self.data_size = file_size(self.data_path)
+        self.index_records = file_size(self.index_path) // INDEX_RECORD.size
+        print(f"Archivo del historial compactado: {len(entries)} items")
+
+    def ids(self):
+        """Ids del más antiguo al más reciente; la lista se reutiliza hasta el próximo cambio."""
+        if self.oldest_first is None:
+            self.oldest_first = list(self.entries)
+        return self.oldest_first
+
+    def lines(self, item_id):
+        return self.entries[item_id][2]
+
+    def digest(self, item_id):
+        return self.entries[item_id][5]
+
+    def append(self, item_id, item, digest, frecency=0.0):
+        text = text_of(item.get('text', ''))
+        lowered = text[:self.search_chars].lower()
+        encoded_text = lowered.encode('utf-8', 'surrogatepass')
+        payload = json.dumps(item, default=str).encode('utf-8') + encoded_text
+        lines = text.count('\n') + 1
+        with self.lock:
+            self.data_file.seek(0, os.SEEK_END)
+            offset = self.data_file.tell()
+            self.data_file.write(payload)
+            self.data_file.flush()
+            self.data_size = offset + len(payload)
+            entry = (offset, len(payload), lines, time.time(), frecency, digest,
+                     len(encoded_text), text_signature(lowered))
+            self.write_index(item_id, entry)
+            self.forget_entry(item_id)
+            self.note_change(item_id)
+            self.entries[item_id] = entry
+            self.live_bytes += len(payload)
+            self.by_digest[digest] = item_id
+            bisect.insort(self.by_frecency, (frecency, item_id))
+            self.changed()
+
+    def remove(self, item_id):
+        with self.lock:
+            if item_id not in self.entries:
+                return
+            self.write_index(item_id, TOMBSTONE)
+            self.forget_entry(item_id)
+            self.note_change(item_id)
+            self.cache.pop(item_id, None)
+            self.changed()
+        self.compact_if_needed()
+
+    def get(self, item_id):
+        item = self.cache.get(item_id)
+        if item is not None:
+            self.cache.move_to_end(item_id)
+            return item
+        payload = self.read(item_id)
+        if payload is None:
+            return None
+        item = json.loads(payload)
+        self.cache[item_id] = item
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return item
+
+    def read(self, item_id, text=False):
+        # El registro es el JSON del item seguido de su texto de búsqueda
+        with self.lock:
+            entry = self.entries.get(item_id)
+            if entry is None:
+                return None
+            offset, length, text_length = entry[0], entry[1], entry[6]
+            if self.map is None or offset + length > len(self.map):
+                # El archivo creció desde el último mapeo
+                if self.map is not None:
+                    self.map.close()
+                with open(self.data_path, 'rb') as f:
+                    self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if text:
+                return self.map[offset + length - text_length:offset + length]
+            return self.map[offset:offset + length - text_length]
+
+    def may_contain(self, item_id, required):
+        """False si el item seguro no coincide con una consulta de firma required; no lee el disco."""
+        entry = self.entries.get(item_id)
+        return entry is not None and (entry[7] & required) == required
+
+    def search_text(self, item_id):
+        # Texto en minúsculas para la búsqueda; se lee tal cual, sin decodificar el JSON ni pasar por la caché
+        text = self.read(item_id, text=True)
+        return '' if text is None else text.decode('utf-8', 'surrogatepass')
+
+    def disk_usage(self):
+        return {'archive': file_size(self.data_path), 'archive_index': file_size(self.index_path)}
+
+    def clear(self):
+        with self.lock:
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            for f in (self.data_file, self.index_file):
+                f.truncate(0)
+            self.entries.clear()
+            self.by_digest.clear()
+            self.by_frecency = []
+            self.cache.clear()
+            self.live_bytes = self.data_size = self.index_records = 0
+            self.generation += 1
+            self.changed()
+
+    def open_files(self):
+        self.data_file = open(self.data_path, 'ab')
+        self.index_file = open(self.index_path, 'ab')
+
+    def close_files(self):
+        # El mapeo también: en Windows no se puede reemplazar un archivo abierto o mapeado
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.data_file.close()
+        self.index_file.close()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.close_files()
+
+    def write_index(self, item_id, entry):
+        self.index_file.write(pack_record(item_id, entry))
+        self.index_file.flush()
+        self.index_records += 1
+
+    def forget_entry(self, item_id):
+        entry = self.entries.pop(item_id, None)
+        if entry is None:
+            return
+        self.live_bytes -= entry[1]
+        if self.by_digest.get(entry[5]) == item_id:
+            del self.by_digest[entry[5]]
+        del self.by_frecency[bisect.bisect_left(self.by_frecency, (entry[4], item_id))]
+
+    def note_change(self, item_id):
+        if self.compaction_changes is not None:
+            self.compaction_changes.append(item_id)
+
+    def changed(self):
+        self.version += 1
+        self.oldest_first = None
+
+
+class ArchiveCandidates:
+    """
+    Vista del archivo como secuencia de (id, texto) para FuzzySearcher; cada texto
+    se lee al pedirlo. Va del más antiguo al más reciente, como los demás candidatos.
+    Los items cuya firma no tiene los bits de required se dan con texto vacío sin
+    leerlos, así que ninguna función de puntaje los acepta.
+    """
+
+    def __init__(self, archive, required=0):
+        self.archive = archive
+        self.ids = archive.ids()  # El archivo no modifica la lista: al cambiar crea otra
+        self.required = required
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, position):
+        item_id = self.ids[position]
+        if not self.archive.may_contain(item_id, self.required):
+            return item_id, ''
+        return item_id, self.archive.search_text(item_id)
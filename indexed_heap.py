@@ -0,0 +1,95 @@
+# indexed_heap.py
+
+
+class IndexedHeap:
+    """
+    Heap mínimo con la posición de cada clave: insertar, cambiar la prioridad
+    o quitar una clave cualquiera cuesta O(log n) y ver la mínima O(1).
+    """
+
+    def __init__(self):
+        self.heap = []       # [prioridad, clave]
+        self.positions = {}  # clave -> índice en heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def priority(self, key):
+        return self.heap[self.positions[key]][0]
+
+    def push(self, key, priority):
+        """Inserta la clave o actualiza su prioridad si ya estaba."""
+        index = self.positions.get(key)
+        if index is not None:
+            old = self.heap[index][0]
+            self.heap[index][0] = priority
+            if priority < old:
+                self.sift_up(index)
+            else:
+                self.sift_down(index)
+            return
+        self.heap.append([priority, key])
+        self.positions[key] = len(self.heap) - 1
+        self.sift_up(len(self.heap) - 1)
+
+    def remove(self, key):
+        index = self.positions.pop(key, None)
+        if index is None:
+            return
+        last = self.heap.pop()
+        if index < len(self.heap):
+            self.heap[index] = last
+            self.positions[last[1]] = index
+            self.sift_up(index)
+            self.sift_down(self.positions[last[1]])
+
+    def peek(self):
+        """(clave, prioridad) de la mínima, o None si está vacío."""
+        if not self.heap:
+            return None
+        priority, key = self.heap[0]
+        return key, priority
+
+    def pop(self):
+        top = self.peek()
+        if top is not None:
+            self.remove(top[0])
+        return top
+
+    def clear(self):
+        self.heap = []
+        self.positions = {}
+
+    def sift_up(self, index):
+        heap = self.heap
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // 2
+            if heap[parent][0] <= entry[0]:
+                break
+            heap[index] = heap[parent]
+            self.positions[heap[index][1]] = index
+            index = parent
+        heap[index] = entry
+        self.positions[entry[1]] = index
+
+    def sift_down(self, index):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1][0] < heap[child][0]:
+                child += 1
+            if entry[0] <= heap[child][0]:
+                break
+            heap[index] = heap[child]
+            self.positions[heap[index][1]] = index
+            index = child
+        heap[index] = entry
+        self.positions[entry[1]] = index
@@ -10,7 +10,6 @@ import pyautogui
 import win32api
 import win32con
 import ctypes
-import base64
 
 
 # Definir CF_HTML ya que no está en win32con
@@ -106,8 +105,7 @@ class KeyManager:
             elif key == 'Return':
                 self.manager.navigation.activate_selected()
             
-            self.manager.root.update_idletasks()
-            self.manager.root.after(10, self.manager.root.update)
+            # El resaltado se repinta en el siguiente cuadro; no hace falta forzar un update
             self.manager.root.after(20, self.restore_cursor_position)  # Restaurar cursor después de la actualización
 
     def restore_cursor_position(self):
@@ -115,8 +113,11 @@ class KeyManager:
             win32api.SetCursorPos(self.original_cursor_pos)
 
 
-    def paste_content(self, clipboard_data):
+    def paste_content(self, clipboard_data, item_id=None):
         print('*************************'f"Intentando pegar: {clipboard_data}")
+        if item_id is not None:
+            # Estadísticas de uso para el orden y el descarte por frecencia
+            self.manager.functions.record_use(item_id, 'paste')
         try:
             # Ocultar la ventana de la aplicación
             self.hide_window()
@@ -139,13 +140,13 @@ class KeyManager:
                 win32clipboard.OpenClipboard()
                 win32clipboard.EmptyClipboard()
                 
-                if isinstance(formatted, str):
-                    formatted_data = base64.b64decode(formatted.encode('utf-8'))
-                    
-                    if formatted_data.startswith(b'{\\rtf'):
-                        win32clipboard.SetClipboardData(win32con.CF_RTF, formatted_data)
-                    else:
-                        win32clipboard.SetClipboardData(CF_HTML, formatted_data)
+                # El contenido con formato se guarda tal cual (ya no en base64)
+                formatted_data = formatted.encode('utf-8') if isinstance(formatted, str) else formatted
+
+                if formatted_data.startswith(b'{\\rtf'):
+                    win32clipboard.SetClipboardData(win32con.CF_RTF, formatted_data)
+                else:
+                    win32clipboard.SetClipboardData(CF_HTML, formatted_data)
                 
                 win32clipboard.CloseClipboard()
             else:
@@ -7,7 +7,8 @@ from structure import ClipboardManager
 def main():
     root = tk.Tk()
     show_settings = "--show-settings" in sys.argv
-    app = ClipboardManager(root, show_settings)
+    use_sqlite = "--sqlite" in sys.argv
+    app = ClipboardManager(root, show_settings, use_sqlite)
     # Aplicar las configuraciones iniciales
     root.geometry(f"{app.settings_manager.settings['width']}x{app.settings_manager.settings['height']}+0+0")
     
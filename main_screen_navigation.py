@@ -6,6 +6,10 @@ class MainScreenNavigation:
     def __init__(self, manager):
         self.manager = manager
         self.navigation_order = ['top_buttons', 'main_buttons', 'cards']   
+        self.painted = None  # (tipo, índice) de la selección resaltada en pantalla
+        self.highlight_pending = False
+        self.scroll_pending = False
+        self.frame_ms = 16  # Como mucho un repintado por cuadro al mantener una tecla
 
     def navigate_vertical(self, event):
         print(f"MainScreenNavigation: Navigating vertically {event.keysym}")
@@ -13,69 +17,24 @@ class MainScreenNavigation:
         current_index = self.manager.current_selection['index']
         print(f"Before navigation: type={current_type}, index={current_index}")
         
+        # El modelo decide la nueva selección sin consultar los widgets
         if event.keysym == 'Up':
-            self.move_up(current_type, current_index)
+            self.manager.navigation_model.move_up()
         elif event.keysym == 'Down':
-            self.move_down(current_type, current_index)
+            self.manager.navigation_model.move_down()
 
-        self.update_highlights()
-        self.ensure_visible()
         print(f"After navigation: type={self.manager.current_selection['type']}, index={self.manager.current_selection['index']}")
-        self.update_highlights()
+        self.request_highlight(scroll=True)
 
-    def move_up(self, current_type, current_index):
-        if current_type in ['cards', 'icons']:
-            if current_index > 0:
-                self.manager.current_selection['index'] = current_index - 1
-            else:
-                self.manager.current_selection = {'type': 'main_buttons', 'index': 0}
-        elif current_type == 'main_buttons':
-            self.manager.current_selection = {'type': 'top_buttons', 'index': 0}
-        elif current_type == 'top_buttons':
-            # Si ya estamos en los botones superiores, no hacemos nada
-            pass
-        print(f"After move_up: {self.manager.current_selection}")
-        
-    def move_down(self, current_type, current_index):
-        if current_type == 'top_buttons':
-            self.manager.current_selection = {'type': 'main_buttons', 'index': 0}
-        elif current_type == 'main_buttons':
-            if self.get_cards_count() > 0:
-                self.manager.current_selection = {'type': 'cards', 'index': 0}
-        elif current_type == 'cards':
-            if current_index < self.get_cards_count() - 1:
-                self.manager.current_selection['index'] = current_index + 1
-        print(f"After move_down: {self.manager.current_selection}")
-        
     def navigate_horizontal(self, event):
         print(f"MainScreenNavigation: Navigating horizontally {event.keysym}")  
-        current_type = self.manager.current_selection['type']
-        current_index = self.manager.current_selection['index']
 
         if event.keysym == 'Left':
-            self.move_left(current_type, current_index)
+            self.manager.navigation_model.move_left()
         elif event.keysym == 'Right':
-            self.move_right(current_type, current_index)
+            self.manager.navigation_model.move_right()
 
-        self.update_highlights()
-
-    def move_left(self, current_type, current_index):
-        if current_type in ['top_buttons', 'main_buttons']:
-            self.manager.current_selection['index'] = (current_index - 1) % self.get_button_count(current_type)
-        elif current_type == 'icons':
-            if current_index % 3 > 0:
-                self.manager.current_selection['index'] = current_index - 1
-            else:
-                self.manager.current_selection = {'type': 'cards', 'index': current_index // 3}
-
-    def move_right(self, current_type, current_index):
-        if current_type in ['top_buttons', 'main_buttons']:
-            self.manager.current_selection['index'] = (current_index + 1) % self.get_button_count(current_type)
-        elif current_type == 'cards':
-            self.manager.current_selection = {'type': 'icons', 'index': current_index * 3}
-        elif current_type == 'icons':
-            if current_index % 3 < 2:
-                self.manager.current_selection['index'] = current_index + 1
+        self.request_highlight()
 
     def activate_selected(self, event=None):
         current_type = self.manager.current_selection['type']
@@ -107,14 +66,14 @@ class MainScreenNavigation:
             self.manager.functions.exit_app()
 
     def activate_card(self, index):
-        items = list(self.manager.clipboard_items.items())
-        if index < len(items):
-            item_id, item_data = items[index]
+        keys = self.manager.card_list.keys
+        if index < len(keys):
+            item_data = self.manager.functions.item_data(keys[index])
             clipboard_data = item_data['text']
-            self.manager.key_manager.paste_content(clipboard_data)
+            self.manager.key_manager.paste_content(clipboard_data, keys[index])
             
     def activate_icon(self, index):
-        items = list(self.manager.clipboard_items.keys())
+        items = self.manager.card_list.keys
         card_index = index // 3
         icon_position = index % 3
         
@@ -128,58 +87,88 @@ class MainScreenNavigation:
                 self.manager.functions.delete_item(item_id)
 
     def initialize_focus(self):
-        if self.get_cards_count() > 0:
-            self.manager.current_selection = {'type': 'cards', 'index': 0}
-        else:
-            self.manager.current_selection = {'type': 'main_buttons', 'index': 0}
+        self.manager.navigation_model.initial_selection()
         
         self.manager.root.focus_force()
         self.manager.root.update_idletasks()
         self.update_highlights()
     
+    def request_highlight(self, scroll=False):
+        # Las repeticiones de tecla solo mueven la selección; el repintado se agrupa por cuadro
+        self.scroll_pending = self.scroll_pending or scroll
+        if self.highlight_pending:
+            return
+        self.highlight_pending = True
+        self.manager.root.after(self.frame_ms, self.flush_highlight)
+
+    def flush_highlight(self):
+        self.highlight_pending = False
+        if self.scroll_pending:
+            self.scroll_pending = False
+            self.ensure_visible()
+        self.update_highlights()
+
     def update_highlights(self):
-        print("Updating highlights")
-        self.clear_all_highlights()
+        # Solo se repintan la selección anterior y la nueva
+        current = (self.manager.current_selection['type'], self.manager.current_selection['index'])
+        if current == self.painted:
+            return
+        previous = self.painted
+        self.painted = current
+        if previous is not None:
+            self.paint_selection(*previous, highlighted=False)
+        self.paint_selection(*current, highlighted=True)
+        print(f"Highlighted: {current[0]}, index: {current[1]}")
+
+    def invalidate_highlights(self):
+        # El registro de estilos ya devolvió todo a los colores base: solo falta la selección
+        self.painted = None
+        self.request_highlight()
+
+    def paint_selection(self, selection_type, index, highlighted):
+        theme = self.manager.theme_manager.current_colors()
+        highlight_color = '#444444' if self.manager.is_dark_mode else '#cccccc'
+        
+        if selection_type in ('main_buttons', 'top_buttons'):
+            if selection_type == 'main_buttons':
+                buttons = [self.manager.button1, self.manager.button2, self.manager.button3]
+            else:
+                buttons = [self.manager.theme_button, self.manager.clear_button, self.manager.close_button]
+            if 0 <= index < len(buttons):
+                buttons[index].configure(bg=highlight_color if highlighted else theme['button_bg'])
         
+        elif selection_type in ('cards', 'icons') and getattr(self.manager.card_list, 'draws_cards', False):
+            # Tarjetas dibujadas en el canvas: la selección es un itemconfigure
+            if highlighted and selection_type == 'cards':
+                self.manager.card_list.set_selection(index)
+            elif highlighted:
+                self.manager.card_list.set_selection(index // 3, index % 3)
+            elif self.manager.current_selection['type'] not in ('cards', 'icons'):
+                self.manager.card_list.set_selection(None)
+
+        elif selection_type in ('cards', 'icons'):
+            # Solo las tarjetas visibles existen; las demás se pintan al mostrarse.
+            # paint_card usa la selección actual, así que sirve para resaltar y para limpiar
+            card_index = index if selection_type == 'cards' else index // 3
+            card = self.manager.card_list.widget_at(card_index)
+            if card is not None:
+                self.paint_card(card, card_index)
+
+    def paint_card(self, card, index):
+        # Colores base y, si la tarjeta está seleccionada, el resaltado
+        theme = self.manager.theme_manager.current_colors()
+        self.reset_card_colors(card, theme['card_bg'], theme['button_bg'])
+
         current_type = self.manager.current_selection['type']
         current_index = self.manager.current_selection['index']
-        
         highlight_color = '#444444' if self.manager.is_dark_mode else '#cccccc'
         icon_highlight_color = '#666666' if self.manager.is_dark_mode else '#aaaaaa'
-        
-        if current_type == 'main_buttons':
-            buttons = [self.manager.button1, self.manager.button2, self.manager.button3]
-            if 0 <= current_index < len(buttons):
-                buttons[current_index].configure(bg=highlight_color)
-        
-        elif current_type == 'top_buttons':
-            top_buttons = [self.manager.theme_button, self.manager.clear_button, self.manager.close_button]
-            if 0 <= current_index < len(top_buttons):
-                top_buttons[current_index].configure(bg=highlight_color)
-        
-        elif current_type == 'cards':
-            cards = self.manager.cards_frame.winfo_children()
-            if current_index < len(cards):
-                self.highlight_entire_card(cards[current_index], highlight_color)
-        
-        elif current_type == 'icons':
-            card_index = current_index // 3
-            icon_position = current_index % 3
-            cards = self.manager.cards_frame.winfo_children()
-            
-            if card_index < len(cards):
-                card = cards[card_index]
-                icons_frame = self.find_icons_frame(card)
-                
-                if icons_frame and icon_position < len(icons_frame.winfo_children()):
-                    icons = icons_frame.winfo_children()
-                    if 0 <= icon_position < len(icons):
-                        self.highlight_entire_card(card, highlight_color)
-                        icons[icon_position].configure(bg=icon_highlight_color)
-                        
-        print(f"Highlighted: {current_type}, index: {current_index}")
-        self.manager.root.update_idletasks()
-        self.manager.root.after(10, self.manager.root.update)
+
+        if current_type == 'cards' and current_index == index:
+            self.highlight_entire_card(card, highlight_color)
+        elif current_type == 'icons' and current_index // 3 == index:
+            self.highlight_entire_card(card, highlight_color)
+            card.icons[current_index % 3].configure(bg=icon_highlight_color)
 
     def highlight_entire_card(self, card, color):
         card.configure(bg=color)
@@ -192,19 +181,6 @@ class MainScreenNavigation:
             elif isinstance(child, (tk.Label, tk.Button)):
                 child.configure(bg=color)
 
-    def clear_all_highlights(self):
-        theme = self.manager.theme_manager.colors['dark' if self.manager.is_dark_mode else 'light']
-        base_color = theme['card_bg']
-        button_color = theme['button_bg']
-        
-        buttons = [self.manager.button1, self.manager.button2, self.manager.button3,
-                self.manager.theme_button, self.manager.clear_button, self.manager.close_button]
-        for button in buttons:
-            button.configure(bg=button_color)
-        
-        for card in self.manager.cards_frame.winfo_children():
-            self.reset_card_colors(card, base_color, button_color)
-
     def reset_card_colors(self, card, base_color, button_color):
         card.configure(bg=base_color)
         for child in card.winfo_children():
@@ -221,31 +197,15 @@ class MainScreenNavigation:
                 child.configure(bg=button_color)
 
     def ensure_visible(self):
-        current_type = self.manager.current_selection['type']
-        current_index = self.manager.current_selection['index']
-        
-        if current_type == 'cards':
-            cards = self.manager.cards_frame.winfo_children()
-            if current_index < len(cards):
-                widget = cards[current_index]
-                bbox = self.manager.canvas.bbox("all")
-                if bbox:
-                    widget_y = widget.winfo_y()
-                    canvas_height = self.manager.canvas.winfo_height()
-                    if widget_y > 0:
-                        self.manager.canvas.yview_moveto(widget_y / bbox[3])
+        # Desplazamiento calculado con las alturas acumuladas, sin leer la posición de los widgets
+        canvas = self.manager.canvas
+        total = self.manager.navigation_model.offsets[-1]
+        target = self.manager.navigation_model.scroll_target(canvas.canvasy(0), canvas.winfo_height())
+        if target is not None and total > 0:
+            canvas.yview_moveto(target / total)
 
     def get_cards_count(self):
-        return len(self.manager.cards_frame.winfo_children())
+        return self.manager.navigation_model.card_count
 
     def get_button_count(self, button_type):
-        if button_type == 'top_buttons':
-            return 3  # Asumiendo que siempre hay 3 botones superiores
-        elif button_type == 'main_buttons':
-            return 3  # Asumiendo que siempre hay 3 botones principales
-
-    def find_icons_frame(self, card):
-        for child in card.winfo_children():
-            if isinstance(child, tk.Frame) and child.winfo_children() and isinstance(child.winfo_children()[0], tk.Button):
-                return child
-        return None
\ No newline at end of file
+        return self.manager.navigation_model.button_counts.get(button_type, 0)
@@ -37,14 +37,20 @@ class Navigation:
         self.current_strategy.update_highlights()
 
 
+    def invalidate_highlights(self):
+        self.current_strategy.invalidate_highlights()
+
+    def activate_card(self, index):
+        self.strategies['main'].activate_card(index)
+
+    def paint_card(self, card, index):
+        self.strategies['main'].paint_card(card, index)
+
     def get_cards_count(self):
-        return len(self.manager.cards_frame.winfo_children()) if hasattr(self.manager, 'cards_frame') else 0
+        return self.manager.navigation_model.card_count
 
     def initialize_focus(self):
-        if self.get_cards_count() > 0:
-            self.manager.current_selection = {'type': 'cards', 'index': 0}
-        else:
-            self.manager.current_selection = {'type': 'main_buttons', 'index': 0}
+        self.manager.navigation_model.initial_selection()
         
         self.update_highlights()
         self.manager.root.update_idletasks()
@@ -76,8 +82,8 @@ class Navigation:
     def get_clipboard_items(self):
         return self.manager.clipboard_items
 
-    def get_cards_frame(self):
-        return self.manager.cards_frame
+    def get_card_list(self):
+        return self.manager.card_list
 
     def get_canvas(self):
         return self.manager.canvas
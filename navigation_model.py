@@ -0,0 +1,127 @@
+# navigation_model.py
+
+from bisect import bisect_left, bisect_right
+
+
+def row_at(offsets, y):
+    """Fila que contiene la coordenada y; offsets[i] es la y de la fila i y offsets[-1] el total."""
+    index = bisect_right(offsets, y) - 1
+    return index if 0 <= index < len(offsets) - 1 else None
+
+
+def visible_range(offsets, top, bottom, overscan=0):
+    rows = len(offsets) - 1
+    first = max(bisect_right(offsets, top) - 1 - overscan, 0)
+    last = min(bisect_left(offsets, bottom) + overscan, rows)
+    return first, last
+
+
+def scroll_target(offsets, index, top, viewport_height):
+    """Nueva y superior para que la fila index quede visible, o None si ya lo está."""
+    if not 0 <= index < len(offsets) - 1:
+        return None
+    row_top = offsets[index]
+    row_bottom = offsets[index + 1]
+    if row_top < top:
+        return row_top
+    if row_bottom > top + viewport_height:
+        return max(row_bottom - viewport_height, 0)
+    return None
+
+
+class NavigationModel:
+    """
+    Estado de la navegación sin widgets: la selección, cuántas tarjetas hay y las
+    alturas acumuladas de las filas. Todo se resuelve con aritmética y bisect.
+    """
+
+    def __init__(self, button_counts=None, icons_per_card=3):
+        self.button_counts = button_counts or {'top_buttons': 3, 'main_buttons': 3}
+        self.icons_per_card = icons_per_card
+        self.selection = {'type': 'button', 'index': 0}
+        self.offsets = [0]
+        self.first_card = 0  # Donde se entra a las tarjetas con el teclado
+
+    @property
+    def card_count(self):
+        return len(self.offsets) - 1
+
+    def set_rows(self, offsets, first_card=0):
+        # Se comparte la lista de la lista virtual: no se copia
+        self.offsets = offsets
+        self.first_card = first_card if first_card < self.card_count else 0
+        self.clamp()
+
+    def select(self, selection_type, index):
+        self.selection = {'type': selection_type, 'index': index}
+
+    def selected_card(self):
+        selection_type, index = self.selection['type'], self.selection['index']
+        if selection_type == 'cards':
+            return index
+        if selection_type == 'icons':
+            return index // self.icons_per_card
+        return None
+
+    def clamp(self):
+        # Si se eliminaron tarjetas, la selección no puede apuntar más allá de la última
+        card = self.selected_card()
+        if card is None or card < self.card_count:
+            return
+        if self.card_count:
+            self.select('cards', self.card_count - 1)
+        else:
+            self.select('main_buttons', 0)
+
+    def initial_selection(self):
+        if self.card_count > 0:
+            self.select('cards', self.first_card)
+        else:
+            self.select('main_buttons', 0)
+
+    def move_up(self):
+        selection_type, index = self.selection['type'], self.selection['index']
+        if selection_type in ('cards', 'icons'):
+            if index > 0:
+                self.selection['index'] = index - 1
+            else:
+                self.select('main_buttons', 0)
+        elif selection_type == 'main_buttons':
+            self.select('top_buttons', 0)
+
+    def move_down(self):
+        selection_type, index = self.selection['type'], self.selection['index']
+        if selection_type == 'top_buttons':
+            self.select('main_buttons', 0)
+        elif selection_type == 'main_buttons':
+            if self.card_count > 0:
+                self.select('cards', self.first_card)
+        elif selection_type == 'cards':
+            if index < self.card_count - 1:
+                self.selection['index'] = index + 1
+
+    def move_left(self):
+        selection_type, index = self.selection['type'], self.selection['index']
+        if selection_type in self.button_counts:
+            self.selection['index'] = (index - 1) % self.button_counts[selection_type]
+        elif selection_type == 'icons':
+            if index % self.icons_per_card > 0:
+                self.selection['index'] = index - 1
+            else:
+                self.select('cards', index // self.icons_per_card)
+
+    def move_right(self):
+        selection_type, index = self.selection['type'], self.selection['index']
+        if selection_type in self.button_counts:
+            self.selection['index'] = (index + 1) % self.button_counts[selection_type]
+        elif selection_type == 'cards':
+            self.select('icons', index * self.icons_per_card)
+        elif selection_type == 'icons':
+            if index % self.icons_per_card < self.icons_per_card - 1:
+                self.selection['index'] = index + 1
+
+    def scroll_target(self, top, viewport_height):
+        card = self.selected_card()
+        if card is None:
+            return None
+        return scroll_target(self.offsets, card, top, viewport_height)
@@ -0,0 +1,105 @@
+# persistence_writer.py
+
+import threading
+import time
+
+
+class PersistenceWriter:
+    """
+    Hilo de guardado en segundo plano. Los managers notifican qué grupo, item o
+    configuración cambió y el hilo agrupa todas las notificaciones recibidas
+    dentro de la ventana de espera en una sola escritura.
+    """
+
+    def __init__(self, data_manager, delay_ms=250):
+        self.data_manager = data_manager
+        self.delay = delay_ms / 1000
+        self.condition = threading.Condition()
+        self.pending = {}  # (sección, clave) -> valor, o None si se eliminó
+        self.first_dirty_at = None
+        self.flush_requested = False
+        self.writing = False
+        self.stopping = False
+
+        # Métricas para comprobar la reducción de escrituras
+        self.notifications = 0
+        self.writes = 0
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    @property
+    def merged_saves(self):
+        # Notificaciones que no necesitaron una escritura propia
+        return self.notifications - self.writes
+
+    def mark_dirty(self, section, key, value):
+        """value debe ser una copia: el hilo la serializa más tarde."""
+        self.notify(section, key, ('put', value))
+
+    def mark_deleted(self, section, key):
+        self.notify(section, key, ('delete', None))
+
+    def notify(self, section, key, change):
+        with self.condition:
+            if not self.pending:
+                self.first_dirty_at = time.monotonic()
+            # El último cambio de una misma clave reemplaza a los anteriores
+            if section == 'history':
+                # y en el historial además pasa al final, para escribirse en orden de llegada
+                self.pending.pop((section, key), None)
+            self.pending[(section, key)] = change
+            self.notifications += 1
+            self.condition.notify_all()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopping:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                deadline = self.first_dirty_at + self.delay
+                while not self.flush_requested and not self.stopping:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                changes = [(op, section, key, value) for (section, key), (op, value) in self.pending.items()]
+                self.pending = {}
+                self.flush_requested = False
+                self.writing = True
+
+            try:
+                self.data_manager.apply_changes(changes)
+            except Exception as e:
+                print(f"Error al guardar en segundo plano: {e}")
+
+            with self.condition:
+                self.writing = False
+                self.writes += 1
+                print(f"Guardado en segundo plano: {len(changes)} cambios en una escritura "
+                      f"({self.merged_saves} guardados fusionados en total)")
+                self.condition.notify_all()
+
+    def flush(self, timeout=5):
+        """Escribe de inmediato lo pendiente y espera a que termine."""
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            while self.pending or self.writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print("Tiempo de espera agotado al vaciar los guardados pendientes")
+                    return False
+                self.condition.wait(remaining)
+            self.flush_requested = False
+        return True
+
+    def stop(self, timeout=5):
+        self.flush(timeout)
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
@@ -0,0 +1,53 @@
+# preview_cache.py
+
+import sys
+from collections import OrderedDict
+
+from utils import process_text
+
+
+class PreviewCache:
+    """
+    Caché LRU acotada de vistas previas. La clave es (huella del texto, líneas de
+    la vista previa), así un texto editado produce otra clave y la entrada vieja
+    termina saliendo por antigüedad sin invalidaciones explícitas.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (huella, líneas) -> (vista previa, líneas del texto, altura)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, digest, text_data, preview_lines, height_for_lines):
+        key = (digest, preview_lines)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        text = text_data.get('text', '') if isinstance(text_data, dict) else str(text_data)
+        line_count = text.count('\n') + 1
+        entry = (process_text(text, preview_lines), line_count, height_for_lines(line_count))
+        self.entries[key] = entry
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def discard(self, digest):
+        for key in [k for k in self.entries if k[0] == digest]:
+            del self.entries[key]
+
+    def memory_bytes(self):
+        return sum(sys.getsizeof(preview) for preview, _, _ in self.entries.values())
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,101 @@
+# search_index.py
+
+import sys
+
+
+def text_of(text_data):
+    if isinstance(text_data, dict):
+        return text_data.get('text') or ''
+    return str(text_data)
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas para buscar subcadenas sin recorrer todos los
+    textos: la consulta interseca las listas de sus trigramas (de la más corta a
+    la más larga) y solo los candidatos que quedan se comprueban con 'in'.
+    Se mantiene al agregar, editar o quitar items.
+    """
+
+    def __init__(self, max_chars=100_000):
+        self.max_chars = max_chars  # Solo se indexa el comienzo de los textos enormes
+        self.postings = {}   # trigrama -> {clave}
+        self.texts = {}      # clave -> texto en minúsculas indexado
+        self.short = set()   # claves con textos de menos de 3 caracteres
+        self.last_search = None  # (consulta, resultado): varias vistas filtran con la misma consulta
+        self.version = 0  # Cambia con cada modificación; sirve para reutilizar copias de los textos
+
+    def __len__(self):
+        return len(self.texts)
+
+    def memory_bytes(self):
+        # Aproximado: textos indexados y conjuntos de las listas de trigramas
+        return (sum(sys.getsizeof(text) for text in self.texts.values())
+                + sum(sys.getsizeof(keys) for keys in self.postings.values()))
+
+    def add(self, key, text_data):
+        self.last_search = None
+        self.version += 1
+        if key in self.texts:
+            self.remove(key)
+        text = text_of(text_data)[:self.max_chars].lower()
+        self.texts[key] = text
+        grams = trigrams(text)
+        if not grams:
+            self.short.add(key)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        self.last_search = None
+        self.version += 1
+        text = self.texts.pop(key, None)
+        if text is None:
+            return
+        self.short.discard(key)
+        for gram in trigrams(text):
+            keys = self.postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[gram]
+
+    def clear(self):
+        self.postings = {}
+        self.texts = {}
+        self.short = set()
+        self.last_search = None
+        self.version += 1
+
+    def candidates(self, query):
+        grams = trigrams(query)
+        if grams:
+            sets = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+            result = set(sets[0])
+            for keys in sets[1:]:
+                if not result:
+                    break
+                result &= keys
+            return result
+        # Consulta de 1 o 2 caracteres: se recorre el vocabulario de trigramas, no los textos
+        result = set(self.short)
+        for gram, keys in self.postings.items():
+            if query in gram:
+                result |= keys
+        return result
+
+    def search(self, query):
+        """Claves cuyo texto contiene la consulta (sin distinguir mayúsculas)."""
+        query = query.lower()
+        if not query:
+            return set(self.texts)
+        if self.last_search is not None and self.last_search[0] == query:
+            return self.last_search[1]
+        texts = self.texts
+        result = {key for key in self.candidates(query) if query in texts[key]}
+        self.last_search = (query, result)
+        return result
@@ -0,0 +1,271 @@
+# sqlite_data_manager.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from blob_store import BlobStore
+from group_index import items_by_id
+from data_manager import DataManager, DEFAULT_SETTINGS, ITEM_SECTIONS
+from utils import file_size
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    text_is_dict INTEGER NOT NULL DEFAULT 1,
+    formatted_ref TEXT,
+    pinned INTEGER NOT NULL DEFAULT 0,
+    with_format INTEGER NOT NULL DEFAULT 1,
+    extra TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_pinned ON items(pinned);
+
+CREATE TABLE IF NOT EXISTS groups (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    extra TEXT
+);
+
+CREATE TABLE IF NOT EXISTS group_items (
+    group_id TEXT NOT NULL REFERENCES groups(id) ON DELETE CASCADE,
+    item_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    text TEXT NOT NULL,
+    text_is_dict INTEGER NOT NULL DEFAULT 1,
+    formatted_ref TEXT,
+    PRIMARY KEY (group_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS group_items_item ON group_items(item_id);
+
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(text, content='items', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE OF text ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO items_fts(rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+
+class SQLiteDataManager:
+    """
+    Alternativa a DataManager respaldada por SQLite, con el mismo contrato
+    (load_data/save_data/put/delete/save_settings). Guarda los items anclados y
+    el historial reciente, los grupos y sus items y la configuración; el texto de
+    los items tiene un índice FTS5 que mantienen los triggers de la base.
+    """
+
+    def __init__(self, db_path='clipboard_data.db', json_path='clipboard_data.json'):
+        self.db_path = db_path
+        self.json_path = json_path
+        # Directorio propio para que la recolección de blobs no afecte al respaldo JSON
+        self.blob_store = BlobStore(os.path.join(os.path.dirname(os.path.abspath(db_path)), 'clipboard_db_blobs'))
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA foreign_keys=ON')
+        self.conn.executescript(SCHEMA)
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            # SQLite compilado sin FTS5: las tablas funcionan igual, sin índice de texto
+            print(f"FTS5 no disponible: {e}")
+        self.conn.commit()
+        self.known_data_version = None
+        self.migrate_from_json()
+
+    # ------------------------------------------------------------------
+    # Contrato de DataManager
+
+    def save_data(self, groups, items, settings):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM group_items')
+            self.conn.execute('DELETE FROM groups')
+            self.conn.execute('DELETE FROM items')
+            for group_id, group in groups.items():
+                self.write_group(group_id, group)
+            for item_id, item_data in items.items():
+                self.write_item(item_id, item_data, pinned=bool(item_data.get('pinned')))
+            self.write_settings(settings)
+        self.collect_garbage()
+        print(f"All data saved to {self.db_path}")
+
+    def load_data(self):
+        with self.lock:
+            self.known_data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            settings = {key: json.loads(value) for key, value in self.conn.execute('SELECT key, value FROM settings')}
+            # Los anclados primero y después el historial, en orden de llegada
+            items = {row[0]: self.row_to_item(row) for row in self.conn.execute(
+                'SELECT id, text, text_is_dict, formatted_ref, pinned, with_format, extra FROM items '
+                'ORDER BY pinned DESC, rowid')}
+            groups = {}
+            for group_id, name, extra in self.conn.execute('SELECT id, name, extra FROM groups ORDER BY position'):
+                group = json.loads(extra) if extra else {}
+                group['name'] = name
+                group['items'] = {}
+                groups[group_id] = group
+            for row in self.conn.execute(
+                    'SELECT group_id, item_id, name, text, text_is_dict, formatted_ref FROM group_items '
+                    'ORDER BY group_id, position'):
+                group_id, item_id, name, text, text_is_dict, formatted_ref = row
+                item = {'id': item_id, 'text': self.build_text(text, text_is_dict, formatted_ref)}
+                if name is not None:
+                    item['name'] = name
+                groups[group_id]['items'][item_id] = item
+        return groups, items, settings or dict(DEFAULT_SETTINGS)
+
+    def put(self, section, key, value):
+        with self.lock, self.conn:
+            self.write_change('put', section, key, value)
+
+    def delete(self, section, key):
+        with self.lock, self.conn:
+            self.write_change('delete', section, key, None)
+
+    def save_settings(self, settings):
+        self.put('settings', None, settings)
+
+    def apply_changes(self, changes):
+        # Todos los cambios en una sola transacción
+        with self.lock, self.conn:
+            for op, section, key, value in changes:
+                self.write_change(op, section, key, value)
+
+    def write_change(self, op, section, key, value):
+        if section in ITEM_SECTIONS:
+            pinned = section == 'pinned_items'
+            if op == 'put':
+                if not pinned:
+                    # El historial sigue el orden de llegada: el item se vuelve a insertar al final
+                    self.conn.execute('DELETE FROM items WHERE id = ?', (key,))
+                self.write_item(key, value, pinned=pinned)
+            else:
+                # Solo la fila de esta sección: el item puede haber pasado a la otra
+                self.conn.execute('DELETE FROM items WHERE id = ? AND pinned = ?', (key, int(pinned)))
+        elif section == 'groups':
+            if op == 'put':
+                self.write_group(key, value)
+            else:
+                self.conn.execute('DELETE FROM groups WHERE id = ?', (key,))
+        elif section == 'settings' and op == 'put':
+            self.write_settings(value)
+
+    def changed_on_disk(self):
+        # data_version solo cambia cuando otra conexión confirma cambios
+        with self.lock:
+            data_version = self.conn.execute('PRAGMA data_version').fetchone()[0]
+            changed = data_version != self.known_data_version
+            self.known_data_version = data_version
+            return changed
+
+    def disk_usage(self):
+        return {
+            'database': file_size(self.db_path),
+            'wal': file_size(self.db_path + '-wal') + file_size(self.db_path + '-shm'),
+            'blobs': self.blob_store.disk_usage(),
+        }
+
+    # ------------------------------------------------------------------
+    # Conversión entre filas y diccionarios
+
+    def split_text(self, text_data):
+        if isinstance(text_data, dict):
+            formatted = text_data.get('formatted')
+            formatted_ref = self.blob_store.put(formatted if isinstance(formatted, (str, bytes)) else str(formatted)) \
+                if formatted is not None else None
+            return text_data.get('text') or '', 1, formatted_ref
+        return str(text_data), 0, None
+
+    def build_text(self, text, text_is_dict, formatted_ref):
+        if not text_is_dict:
+            return text
+        formatted = None
+        if formatted_ref:
+            payload = self.blob_store.get(formatted_ref)
+            formatted = payload.decode('utf-8', errors='ignore') if payload is not None else None
+        return {'text': text, 'formatted': formatted}
+
+    def row_to_item(self, row):
+        _, text, text_is_dict, formatted_ref, pinned, with_format, extra = row
+        item = json.loads(extra) if extra else {}
+        item.update({
+            'text': self.build_text(text, text_is_dict, formatted_ref),
+            'pinned': bool(pinned),
+            'with_format': bool(with_format)
+        })
+        return item
+
+    def write_item(self, item_id, item_data, pinned):
+        text, text_is_dict, formatted_ref = self.split_text(item_data['text'])
+        extra = {k: v for k, v in item_data.items() if k not in ('text', 'pinned', 'with_format')}
+        self.conn.execute(
+            'INSERT INTO items (id, text, text_is_dict, formatted_ref, pinned, with_format, extra, created_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET text = excluded.text, '
+            'text_is_dict = excluded.text_is_dict, formatted_ref = excluded.formatted_ref, '
+            'pinned = excluded.pinned, with_format = excluded.with_format, extra = excluded.extra',
+            (item_id, text, text_is_dict, formatted_ref, int(pinned), int(item_data.get('with_format', True)),
+             json.dumps(extra) if extra else None, time.time()))
+
+    def write_group(self, group_id, group):
+        extra = {k: v for k, v in group.items() if k not in ('name', 'items')}
+        self.conn.execute(
+            'INSERT INTO groups (id, name, position, extra) '
+            'VALUES (?, ?, (SELECT COALESCE(MAX(position), -1) + 1 FROM groups), ?) '
+            'ON CONFLICT(id) DO UPDATE SET name = excluded.name, extra = excluded.extra',
+            (group_id, group['name'], json.dumps(extra) if extra else None))
+        self.conn.execute('DELETE FROM group_items WHERE group_id = ?', (group_id,))
+        for position, item in enumerate(items_by_id(group.get('items', [])).values()):
+            text, text_is_dict, formatted_ref = self.split_text(item['text'])
+            self.conn.execute(
+                'INSERT OR REPLACE INTO group_items (group_id, item_id, position, name, text, text_is_dict, formatted_ref) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (group_id, item['id'], position, item.get('name'), text, text_is_dict, formatted_ref))
+
+    def write_settings(self, settings):
+        self.conn.executemany('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                              [(key, json.dumps(value)) for key, value in settings.items()])
+
+    # ------------------------------------------------------------------
+
+    def migrate_from_json(self):
+        # Migración única desde clipboard_data.json; los archivos originales solo se leen
+        with self.lock:
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_json'").fetchone():
+                return
+            if os.path.exists(self.json_path):
+                groups, items, settings = DataManager(self.json_path).read_data()
+                self.save_data(groups, items, settings)
+                print(f"Datos migrados de {self.json_path} a {self.db_path}")
+            with self.conn:
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_json', ?)", (str(time.time()),))
+
+    def collect_garbage(self):
+        with self.lock:
+            refs = [row[0] for row in self.conn.execute(
+                'SELECT formatted_ref FROM items WHERE formatted_ref IS NOT NULL '
+                'UNION ALL SELECT formatted_ref FROM group_items WHERE formatted_ref IS NOT NULL')]
+        self.blob_store.reset_refs(refs)
+        self.blob_store.collect_garbage()
@@ -9,20 +9,47 @@ import pyautogui
 from functions import Functions
 from key_manager import KeyManager
 from navigation import Navigation
+from navigation_model import NavigationModel
 from theme_manager import ThemeManager
+from virtual_list import VirtualCardList
+from canvas_card_renderer import CanvasCardRenderer
 from group_manager import GroupManager
 from data_manager import DataManager
+from data_store import DataStore
+from persistence_writer import PersistenceWriter
+from preview_cache import PreviewCache
+from search_index import TrigramIndex
+from fuzzy_search import FuzzySearcher
+from history_archive import HistoryArchive
+from sqlite_data_manager import SQLiteDataManager
 from settings_manager import SettingsManager
+from window_cache import WindowCache
 
 class ClipboardManager:
-    def __init__(self, root, show_settings=False):
+    def __init__(self, root, show_settings=False, use_sqlite=False):
         self.root = root
         self.root.title("Portapapeles")
 
-        self.data_manager = DataManager()
-        groups, pinned_items, settings = self.data_manager.load_data()
+        self.data_manager = SQLiteDataManager() if use_sqlite else DataManager()
+        # Única lectura del archivo; los demás managers comparten estos objetos
+        self.data_store = DataStore(self.data_manager)
+        groups, items, settings = self.data_store.load()
+        self.persistence_writer = PersistenceWriter(self.data_manager, settings.get('save_delay_ms', 250))
+        # Vistas previas compartidas por la ventana principal y el contenido de los grupos
+        self.preview_cache = PreviewCache(settings.get('preview_cache_size', 1024))
+        # Búsqueda sobre el historial; los grupos tienen su propio índice en GroupManager
+        self.search_index = TrigramIndex()
+        self.search_query = ''
+        self.search_results = None  # clave -> puntaje de la búsqueda difusa en curso
+        self.archive_matches = None  # Ids archivados que contienen la consulta exacta, del más reciente al más antiguo
+        self.fuzzy_searcher = FuzzySearcher(lambda callback: self.root.after(0, callback),
+                                            settings.get('fuzzy_limit', 200))
+        # Historial antiguo en disco; al iniciar solo se lee su índice
+        self.history_archive = HistoryArchive(cache_size=settings.get('archive_cache_size', 256))
         
         self.settings = settings
+        # Ventanas secundarias que se ocultan en lugar de destruirse
+        self.window_cache = WindowCache(self.root, main_wheel=self.on_mousewheel)
         self.settings_manager = SettingsManager(self.root, self)
         self.settings_manager.initialize_settings()
 
@@ -41,9 +68,11 @@ class ClipboardManager:
 
         self.previous_window = None
 
-        self.clipboard_items = pinned_items
+        self.clipboard_items = dict(items)
         self.current_clipboard = ""
         self.selected_index = None
+        # Selección y posiciones de las filas, independientes de los widgets
+        self.navigation_model = NavigationModel()
         self.current_selection = {'type': 'button', 'index': 0}
         self.is_dark_mode = True
         
@@ -103,65 +132,92 @@ class ClipboardManager:
         self.main_frame = ttk.Frame(self.root, style='Main.TFrame')
         self.main_frame.pack(fill=tk.BOTH, expand=True)
 
-        self.title_frame = tk.Frame(self.main_frame, bg=self.theme_manager.colors['dark']['bg'])
+        self.title_frame = tk.Frame(self.main_frame)
+        self.theme_manager.style(self.title_frame, 'window')
         self.title_frame.pack(fill=tk.X, padx=3, pady=(0,6))
 
-        self.title_label = tk.Label(self.title_frame, text="Portapapeles", font=('Segoe UI', 10, 'bold'), bg=self.theme_manager.colors['dark']['bg'], fg=self.theme_manager.colors['dark']['fg'])
+        self.title_label = tk.Label(self.title_frame, text="Portapapeles", font=('Segoe UI', 10, 'bold'))
+        self.theme_manager.style(self.title_label, 'title')
         self.title_label.pack(side=tk.LEFT, padx=5)
 
-        buttons_frame = tk.Frame(self.title_frame, bg=self.theme_manager.colors['dark']['bg'])
+        buttons_frame = tk.Frame(self.title_frame)
+        self.theme_manager.style(buttons_frame, 'window')
         buttons_frame.pack(side=tk.RIGHT, padx=4)
 
         self.theme_button = tk.Button(buttons_frame, text="🌙", command=self.theme_manager.toggle_theme, font=('Segoe UI', 10), bd=0, padx=10, width=5, height=2)
+        self.theme_manager.style(self.theme_button, 'button')
         self.theme_button.pack(side=tk.LEFT)
 
         self.clear_button = tk.Button(buttons_frame, text="    🖥️", command=self.show_settings, font=('Segoe UI', 10), bd=0, padx=10, width=5, height=2)
+        self.theme_manager.style(self.clear_button, 'button')
         self.clear_button.pack(side=tk.LEFT)
 
         self.close_button = tk.Button(buttons_frame, text="❌", command=self.functions.exit_app, font=('Segoe UI', 10, 'bold'), bd=0, padx=10, width=5, height=2)
+        self.theme_manager.style(self.close_button, 'button')
         self.close_button.pack(side=tk.LEFT)
 
-        main_buttons_frame = tk.Frame(self.main_frame, bg=self.theme_manager.colors['dark']['bg'])
+        main_buttons_frame = tk.Frame(self.main_frame)
+        self.theme_manager.style(main_buttons_frame, 'window')
         main_buttons_frame.pack(fill=tk.X, padx=6, pady=0)
 
-        self.button1 = tk.Button(main_buttons_frame, text="Grupos", 
-                                 command=self.show_groups, font=('Segoe UI', 10), 
-                                 bg=self.theme_manager.colors['dark']['button_bg'], 
-                                 fg=self.theme_manager.colors['dark']['button_fg'],
+        self.button1 = tk.Button(main_buttons_frame, text="Grupos",
+                                 command=self.show_groups, font=('Segoe UI', 10),
                                  relief=tk.FLAT,
                                  bd=0,
                                  highlightthickness=1,
                                  pady=8)
+        self.theme_manager.style(self.button1, 'button')
         self.button1.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=1, pady=0)
 
-        self.button2 = tk.Button(main_buttons_frame, text="Con formato", 
-                                 command=self.functions.toggle_paste_format, font=('Segoe UI', 10), 
-                                 bg=self.theme_manager.colors['dark']['button_bg'], 
-                                 fg=self.theme_manager.colors['dark']['button_fg'],
+        self.button2 = tk.Button(main_buttons_frame, text="Con formato",
+                                 command=self.functions.toggle_paste_format, font=('Segoe UI', 10),
                                  relief=tk.FLAT,
                                  bd=0,
                                  highlightthickness=1,
                                  pady=8) 
+        self.theme_manager.style(self.button2, 'button')
         self.button2.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=1, pady=0)
 
-        self.button3 = tk.Button(main_buttons_frame, text="Borrar Todo", 
-                                 command=self.functions.clear_history, font=('Segoe UI', 10), 
-                                 bg=self.theme_manager.colors['dark']['button_bg'], 
-                                 fg=self.theme_manager.colors['dark']['button_fg'],
+        self.button3 = tk.Button(main_buttons_frame, text="Borrar Todo",
+                                 command=self.functions.clear_history, font=('Segoe UI', 10),
                                  relief=tk.FLAT,
                                  bd=0,
                                  highlightthickness=1,
                                  pady=8)                               
+        self.theme_manager.style(self.button3, 'button')
         self.button3.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=1, pady=0)
 
+        # Búsqueda: filtra el historial y los grupos mientras se escribe
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(self.main_frame, textvariable=self.search_var,
+                                     font=('Segoe UI', 10),
+                                     relief=tk.FLAT,
+                                     bd=0,
+                                     highlightthickness=1,
+                                     highlightcolor='#555555',
+                                     highlightbackground='#333333')
+        self.theme_manager.style(self.search_entry, 'entry')
+        self.search_entry.pack(fill=tk.X, padx=7, pady=(6, 0), ipady=4)
+        self.search_var.trace_add('write', lambda *args: self.functions.on_search(self.search_var.get()))
+
         self.canvas = tk.Canvas(self.main_frame, bd=0, highlightthickness=0)
+        self.theme_manager.style(self.canvas, 'window')
         self.canvas.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        self.cards_frame = tk.Frame(self.canvas, bg=self.theme_manager.colors['dark']['bg'])
-        self.canvas_window = self.canvas.create_window((0, 0), window=self.cards_frame, anchor='nw')
+        # Lista virtual: solo existen tarjetas para las filas visibles
+        if self.settings.get('renderer', 'widgets') == 'canvas':
+            # Tarjetas dibujadas como items del canvas, sin widgets por tarjeta
+            self.card_list = CanvasCardRenderer(self.canvas, self.functions.describe_card,
+                                                self.functions.card_palette, self.functions.card_height,
+                                                signature=self.functions.card_signature)
+        else:
+            self.card_list = VirtualCardList(self.canvas, self.functions.create_card,
+                                             self.functions.bind_card, self.functions.card_height,
+                                             signature=self.functions.card_signature,
+                                             move_row=self.functions.move_card)
 
         self.scrollbar = ttk.Scrollbar(self.main_frame, orient=tk.VERTICAL, command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.card_list.scrollbar = self.scrollbar
 
         # Variables para el movimiento de la ventana
         self._drag_data = {"x": 0, "y": 0, "item": None}
@@ -173,22 +229,40 @@ class ClipboardManager:
         
         # Vincula eventos de scroll
         self.canvas.bind('<Configure>', self.on_canvas_configure)
-        self.cards_frame.bind('<Configure>', self.on_frame_configure)
         self.canvas.bind_all("<MouseWheel>", self.on_mousewheel)
         
         self.canvas.bind('<Button-1>', self.on_canvas_click)
         
+    @property
+    def current_selection(self):
+        return self.navigation_model.selection
+
+    @current_selection.setter
+    def current_selection(self, selection):
+        self.navigation_model.selection = selection
+
     def on_canvas_click(self, event):
+        if getattr(self.card_list, 'draws_cards', False):
+            # Las tarjetas son items del canvas: el clic se resuelve por posición
+            index, icon = self.card_list.hit_test(event.x, event.y)
+            if index is None:
+                return
+            if icon is None:
+                self.navigation.activate_card(index)
+            else:
+                self.functions.on_card_icon(self.card_list.keys[index], icon)
+            return
+
         # Obtener el widget clickeado
         clicked_widget = event.widget.winfo_containing(event.x_root, event.y_root)
-        
-        # Verificar si el clic fue en una tarjeta
-        for index, card in enumerate(self.cards_frame.winfo_children()):
-            if clicked_widget == card or clicked_widget.master == card:
-                # Evitar activar si se hizo clic en los iconos
-                if not isinstance(clicked_widget, tk.Button):
-                    self.navigation.activate_card(index)
-                return
+        # Evitar activar si se hizo clic en los iconos
+        if isinstance(clicked_widget, tk.Button):
+            return
+
+        # La fila se obtiene de la posición, no recorriendo las tarjetas
+        index = self.card_list.index_at(event.y_root - self.canvas.winfo_rooty())
+        if index is not None:
+            self.navigation.activate_card(index)
             
     def show_groups(self):
         self.group_manager.show_groups_window()
@@ -203,18 +277,24 @@ class ClipboardManager:
         self.navigation.set_strategy('main')
 
     def load_saved_data(self):
-        groups, pinned_items, _ = self.data_manager.load_data()
+        # Sin cambios en disco devuelve los datos ya cargados sin volver a leer
+        groups, items, _ = self.data_store.load()
         self.group_manager.groups = groups
-        self.clipboard_items.update(pinned_items)
+        self.group_manager.rebuild_index()
+        self.clipboard_items.update(items)
+        # Si se cerró entre archivar un item y guardar su borrado, queda en los dos lados: manda el archivo
+        for item_id in [k for k in self.clipboard_items if k in self.history_archive]:
+            del self.clipboard_items[item_id]
+            self.group_manager.persist_item(item_id)
+        self.functions.rebuild_content_index()
         self.functions.refresh_cards()
+        self.functions.scroll_to_start()
 
     def on_main_window_map(self, event):
-        if self.group_manager.groups_window and self.group_manager.groups_window.winfo_exists():
-            self.group_manager.groups_window.deiconify()
+        self.window_cache.resume()
 
     def on_main_window_unmap(self, event):
-        if self.group_manager.groups_window and self.group_manager.groups_window.winfo_exists():
-            self.group_manager.groups_window.withdraw()
+        self.window_cache.suspend()
 
     def start_move(self, event):
         self._drag_data["x"] = event.x
@@ -235,12 +315,7 @@ class ClipboardManager:
         self.window_y = y
 
     def on_canvas_configure(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        width = event.width
-        self.canvas.itemconfig(self.canvas_window, width=width)
-
-    def on_frame_configure(self, event):
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.card_list.on_resize(event.width)
 
     def on_mousewheel(self, event):
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
\ No newline at end of file
@@ -0,0 +1,52 @@
+# style_registry.py
+
+import tkinter as tk
+import weakref
+
+
+# Rol -> opción del widget -> clave de la paleta del tema
+ROLES = {
+    'window': {'bg': 'bg'},
+    'title': {'bg': 'bg', 'fg': 'fg'},
+    'button': {'bg': 'button_bg', 'fg': 'button_fg',
+               'activebackground': 'button_bg', 'activeforeground': 'button_fg'},
+    'dialog_button': {'bg': 'button_bg', 'fg': 'button_fg',
+                      'activebackground': 'active_bg', 'activeforeground': 'active_fg'},
+    'card': {'bg': 'card_bg'},
+    'card_text': {'bg': 'card_bg', 'fg': 'fg'},
+    'card_button': {'bg': 'card_bg', 'fg': 'fg'},  # Como en la tarjeta; el resaltado los pasa a button_bg
+    'entry': {'bg': 'button_bg', 'fg': 'fg', 'insertbackground': 'fg'},
+}
+
+
+class StyleRegistry:
+    """
+    Registro plano de widgets por rol. Cambiar el tema es una sola pasada sobre
+    el registro, sin importar en qué ventana esté cada widget. Las referencias
+    son débiles: los widgets destruidos salen solos del registro.
+    """
+
+    def __init__(self, roles=ROLES):
+        self.roles = roles
+        self.widgets = weakref.WeakKeyDictionary()  # widget -> rol
+
+    def options(self, role, colors):
+        return {option: colors[key] for option, key in self.roles[role].items()}
+
+    def register(self, widget, role, colors):
+        self.widgets[widget] = role
+        widget.configure(**self.options(role, colors))
+        return widget
+
+    def apply(self, colors):
+        # Las opciones de cada rol se calculan una vez por cambio de tema
+        resolved = {role: self.options(role, colors) for role in self.roles}
+        updated = 0
+        for widget, role in list(self.widgets.items()):
+            try:
+                widget.configure(**resolved[role])
+                updated += 1
+            except tk.TclError:
+                # Widget destruido que aún no se liberó
+                self.widgets.pop(widget, None)
+        return updated
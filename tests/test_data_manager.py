@@ -0,0 +1,25 @@
+# test_data_manager.py
+
+import base64
+import os
+
+from data_manager import DataManager
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_checked_in_data_unwraps_every_legacy_layer():
+    # clipboard_data.json trae un item anclado con su CF_HTML envuelto en 14 capas de base64
+    _, items, _ = DataManager(os.path.join(REPO_DIR, 'clipboard_data.json')).read_data()
+    formatted = [item['text']['formatted'] for item in items.values() if isinstance(item['text'], dict)]
+    assert formatted
+    for payload in formatted:
+        assert payload.startswith('Version:') or payload.startswith('{\\rtf')
+
+
+def test_unwrap_strips_layers_over_nul_terminated_html():
+    html = b'Version:0.9\r\nStartHTML:0000000105\r\n<html><body>hola</body></html>\x00'
+    wrapped = html
+    for _ in range(3):
+        wrapped = base64.b64encode(wrapped)
+    assert DataManager.unwrap_legacy_payload(wrapped.decode()) == html
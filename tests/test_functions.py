@@ -0,0 +1,81 @@
+# test_functions.py
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from data_manager import DataManager
+from functions import Functions
+from history_archive import HistoryArchive
+from preview_cache import PreviewCache
+from search_index import TrigramIndex
+
+
+@pytest.fixture
+def functions(tmp_path):
+    manager = SimpleNamespace(
+        settings={'clipboard_backend': 'fake', 'max_items': 2},
+        root=None,
+        clipboard_items={},
+        search_index=TrigramIndex(),
+        preview_cache=PreviewCache(),
+        data_manager=DataManager(os.path.join(tmp_path, 'clipboard_data.json')),
+        history_archive=HistoryArchive(os.path.join(tmp_path, 'clipboard_archive')),
+        group_manager=SimpleNamespace(groups={'g': {'name': 'g', 'items': {'x': {'id': 'x', 'text': 'de grupo'}}}},
+                                      search_index=TrigramIndex(), persist_item=lambda item_id: None),
+    )
+    functions = manager.functions = Functions(manager)
+    yield functions
+    functions.clipboard_backend.close()
+    manager.history_archive.close()
+
+
+def add(functions, item_id, text, pinned=False):
+    functions.manager.clipboard_items[item_id] = {'text': text, 'pinned': pinned, 'with_format': False}
+    functions.index_item(item_id)
+
+
+def test_footprint_reports_memory_and_disk_by_category(functions):
+    add(functions, 'a', 'a' * 1000)
+    add(functions, 'b', 'b' * 10, pinned=True)
+    footprint = functions.footprint()
+    memory, disk = footprint['memory'], footprint['disk']
+    assert set(memory) == {'history', 'pinned', 'groups', 'previews', 'search_index', 'archive_index'}
+    assert memory['history'] >= 1000 > memory['pinned'] > 0
+    assert memory['groups'] > 0 and memory['search_index'] > 0
+    assert memory['archive_index'] == 0
+    assert {'snapshot', 'journal', 'blobs', 'archive', 'archive_index'} <= set(disk)
+
+
+def test_footprint_counts_archived_items(functions):
+    add(functions, 'a', 'viejo')
+    item = functions.manager.clipboard_items.pop('a')
+    functions.manager.history_archive.append('a', item, functions.item_digests['a'])
+    footprint = functions.footprint()
+    assert footprint['memory']['archive_index'] > 0
+    assert footprint['disk']['archive'] > 0
+
+
+def test_metrics_report_includes_footprint_and_capture(functions):
+    add(functions, 'a', 'texto')
+    lines = functions.metrics_report()
+    assert lines[0].startswith('Memoria: ')
+    assert any(line.startswith('Disco: ') for line in lines)
+    assert any('Despertares sin cambios: 0 por minuto' == line for line in lines)
+
+
+def test_restore_saves_the_item_before_removing_it_from_the_archive(functions):
+    manager = functions.manager
+    add(functions, 'a', 'viejo')
+    item = manager.clipboard_items.pop('a')
+    manager.history_archive.append('a', item, functions.item_digests['a'])
+    functions.unindex_item('a')
+    events = []
+    manager.group_manager.persist_item = lambda item_id: events.append(('persist', item_id in manager.clipboard_items))
+    manager.persistence_writer = SimpleNamespace(flush=lambda: events.append(('flush', 'a' in manager.history_archive)))
+    assert functions.restore_from_archive('a') == 'a'
+    # Guardado y vaciado mientras todavía estaba en el archivo
+    assert events == [('persist', True), ('flush', True)]
+    assert 'a' not in manager.history_archive
+    assert manager.clipboard_items['a']['text'] == 'viejo'
@@ -0,0 +1,110 @@
+# test_history_archive.py
+
+import os
+import threading
+
+from fuzzy_search import FuzzySearcher, exact_score
+from history_archive import ArchiveCandidates, HistoryArchive, query_signature
+
+
+def digest(number):
+    return f'{number:032x}'
+
+
+def fill(archive, count):
+    for number in range(count):
+        archive.append(f'id{number}', {'text': f'texto {number}'}, digest(number))
+
+
+def test_compaction_keeps_changes_made_while_copying(tmp_path):
+    base_path = os.path.join(tmp_path, 'archive')
+    archive = HistoryArchive(base_path)
+    fill(archive, 5)
+    copy_entries = archive.copy_entries
+
+    def copy_while_changing(entries):
+        # Lo que pasa en otros hilos mientras la copia va sin el candado
+        copied = copy_entries(entries)
+        archive.remove('id1')
+        archive.append('id5', {'text': 'texto 5'}, digest(5))
+        archive.append('id0', {'text': 'texto 0 otra vez'}, digest(10))
+        return copied
+
+    archive.copy_entries = copy_while_changing
+    archive.compact_in_place()
+    expected = ['id2', 'id3', 'id4', 'id5', 'id0']
+    assert archive.ids() == expected
+    assert archive.get('id0')['text'] == 'texto 0 otra vez'
+    assert archive.data_size == os.path.getsize(base_path + '.dat')
+    archive.close()
+
+    reopened = HistoryArchive(base_path)
+    assert reopened.ids() == expected
+    assert [reopened.get(item_id)['text'] for item_id in expected] == \
+        ['texto 2', 'texto 3', 'texto 4', 'texto 5', 'texto 0 otra vez']
+    reopened.close()
+
+
+def test_compaction_is_dropped_when_the_archive_is_cleared_meanwhile(tmp_path):
+    base_path = os.path.join(tmp_path, 'archive')
+    archive = HistoryArchive(base_path)
+    fill(archive, 3)
+    copy_entries = archive.copy_entries
+
+    def copy_while_clearing(entries):
+        copied = copy_entries(entries)
+        archive.clear()
+        return copied
+
+    archive.copy_entries = copy_while_clearing
+    archive.compact_in_place()
+    assert len(archive) == 0
+    archive.close()
+    reopened = HistoryArchive(base_path)
+    assert len(reopened) == 0
+    reopened.close()
+
+
+def test_search_text_is_stored_next_to_the_item(tmp_path):
+    archive = HistoryArchive(os.path.join(tmp_path, 'archive'))
+    item = {'text': 'Hola Mundo ñandú', 'pinned': False, 'with_format': False}
+    archive.append('a', item, digest(1))
+    assert archive.search_text('a') == 'hola mundo ñandú'
+    archive.cache.clear()
+    assert archive.get('a') == item
+    archive.close()
+
+
+def test_signature_discards_items_without_reading_them(tmp_path):
+    archive = HistoryArchive(os.path.join(tmp_path, 'archive'))
+    archive.append('a', {'text': 'factura de marzo'}, digest(1))
+    archive.append('b', {'text': 'lista de compras'}, digest(2))
+    required = query_signature('MARZO')
+    assert archive.may_contain('a', required)
+    assert not archive.may_contain('b', required)
+    candidates = ArchiveCandidates(archive, required)
+    assert [candidates[0], candidates[1]] == [('a', 'factura de marzo'), ('b', '')]
+    # La difusa solo exige las letras, en cualquier orden
+    assert archive.may_contain('b', query_signature('sdc', substring=False))
+    archive.close()
+
+
+def test_exact_archive_search_is_not_capped(tmp_path):
+    archive = HistoryArchive(os.path.join(tmp_path, 'archive'))
+    fill(archive, 30)
+    done = threading.Event()
+    results = []
+
+    def on_results(query, ranked, finished):
+        if finished:
+            results.extend(item_id for item_id, _ in ranked)
+            done.set()
+
+    searcher = FuzzySearcher(lambda callback: callback(), limit=5, chunk_size=7)
+    searcher.submit('texto 1', ArchiveCandidates(archive, query_signature('texto 1')), on_results,
+                    exact_score, limit=len(archive))
+    assert done.wait(5)
+    searcher.close()
+    # Las once que contienen 'texto 1', de la más reciente a la más antigua
+    assert results == ['id19', 'id18', 'id17', 'id16', 'id15', 'id14', 'id13', 'id12', 'id11', 'id10', 'id1']
+    archive.close()
@@ -0,0 +1,82 @@
+# test_navigation_model.py
+
+from navigation_model import NavigationModel, row_at, scroll_target, visible_range
+
+# Tres filas de alturas 40, 76 y 58: offsets acumulados
+OFFSETS = [0, 40, 116, 174]
+
+
+def test_row_at_with_variable_heights():
+    assert row_at(OFFSETS, 0) == 0
+    assert row_at(OFFSETS, 39.5) == 0
+    assert row_at(OFFSETS, 40) == 1
+    assert row_at(OFFSETS, 115) == 1
+    assert row_at(OFFSETS, 116) == 2
+    assert row_at(OFFSETS, 173) == 2
+
+
+def test_row_at_outside_the_list():
+    assert row_at(OFFSETS, -1) is None
+    assert row_at(OFFSETS, 174) is None
+    assert row_at([0], 0) is None
+
+
+def test_visible_range_with_overscan_and_empty_list():
+    assert visible_range(OFFSETS, 50, 100) == (1, 2)
+    assert visible_range(OFFSETS, 50, 120) == (1, 3)
+    assert visible_range(OFFSETS, 50, 100, overscan=5) == (0, 3)
+    assert visible_range([0], 0, 400, overscan=3) == (0, 0)
+
+
+def test_scroll_target_brings_rows_into_view():
+    assert scroll_target(OFFSETS, 1, 0, 200) is None
+    assert scroll_target(OFFSETS, 0, 50, 100) == 0
+    assert scroll_target(OFFSETS, 2, 0, 100) == 74
+    assert scroll_target(OFFSETS, 3, 0, 100) is None
+    assert scroll_target([0], 0, 0, 100) is None
+
+
+def test_empty_list_never_selects_a_card():
+    model = NavigationModel()
+    model.set_rows([0])
+    model.initial_selection()
+    assert model.selection == {'type': 'main_buttons', 'index': 0}
+    model.move_down()
+    assert model.selection == {'type': 'main_buttons', 'index': 0}
+    assert model.selected_card() is None
+    assert model.scroll_target(0, 100) is None
+
+
+def test_moves_clamp_at_both_ends():
+    model = NavigationModel()
+    model.set_rows(OFFSETS)
+    model.initial_selection()
+    assert model.selection == {'type': 'cards', 'index': 0}
+    model.move_up()
+    assert model.selection == {'type': 'main_buttons', 'index': 0}
+    model.move_up()
+    model.move_up()
+    assert model.selection == {'type': 'top_buttons', 'index': 0}
+    model.select('cards', 2)
+    model.move_down()
+    assert model.selection == {'type': 'cards', 'index': 2}
+
+
+def test_clamp_when_cards_are_removed():
+    model = NavigationModel()
+    model.set_rows(OFFSETS)
+    model.select('icons', 2 * model.icons_per_card + 1)
+    model.set_rows([0, 40])
+    assert model.selection == {'type': 'cards', 'index': 0}
+    model.set_rows([0])
+    assert model.selection == {'type': 'main_buttons', 'index': 0}
+
+
+def test_keyboard_enters_at_first_card():
+    model = NavigationModel()
+    model.set_rows(OFFSETS, first_card=2)
+    model.select('main_buttons', 0)
+    model.move_down()
+    assert model.selection == {'type': 'cards', 'index': 2}
+    model.set_rows([0, 40], first_card=2)
+    assert model.first_card == 0
@@ -0,0 +1,103 @@
+# test_virtual_list.py
+
+from virtual_list import Segments, VirtualCardList
+
+
+class FakeCanvas:
+    """Lo mínimo del Canvas que usa la lista, sin ventanas."""
+
+    def __init__(self, height=100):
+        self.height = height
+        self.items = 0
+
+    def configure(self, **options):
+        pass
+
+    def winfo_width(self):
+        return 200
+
+    def winfo_height(self):
+        return self.height
+
+    def canvasy(self, y):
+        return y
+
+    def create_window(self, *args, **options):
+        self.items += 1
+        return self.items
+
+    def coords(self, *args):
+        pass
+
+    def itemconfigure(self, *args, **options):
+        pass
+
+
+class FakeRow:
+    pass
+
+
+def make_list(heights):
+    calls = []
+
+    def row_height(key):
+        calls.append(key)
+        return heights[key]
+
+    card_list = VirtualCardList(FakeCanvas(), FakeRow, lambda widget, key, index: None, row_height,
+                                spacing=0)
+    return card_list, calls
+
+
+def test_segments_behave_like_the_concatenated_list():
+    segments = Segments(['a', 'b'], ['c', 'd', 'e'])
+    joined = ['a', 'b', 'c', 'd', 'e']
+    assert len(segments) == 5
+    assert list(segments) == joined
+    assert [segments[i] for i in range(-5, 5)] == [joined[i] for i in range(-5, 5)]
+    assert segments[1:4] == joined[1:4]
+    assert segments[3:] == joined[3:]
+    assert segments[::2] == joined[::2]
+
+
+def test_prefix_offsets_match_a_single_list():
+    heights = {'a1': 10, 'a2': 20, 'h1': 30, 'h2': 40}
+    with_prefix, _ = make_list(heights)
+    with_prefix.set_keys(['h1', 'h2'], ['a1', 'a2'])
+    plain, _ = make_list(heights)
+    plain.set_keys(['a1', 'a2', 'h1', 'h2'])
+    assert list(with_prefix.offsets) == list(plain.offsets) == [0, 10, 30, 60, 100]
+    assert list(with_prefix.keys) == ['a1', 'a2', 'h1', 'h2']
+    assert with_prefix.height_at(1) == 20
+
+
+def test_same_prefix_is_not_measured_again():
+    heights = {'a1': 10, 'a2': 20, 'h1': 30, 'h2': 40}
+    card_list, calls = make_list(heights)
+    prefix = ['a1', 'a2']
+    card_list.set_keys(['h1'], prefix)
+    calls.clear()
+    card_list.set_keys(['h1', 'h2'], prefix)
+    assert calls == ['h2']
+    assert card_list.offsets[-1] == 100
+
+
+def test_grown_prefix_only_measures_the_new_rows():
+    heights = {'a1': 10, 'a2': 20, 'h1': 30}
+    card_list, calls = make_list(heights)
+    card_list.set_keys(['h1', 'a2'], ['a1'])
+    calls.clear()
+    card_list.set_keys(['h1'], ['a1', 'a2'])
+    assert calls == ['a2']
+    assert list(card_list.offsets) == [0, 10, 30, 60]
+    assert card_list.keys[1] == 'a2'
+
+
+def test_changed_prefix_is_measured_again():
+    heights = {'a1': 10, 'a2': 20, 'h1': 30}
+    card_list, calls = make_list(heights)
+    card_list.set_keys(['h1'], ['a1', 'a2'])
+    calls.clear()
+    card_list.set_keys(['h1'], ['a2'])
+    assert calls == ['a2']
+    assert list(card_list.offsets) == [0, 20, 50]
@@ -3,6 +3,9 @@
 import tkinter as tk
 from tkinter import ttk
 
+from style_registry import StyleRegistry
+from utils import measure_time
+
 class ThemeManager:
     def __init__(self, manager):
         self.manager = manager
@@ -30,66 +33,35 @@ class ThemeManager:
                 'card_bg': '#ffffff'
             }
         }
+        self.styles = StyleRegistry()
+
+    def current_colors(self):
+        return self.colors['dark'] if self.manager.is_dark_mode else self.colors['light']
+
+    def style(self, widget, role):
+        # Registra el widget con su rol y le aplica el tema actual
+        return self.styles.register(widget, role, self.current_colors())
 
     def toggle_theme(self):
         self.manager.is_dark_mode = not self.manager.is_dark_mode
         self.manager.theme_button.config(text="🌙" if self.manager.is_dark_mode else "☀️")
         self.apply_theme()
 
+    @measure_time
     def apply_theme(self):
-        theme = self.colors['dark'] if self.manager.is_dark_mode else self.colors['light']
+        theme = self.current_colors()
         
         self.manager.root.configure(bg=theme['bg'])
-        self.manager.main_frame.configure(style='Main.TFrame')
-        self.manager.title_frame.configure(bg=theme['bg'])
-        self.manager.title_label.configure(bg=theme['bg'], fg=theme['fg'])
-        
-        self.manager.clear_button.configure(
-            bg=theme['button_bg'],
-            fg=theme['button_fg'],
-            activebackground=theme['button_bg'],
-            activeforeground=theme['button_fg']
-        )
-        self.manager.theme_button.configure(
-            bg=theme['button_bg'],
-            fg=theme['button_fg'],
-            activebackground=theme['button_bg'],
-            activeforeground=theme['button_fg']
-        )
-        
-        self.manager.close_button.configure(
-            bg=theme['button_bg'],
-            fg=theme['button_fg'],
-            activebackground=theme['button_bg'],
-            activeforeground=theme['button_fg']
-        )
-
-        self.manager.button1.configure(
-            bg=theme['button_bg'],
-            fg=theme['button_fg'],
-            activebackground=theme['button_bg'],
-            activeforeground=theme['button_fg']
-        )
-
-        self.manager.button2.configure(
-            bg=theme['button_bg'],
-            fg=theme['button_fg'],
-            activebackground=theme['button_bg'],
-            activeforeground=theme['button_fg']
-        )
-
-        self.manager.button3.configure(
-            bg=theme['button_bg'],
-            fg=theme['button_fg'],
-            activebackground=theme['button_bg'],
-            activeforeground=theme['button_fg']
-        )
-
-        self.manager.canvas.configure(bg=theme['bg'])
-        self.manager.cards_frame.configure(bg=theme['bg'])
-        
-        self.manager.functions.refresh_cards()
-
         style = ttk.Style()  
         style.theme_use('clam')  
-        style.configure('Main.TFrame', background=theme['bg'])
\ No newline at end of file
+        style.configure('Main.TFrame', background=theme['bg'])
+
+        # Una pasada por todos los widgets registrados, de todas las ventanas abiertas
+        updated = self.styles.apply(theme)
+        print(f"Tema aplicado a {updated} widgets")
+
+        # Las tarjetas dibujadas en el canvas no son widgets: se actualizan por etiqueta
+        if getattr(getattr(self.manager, 'card_list', None), 'draws_cards', False):
+            self.manager.card_list.apply_theme()
+        if hasattr(self.manager, 'navigation'):
+            self.manager.navigation.invalidate_highlights()
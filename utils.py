@@ -1,5 +1,7 @@
 # utils.py
 
+import hashlib
+import os
 import time
 
 def measure_time(func):
@@ -11,7 +13,59 @@ def measure_time(func):
         return result
     return wrapper
 
-def process_text(text_data, cant_lineas):
+def file_size(path):
+    """Tamaño del archivo en bytes, 0 si no existe."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def format_size(size):
+    """Tamaño en bytes como texto legible: 512 B, 3.2 KB, 1.5 MB..."""
+    if size < 1024:
+        return f"{size} B"
+    for unit in ('KB', 'MB', 'GB'):
+        size /= 1024
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}"
+
+def content_digest(text_data):
+    """
+    Huella del texto de un item, usada para detectar duplicados sin comparar cadenas
+    """
+    if isinstance(text_data, dict):
+        text = text_data.get('text') or ''
+    else:
+        text = str(text_data)
+    return hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+
+def iter_clean_lines(text, start=0, max_line_chars=500, after_text=False):
+    """
+    Recorre el texto línea a línea sin partirlo entero: genera (línea limpia, posición
+    siguiente), omite las líneas vacías del principio y del final y junta las consecutivas
+    """
+    length = len(text)
+    pos = start
+    pending_empty = None
+    while pos < length:
+        end = text.find('\n', pos)
+        if end == -1:
+            end = length
+        # Solo se mira el principio de cada línea: una línea de 10 MB cuesta lo mismo que una corta
+        line = text[pos:min(end, pos + max_line_chars)].strip()
+        line_start = pos
+        pos = end + 1
+        if not line:
+            if after_text and pending_empty is None:
+                pending_empty = line_start
+            continue
+        if pending_empty is not None:
+            yield '', line_start
+            pending_empty = None
+        after_text = True
+        yield line, pos
+
+def process_text(text_data, cant_lineas, max_line_chars=500, exact_count_limit=1_000_000):
     """
     Procesa el texto para mostrarlo de forma limpia y ordenada
     """
@@ -21,34 +75,26 @@ def process_text(text_data, cant_lineas):
     else:
         text = str(text_data)
 
-    # Eliminamos espacios extras y tabulaciones al inicio y final
-    text = text.strip()
-    
-    # Dividimos el texto en líneas
-    lines = text.splitlines()
-    
-    # Eliminamos líneas vacías consecutivas y espacios extras
-    clean_lines = []
-    prev_empty = False
-    for line in lines:
-        line = line.strip()
-        
-        # Si la línea está vacía
-        if not line:
-            if not prev_empty:  # Solo mantenemos una línea vacía
-                clean_lines.append('')
-                prev_empty = True
-        else:
-            clean_lines.append(line)
-            prev_empty = False
-    
-    # Tomamos solo las primeras 'cant_lineas' para la vista previa
-    preview_lines = clean_lines[:cant_lineas]
-    
+    # Tomamos solo las primeras 'cant_lineas' para la vista previa, sin recorrer el resto
+    preview_lines = []
+    next_pos = 0
+    if cant_lineas > 0:
+        for line, next_pos in iter_clean_lines(text, 0, max_line_chars):
+            preview_lines.append(line)
+            if len(preview_lines) == cant_lineas:
+                break
+
     # Si hay más líneas, indicamos cuántas más hay
-    if len(clean_lines) > cant_lineas:
-        remaining_lines = len(clean_lines) - cant_lineas
-        preview_lines.append(f"+ {remaining_lines} líneas más")
-        
+    if len(preview_lines) == cant_lineas and next_pos < len(text):
+        if len(text) - next_pos <= exact_count_limit:
+            remaining_lines = sum(1 for _ in iter_clean_lines(text, next_pos, max_line_chars, bool(preview_lines)))
+            if remaining_lines:
+                preview_lines.append(f"+ {remaining_lines} líneas más")
+        else:
+            # Texto enorme: se cuentan los saltos de línea sin crear una cadena por línea
+            remaining_lines = text.count('\n', next_pos) + (0 if text.endswith('\n') else 1)
+            if remaining_lines:
+                preview_lines.append(f"+ ~{remaining_lines} líneas más")
+
     # Unimos las líneas con saltos de línea
-    return '\n'.join(preview_lines)
\ No newline at end of file
+    return '\n'.join(preview_lines)
@@ -0,0 +1,232 @@
+# virtual_list.py
+
+from itertools import chain
+
+from navigation_model import row_at, scroll_target, visible_range
+
+
+class Segments:
+    """Dos listas vistas como una sola secuencia de solo lectura, sin copiarlas."""
+
+    def __init__(self, head, tail):
+        self.head = head
+        self.tail = tail
+
+    def __len__(self):
+        return len(self.head) + len(self.tail)
+
+    def __iter__(self):
+        return chain(self.head, self.tail)
+
+    def __getitem__(self, index):
+        split = len(self.head)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self.head[start:min(stop, split)] + self.tail[max(start - split, 0):max(stop - split, 0)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.head[index] if index < split else self.tail[index - split]
+
+
+class VirtualCardList:
+    """
+    Lista virtual sobre un Canvas: solo se crean widgets para las filas visibles
+    más un margen (overscan) y se reutilizan al desplazarse. Cada fila es una
+    ventana del canvas colocada según la suma acumulada de las alturas.
+    """
+
+    def __init__(self, canvas, create_row, bind_row, row_height, signature=None, move_row=None,
+                 overscan=3, spacing=4, padx=2):
+        self.canvas = canvas
+        self.create_row = create_row  # () -> widget hijo del canvas, sin datos
+        self.bind_row = bind_row      # (widget, key, index) -> muestra el item en el widget
+        self.row_height = row_height  # (key) -> altura de la fila en píxeles
+        self.signature = signature    # (key) -> valor que cambia cuando hay que volver a dibujar el item
+        self.move_row = move_row      # (widget, key, index) -> la fila cambió de posición, no de contenido
+        self.overscan = overscan
+        self.spacing = spacing
+        self.padx = padx
+        self.scrollbar = None
+
+        self.keys = []
+        self.prefix = ()          # claves fijas arriba de la lista (el archivo), se reutilizan entre llamadas
+        self.prefix_offsets = [0]  # offsets de las filas del prefijo; el último es su altura total
+        self.positions = {}   # key -> índice en keys, sin el prefijo
+        self.heights = {}     # key -> altura calculada una sola vez, sin el prefijo
+        self.signatures = {}  # key -> firma con la que se dibujó la fila
+        self.offsets = [0]    # offsets[i] = y de la fila i; offsets[-1] = altura total
+        self.rows = {}        # key visible -> widget
+        self.pool = []        # widgets libres, ocultos
+        self.render_pending = False
+
+        # Métricas de la última reconciliación
+        self.last_binds = 0
+        self.last_moves = 0
+
+        self.canvas.configure(yscrollcommand=self.on_yscroll)
+
+    # ------------------------------------------------------------------
+
+    def set_keys(self, keys, prefix=()):
+        """
+        Reconciliación por clave: las filas visibles que siguen existiendo conservan
+        su widget; solo se mueven si cambió su posición y solo se vuelven a asociar
+        si cambió su firma.
+
+        prefix son filas que van arriba de keys y cuyo contenido no cambia (el
+        archivo). Mientras se pase la misma lista sus offsets no se recalculan, así
+        que el costo de cada llamada depende solo de keys.
+        """
+        if prefix is not self.prefix:
+            self.set_prefix(prefix)
+        rest = list(keys)
+        self.positions = {key: index for index, key in enumerate(rest, len(prefix))}
+        for key in [k for k in self.heights if k not in self.positions]:
+            del self.heights[key]
+            self.signatures.pop(key, None)
+        if self.signature:
+            for key in self.rows:
+                if key in self.positions and self.signatures.get(key) != self.signature(key):
+                    self.heights.pop(key, None)
+        self.keys = Segments(prefix, rest) if prefix else rest
+        self.rebuild_offsets(rest)
+        self.render()
+
+    def set_prefix(self, prefix):
+        # Lo habitual es que el archivo solo crezca al final: se extienden los offsets que ya había
+        old = self.prefix
+        if len(prefix) >= len(old) and prefix[:len(old)] == old:
+            offsets = self.prefix_offsets
+            new_keys = prefix[len(old):]
+        else:
+            offsets = [0]
+            new_keys = prefix
+        total = offsets[-1]
+        for key in new_keys:
+            total += self.row_height(key) + self.spacing
+            offsets.append(total)
+        self.prefix = prefix
+        self.prefix_offsets = offsets
+
+    def rebuild_offsets(self, rest):
+        offsets = []
+        total = self.prefix_offsets[-1]
+        for key in rest:
+            height = self.heights.get(key)
+            if height is None:
+                height = self.heights[key] = self.row_height(key)
+            total += height + self.spacing
+            offsets.append(total)
+        self.offsets = Segments(self.prefix_offsets, offsets) if self.prefix else [0] + offsets
+        self.canvas.configure(scrollregion=(0, 0, self.canvas.winfo_width(), total))
+
+    def height_at(self, index):
+        return self.offsets[index + 1] - self.offsets[index] - self.spacing
+
+    def visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + max(self.canvas.winfo_height(), 1)
+        return visible_range(self.offsets, top, bottom, self.overscan)
+
+    def render(self):
+        self.render_pending = False
+        self.last_binds = 0
+        self.last_moves = 0
+        first, last = self.visible_range()
+        visible = self.keys[first:last]
+        visible_set = set(visible)
+        for key in [k for k in self.rows if k not in visible_set]:
+            self.release(key)
+        for index, key in enumerate(visible, first):
+            widget = self.rows.get(key)
+            if widget is None:
+                self.show(key, index)
+            elif self.signature and self.signatures.get(key) != self.signature(key):
+                self.place(widget, key, index)
+                self.bind(widget, key, index)
+            elif widget.row_index != index or widget.row_y != self.offsets[index]:
+                self.place(widget, key, index)
+                self.last_moves += 1
+                if self.move_row:
+                    self.move_row(widget, key, index)
+
+    def show(self, key, index):
+        widget = self.pool.pop() if self.pool else self.new_row()
+        self.place(widget, key, index)
+        self.canvas.itemconfigure(widget.window_id, state='normal')
+        self.bind(widget, key, index)
+        self.rows[key] = widget
+
+    def place(self, widget, key, index):
+        y = self.offsets[index]
+        height = self.height_at(index)
+        if widget.row_y != y:
+            self.canvas.coords(widget.window_id, self.padx, y)
+            widget.row_y = y
+        if widget.row_height != height:
+            self.canvas.itemconfigure(widget.window_id, height=height, width=self.row_width())
+            widget.row_height = height
+        widget.row_index = index
+
+    def bind(self, widget, key, index):
+        self.bind_row(widget, key, index)
+        if self.signature:
+            self.signatures[key] = self.signature(key)
+        self.last_binds += 1
+
+    def release(self, key):
+        widget = self.rows.pop(key)
+        self.signatures.pop(key, None)
+        self.canvas.itemconfigure(widget.window_id, state='hidden')
+        self.pool.append(widget)
+
+    def new_row(self):
+        widget = self.create_row()
+        widget.window_id = self.canvas.create_window(self.padx, 0, window=widget, anchor='nw',
+                                                     width=self.row_width())
+        widget.row_index = None
+        widget.row_y = None
+        widget.row_height = None
+        return widget
+
+    def row_width(self):
+        return max(self.canvas.winfo_width() - 2 * self.padx, 1)
+
+    # ------------------------------------------------------------------
+
+    def on_yscroll(self, first, last):
+        if self.scrollbar:
+            self.scrollbar.set(first, last)
+        # Varios desplazamientos seguidos se agrupan en un solo render
+        if not self.render_pending:
+            self.render_pending = True
+            self.canvas.after_idle(self.render)
+
+    def on_resize(self, width):
+        total = self.offsets[-1]
+        self.canvas.configure(scrollregion=(0, 0, width, total))
+        for widget in self.rows.values():
+            self.canvas.itemconfigure(widget.window_id, width=self.row_width())
+        self.render()
+
+    def widget_at(self, index):
+        if 0 <= index < len(self.keys):
+            return self.rows.get(self.keys[index])
+        return None
+
+    def visible_widgets(self):
+        return [(widget.row_index, widget) for widget in self.rows.values()]
+
+    def index_at(self, y):
+        # y en coordenadas de la ventana del canvas
+        return row_at(self.offsets, self.canvas.canvasy(y))
+
+    def scroll_to_index(self, index):
+        total = self.offsets[-1]
+        target = scroll_target(self.offsets, index, self.canvas.canvasy(0), self.canvas.winfo_height())
+        if target is not None and total > 0:
+            self.canvas.yview_moveto(target / total)
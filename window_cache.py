@@ -0,0 +1,114 @@
+# window_cache.py
+
+import time
+from collections import deque
+
+
+class WindowCache:
+    """
+    Ventanas secundarias creadas una sola vez: al cerrarlas se ocultan (withdraw)
+    y al volver a abrirlas se muestran (deiconify) actualizando solo su contenido.
+    Mide el tiempo hasta que cada ventana queda visible. La rueda del mouse se
+    enlaza a la última ventana mostrada que la usa y vuelve a la principal al ocultarlas.
+    """
+
+    def __init__(self, root, history=50, main_wheel=None):
+        self.root = root
+        self.windows = {}
+        self.timings = {}  # nombre -> deque de (ms, creada)
+        self.history = history
+        self.suspended = []
+        self.main_wheel = main_wheel
+        self.wheels = {}      # nombre -> manejador de <MouseWheel>
+        self.shown_order = []  # Ventanas visibles, la última arriba
+
+    def get(self, name):
+        window = self.windows.get(name)
+        if window is not None and window.winfo_exists():
+            return window
+        return None
+
+    def is_visible(self, name):
+        window = self.get(name)
+        return window is not None and window.winfo_viewable()
+
+    def show(self, name, build, refresh=None, geometry=None, wheel=None):
+        """build() crea la ventana; refresh(window) actualiza una ya creada; wheel(event) desplaza su contenido."""
+        start = time.perf_counter()
+        window = self.get(name)
+        built = window is None
+        if built:
+            window = build()
+            self.windows[name] = window
+        elif refresh:
+            refresh(window)
+        if geometry:
+            window.geometry(geometry)
+        window.deiconify()
+        window.lift()
+        if wheel is not None:
+            self.wheels[name] = wheel
+        if name in self.shown_order:
+            self.shown_order.remove(name)
+        self.shown_order.append(name)
+        self.bind_wheel()
+        # Cuando Tk queda libre la ventana ya está dibujada
+        window.after_idle(self.record, name, start, built)
+        return window
+
+    def hide(self, name):
+        window = self.get(name)
+        if window is not None:
+            window.withdraw()
+        if name in self.shown_order:
+            self.shown_order.remove(name)
+            self.bind_wheel()
+
+    def bind_wheel(self):
+        # bind_all es global: se vuelve a enlazar en cada cambio para no desplazar una ventana oculta
+        for name in reversed(self.shown_order):
+            if name in self.wheels:
+                self.root.bind_all("<MouseWheel>", self.wheels[name])
+                return
+        if self.main_wheel is not None:
+            self.root.bind_all("<MouseWheel>", self.main_wheel)
+
+    def suspend(self):
+        # Al minimizar la ventana principal se ocultan las que estaban visibles (siguen en shown_order)
+        self.suspended = [name for name in self.windows if self.is_visible(name)]
+        for name in self.suspended:
+            self.windows[name].withdraw()
+
+    def resume(self):
+        for name in self.suspended:
+            window = self.get(name)
+            if window is not None:
+                window.deiconify()
+        self.suspended = []
+
+    def destroy_all(self):
+        for name in list(self.windows):
+            window = self.get(name)
+            if window is not None:
+                window.destroy()
+        self.windows = {}
+        self.shown_order = []
+        self.bind_wheel()
+
+    def record(self, name, start, built):
+        elapsed = (time.perf_counter() - start) * 1000
+        self.timings.setdefault(name, deque(maxlen=self.history)).append((elapsed, built))
+        print(f"Ventana '{name}' visible en {elapsed:.1f} ms ({'creada' if built else 'reutilizada'})")
+
+    def metrics(self):
+        result = {}
+        for name, timings in self.timings.items():
+            built = [ms for ms, was_built in timings if was_built]
+            reused = [ms for ms, was_built in timings if not was_built]
+            result[name] = {
+                'opens': len(timings),
+                'last_ms': timings[-1][0],
+                'build_ms': built[-1] if built else None,
+                'reuse_avg_ms': sum(reused) / len(reused) if reused else None,
+            }
+        return result